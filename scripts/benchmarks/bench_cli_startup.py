@@ -0,0 +1,50 @@
+# Benchmark: import cost of every CLI subcommand, measured with `python -X importtime` in a
+# fresh interpreter, against the budgets in scripts.cli.IMPORT_BUDGETS. Also checks which heavy
+# libraries each subcommand pulls in. Exits non-zero when a budget is exceeded.
+# Run from the repo root:  python -m scripts.benchmarks.bench_cli_startup
+
+import subprocess
+import sys
+
+from scripts.cli import COMMANDS, IMPORT_BUDGETS, entry_modules
+
+HEAVY = ['pandas', 'matplotlib', 'seaborn', 'sklearn', 'xgboost', 'scipy', 'lifelines', 'rapidfuzz']
+REPEATS = 3             # best of N (the first run also warms the filesystem cache)
+
+
+def import_seconds(modules):
+    """Cumulative import time of `modules` in a fresh interpreter, plus the heavy libraries it loaded."""
+    code = "import sys\n" + "".join(f"import {m}\n" for m in modules) + \
+           f"print(','.join(h for h in {HEAVY!r} if h in sys.modules))"
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                          capture_output=True, text=True, check=True)
+    total = 0
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if not name[1:].startswith(" "):        # top-level imports only (nested ones are indented)
+            total += int(cumulative)
+    return total / 1e6, [h for h in proc.stdout.strip().split(",") if h]
+
+
+def run_cli_startup_benchmark():
+    over = []
+    targets = [('cli', ['scripts.cli'])] + [(name, entry_modules(name)) for name in COMMANDS]
+    for name, modules in targets:
+        runs = [import_seconds(modules) for _ in range(REPEATS)]
+        seconds = min(r[0] for r in runs)
+        budget = IMPORT_BUDGETS[name]
+        status = "ok" if seconds <= budget else "OVER BUDGET"
+        if seconds > budget:
+            over.append(name)
+        print(f"{name:<9} {seconds:6.3f}s import (budget {budget:.2f}s) {status:<12} "
+              f"loads: {', '.join(runs[0][1]) or '-'}")
+    if over:
+        print(f"Import budget exceeded: {', '.join(over)}")
+        sys.exit(1)
+    print("All subcommands within their import budgets.")
+
+
+if __name__ == "__main__":
+    run_cli_startup_benchmark()
@@ -0,0 +1,50 @@
+# Benchmark: auto-k mini-batch clustering fit vs. worker count, and nearest-centroid assignment throughput.
+# Run from the repo root:  python -m scripts.benchmarks.bench_clustering
+
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from scripts.modeling.player_clustering import CLUSTER_FEATURES, assign_clusters, fit_cluster_model
+
+N_PLAYERS = [10_000, 100_000]
+N_ARCHETYPES = 5
+
+
+def make_features(n_players, seed=42):
+    """Gamma-distributed feature blobs around N_ARCHETYPES archetype centres, ~5% missing volatility."""
+    rng = np.random.default_rng(seed)
+    centres = rng.gamma(2.0, 40.0, size=(N_ARCHETYPES, len(CLUSTER_FEATURES)))
+    labels = rng.integers(0, N_ARCHETYPES, n_players)
+    values = centres[labels] * rng.lognormal(0.0, 0.25, size=(n_players, len(CLUSTER_FEATURES)))
+    df = pd.DataFrame(values.round(2), columns=CLUSTER_FEATURES)
+    df.loc[rng.random(n_players) < 0.05, 'volatility_index'] = np.nan
+    return df
+
+
+def run_clustering_benchmark():
+    worker_counts = sorted({1, 2, os.cpu_count() or 1})
+    for n_players in N_PLAYERS:
+        df = make_features(n_players)
+        print(f"\n{n_players:,} players:")
+        reference = None
+        for workers in worker_counts:
+            start = time.perf_counter()
+            model = fit_cluster_model(df, workers=workers)
+            elapsed = time.perf_counter() - start
+            print(f"  fit, k search on {workers} worker(s): {elapsed:6.2f} s  -> k={model['k']}")
+            if reference is None:
+                reference = model
+            assert model['centroids'] == reference['centroids'], "fit depends on the worker count"
+
+        start = time.perf_counter()
+        assigned = assign_clusters(df, reference)
+        elapsed = time.perf_counter() - start
+        print(f"  nearest-centroid assignment: {elapsed * 1000:8.1f} ms ({n_players / elapsed:,.0f} players/s)")
+        print(f"  archetypes: {assigned['archetype'].value_counts().to_dict()}")
+
+
+if __name__ == "__main__":
+    run_clustering_benchmark()
@@ -0,0 +1,71 @@
+# Benchmark: vectorized Elo engine vs. the original pure-Python pairwise loop, plus how closely
+# the batched mode's ranking follows the sequential one (Spearman) it does not reproduce exactly.
+# Run from the repo root:  python -m scripts.benchmarks.bench_elo
+
+import time
+import numpy as np
+
+from scripts.modeling.elo_engine import BASE_RATING, K_FACTOR, run_elo_engine
+
+FIELD_SIZES = [64, 256, 512, 1024]
+N_TOURNAMENTS = 6
+LEGACY_MAX_FIELD = 512  # The original loop takes minutes beyond this
+
+
+def legacy_loop(player_idx, tournaments, points):
+    # Verbatim port of the pre-engine run_elo_simulation inner loop
+    ratings = {pid: BASE_RATING for pid in np.unique(player_idx).tolist()}
+    for t in np.unique(tournaments):
+        rows = np.flatnonzero(tournaments == t)
+        order = rows[np.argsort(-points[rows], kind='stable')]
+        pids = player_idx[order].tolist()
+        for i in range(len(pids)):
+            for j in range(i + 1, len(pids)):
+                p1, p2 = pids[i], pids[j]
+                r1, r2 = ratings[p1], ratings[p2]
+                ratings[p1] = round(r1 + K_FACTOR * (1 - 1 / (1 + 10 ** ((r2 - r1) / 400))), 2)
+                ratings[p2] = round(r2 + K_FACTOR * (0 - 1 / (1 + 10 ** ((r1 - r2) / 400))), 2)
+    return ratings
+
+
+def make_field(n_players, seed=42):
+    rng = np.random.default_rng(seed)
+    player_idx = np.concatenate([rng.permutation(n_players) for _ in range(N_TOURNAMENTS)])
+    tournaments = np.repeat(np.arange(N_TOURNAMENTS), n_players)
+    points = rng.gamma(2.0, 30.0, size=len(player_idx)).round()
+    return player_idx, tournaments, points
+
+
+def spearman(a, b):
+    """Rank correlation of two rating arrays (ties broken by position)."""
+    ra, rb = np.argsort(np.argsort(a)), np.argsort(np.argsort(b))
+    return np.corrcoef(ra, rb)[0, 1]
+
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return time.perf_counter() - start, result
+
+
+def run_elo_benchmark():
+    print(f"{'field':>6} {'legacy(s)':>10} {'sequential(s)':>14} {'simultaneous(s)':>16} "
+          f"{'rank(s)':>9} {'speedup':>8} {'rank max|err|':>14} {'sim~seq rho':>12}")
+    for n in FIELD_SIZES:
+        player_idx, tournaments, points = make_field(n)
+        years = np.zeros(len(player_idx), dtype=int)
+
+        legacy_t = float('nan')
+        if n <= LEGACY_MAX_FIELD:
+            legacy_t, legacy = timed(legacy_loop, player_idx, tournaments, points)
+        seq_t, seq = timed(run_elo_engine, player_idx, years, tournaments, points, n_players=n, mode='sequential')
+        sim_t, sim = timed(run_elo_engine, player_idx, years, tournaments, points, n_players=n, mode='simultaneous')
+        rank_t, rank = timed(run_elo_engine, player_idx, years, tournaments, points, n_players=n, mode='rank')
+
+        baseline = legacy_t if n <= LEGACY_MAX_FIELD else seq_t
+        print(f"{n:>6} {legacy_t:>10.3f} {seq_t:>14.3f} {sim_t:>16.4f} {rank_t:>9.4f} "
+              f"{baseline / sim_t:>7.0f}x {np.abs(rank - sim).max():>14.2f} {spearman(sim, seq):>12.3f}")
+
+
+if __name__ == "__main__":
+    run_elo_benchmark()
@@ -0,0 +1,45 @@
+# Benchmark: seed-ensemble scheduling under different thread budgets.
+# Run from the repo root:  python -m scripts.benchmarks.bench_ensemble
+
+import os
+
+import numpy as np
+import pandas as pd
+
+from scripts.modeling.ensemble_runner import fit_seed_ensemble, thread_budget
+from scripts.modeling.train_xgboost_ensemble import ENSEMBLE_PARAMS, ENSEMBLE_SEEDS
+
+N_ROWS = 20000
+FEATURES = ['pts_lag_1', 'pts_lag_2', 'pts_lag_3', 'momentum_yoy', 'career_volatility']
+
+
+def make_supervised(n_rows, seed=7):
+    # Synthetic stand-in for supervised_timeseries_data.csv with a learnable signal
+    rng = np.random.default_rng(seed)
+    lags = rng.gamma(2.0, 40.0, size=(n_rows, 3))
+    df = pd.DataFrame(lags, columns=FEATURES[:3])
+    df['momentum_yoy'] = df['pts_lag_1'] - df['pts_lag_2']
+    df['career_volatility'] = rng.gamma(2.0, 10.0, size=n_rows)
+    df['target'] = 0.6 * df['pts_lag_1'] + 0.3 * df['pts_lag_2'] + rng.normal(0, 15, size=n_rows)
+    return df
+
+
+def run_ensemble_benchmark():
+    cores = os.cpu_count() or 1
+    df = make_supervised(N_ROWS)
+    split = int(N_ROWS * 0.8)
+    train, val = df.iloc[:split], df.iloc[split:]
+
+    # (workers, threads_per_model): the old serial n_jobs=-1 loop first, then parallel budgets
+    configs = [(1, cores), thread_budget(len(ENSEMBLE_SEEDS)), (max(1, cores // 2), 2)]
+    print(f"{len(ENSEMBLE_SEEDS)} seeds, {N_ROWS:,} rows, {cores} cores")
+    print(f"{'workers':>8} {'threads':>8} {'wall(s)':>8} {'cpu(s)':>8} {'util':>6}")
+    for workers, threads in dict.fromkeys(configs):
+        _, stats = fit_seed_ensemble(train[FEATURES], train['target'], val[FEATURES], val['target'],
+                                     ENSEMBLE_PARAMS, ENSEMBLE_SEEDS, workers=workers, threads_per_model=threads)
+        print(f"{stats['workers']:>8} {stats['threads_per_model']:>8} {stats['wall_seconds']:>8.2f} "
+              f"{stats['cpu_seconds']:>8.2f} {stats['cpu_utilisation']:>6.0%}")
+
+
+if __name__ == "__main__":
+    run_ensemble_benchmark()
@@ -0,0 +1,59 @@
+# Benchmark: batch Glicko-2 engine throughput at tens of thousands of players and hundreds of
+# events per season, plus a check against Glickman's worked example.
+# Run from the repo root:  python -m scripts.benchmarks.bench_glicko
+
+import time
+
+import numpy as np
+
+from scripts.modeling.glicko_engine import GLICKO_SCALE, g, glicko2_step, run_glicko_engine
+
+SIZES = [(10_000, 100, 64), (50_000, 300, 128)]    # (players, events per season, field size)
+N_SEASONS = 3
+
+
+def check_glickman_example():
+    """Glickman (2013), section 5: 1500/200/0.06 beats 1400/30, loses to 1550/100 and 1700/300."""
+    mu, phi, sigma = np.array([0.0]), np.array([200 / GLICKO_SCALE]), np.array([0.06])
+    opp_mu = (np.array([1400.0, 1550.0, 1700.0]) - 1500) / GLICKO_SCALE
+    opp_g = g(np.array([30.0, 100.0, 300.0]) / GLICKO_SCALE)
+    expected = 1 / (1 + np.exp(-opp_g * (mu[0] - opp_mu)))
+    info = np.array([(opp_g ** 2 * expected * (1 - expected)).sum()])
+    score = np.array([(opp_g * (np.array([1.0, 0.0, 0.0]) - expected)).sum()])
+    mu, phi, sigma = glicko2_step(mu, phi, sigma, info, score, tau=0.5)
+    result = (mu[0] * GLICKO_SCALE + 1500, phi[0] * GLICKO_SCALE, sigma[0])
+    assert np.allclose(result, (1464.06, 151.52, 0.05999), atol=0.01), result
+    print(f"Glickman example: rating {result[0]:.2f}, RD {result[1]:.2f}, volatility {result[2]:.5f} (matches)")
+
+
+def make_events(n_players, events_per_season, field, seed=42):
+    """Each event draws `field` distinct players; points follow a latent skill plus noise."""
+    rng = np.random.default_rng(seed)
+    skill = rng.normal(0, 1, n_players)
+    n_events = events_per_season * N_SEASONS
+    player_idx = np.concatenate([rng.choice(n_players, field, replace=False) for _ in range(n_events)])
+    events = np.repeat(np.arange(n_events), field)
+    years = 2000 + events // events_per_season
+    points = np.round(30 * np.exp(skill[player_idx] + rng.normal(0, 0.7, len(player_idx))))
+    return player_idx, years, events.astype(str), points, skill
+
+
+def run_glicko_benchmark():
+    check_glickman_example()
+    for n_players, per_season, field in SIZES:
+        player_idx, years, events, points, skill = make_events(n_players, per_season, field)
+        for period in ('tournament', 'season'):
+            start = time.perf_counter()
+            rating, rd, volatility = run_glicko_engine(player_idx, years, events, points,
+                                                       n_players=n_players, period=period)
+            elapsed = time.perf_counter() - start
+            seen = rd < 350
+            corr = np.corrcoef(rating[seen], skill[seen])[0, 1]
+            print(f"{n_players:,} players, {per_season} events/season x {N_SEASONS} seasons, field {field}, "
+                  f"per {period}: {elapsed:.2f}s ({per_season * N_SEASONS / elapsed:,.0f} events/s, "
+                  f"{len(player_idx) / elapsed:,.0f} entries/s); corr(rating, skill) {corr:.2f}, "
+                  f"median RD {np.median(rd[seen]):.0f}")
+
+
+if __name__ == "__main__":
+    run_glicko_benchmark()
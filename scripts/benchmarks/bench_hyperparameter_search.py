@@ -0,0 +1,52 @@
+# Benchmark: successive halving vs scoring every candidate at the full round budget, on
+# synthetic walk-forward folds. Same candidates, same folds; reports wall time and the best MAE.
+# Run from the repo root:  python -m scripts.benchmarks.bench_hyperparameter_search
+
+import shutil
+import tempfile
+import time
+
+import numpy as np
+
+from scripts.benchmarks.bench_sliding_window import make_master
+from scripts.feature_engineering.sliding_window import build_supervised_dataset
+from scripts.modeling.backtest import cached_fold_path, fold_years
+from scripts.modeling.hyperparameter_search import (_init_worker, evaluate_config, loss, sample_configs,
+                                                    successive_halving)
+
+N_PLAYERS, N_SEASONS = 5_000, 6
+CANDIDATES = 27
+MIN_ROUNDS, MAX_ROUNDS = 25, 675     # three halvings at ETA = 3
+
+
+def run_hyperparameter_search_benchmark():
+    supervised = build_supervised_dataset(make_master(N_PLAYERS, N_SEASONS))
+    cache_dir = tempfile.mkdtemp()
+    try:
+        years = fold_years(supervised)
+        _init_worker([cached_fold_path(supervised, year, cache_dir=cache_dir) for year in years], threads=1)
+        configs = sample_configs(CANDIDATES, np.random.default_rng(0))
+        print(f"{len(supervised):,} supervised rows, {len(years)} folds, {CANDIDATES} candidates")
+
+        def evaluate(batch, rounds):
+            return [evaluate_config(c, rounds) for c in batch]
+
+        start = time.perf_counter()
+        history = successive_halving(configs, MIN_ROUNDS, MAX_ROUNDS, evaluate)
+        halving = time.perf_counter() - start
+        best_halving = min(h['mae'] for h in history if h['rounds'] >= MAX_ROUNDS)
+
+        start = time.perf_counter()
+        full = evaluate(configs, MAX_ROUNDS)
+        brute = time.perf_counter() - start
+        best_full = min(full, key=lambda r: loss(r, 'mae'))['mae']
+
+        print(f"Successive halving: {len(history)} evaluations in {halving:.1f}s, best MAE {best_halving}")
+        print(f"Full budget for all: {CANDIDATES} evaluations in {brute:.1f}s, best MAE {best_full} "
+              f"({brute / halving:.1f}x slower)")
+    finally:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    run_hyperparameter_search_benchmark()
@@ -0,0 +1,48 @@
+# Benchmark: page-parallel PDF ingestion (cold cache, warm cache) and parity with the CSV mapping.
+# Run from the repo root:  python -m scripts.benchmarks.bench_pdf_ingestion
+
+import os
+import tempfile
+import time
+
+from scripts.benchmarks.synthetic_ttfi import generate_ttfi_dataset, write_season_pdf
+from scripts.mapping.header_mapping import map_raw_file
+from scripts.mapping.pdf_ingestion import ingest_pdfs
+
+N_PLAYERS = 1500
+N_SEASONS = 2
+N_TOURNAMENTS = 4
+ROWS_PER_PAGE = 40
+
+
+def run_pdf_benchmark():
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_paths = generate_ttfi_dataset(os.path.join(tmp, "csv"), N_PLAYERS, N_SEASONS, N_TOURNAMENTS)
+        os.makedirs(os.path.join(tmp, "pdf"))
+        pdf_paths = [write_season_pdf(p, os.path.join(tmp, "pdf", os.path.basename(p)[:-4] + ".pdf"), ROWS_PER_PAGE)
+                     for p in csv_paths]
+
+        results = {}
+        for label, workers, cache in [("1 process, cold", 1, "cache_serial"),
+                                      ("process pool, cold", None, "cache_pool"),
+                                      ("process pool, warm", None, "cache_pool")]:
+            start = time.perf_counter()
+            frames = ingest_pdfs(pdf_paths, workers, os.path.join(tmp, cache))
+            results[label] = time.perf_counter() - start
+
+        # The PDF path must reproduce the CSV mapping of the same season
+        for csv_path, pdf_frame in zip(csv_paths, frames):
+            expected = map_raw_file(csv_path).astype(str).reset_index(drop=True)
+            assert expected.equals(pdf_frame.astype(str).reset_index(drop=True)), \
+                f"PDF ingestion diverged from the CSV mapping for {os.path.basename(csv_path)}"
+
+        n_pages = sum(len(os.listdir(os.path.join(tmp, "cache_pool", d))) - 1
+                      for d in os.listdir(os.path.join(tmp, "cache_pool")))
+
+    print(f"\n{len(pdf_paths)} PDFs, {n_pages} pages, {sum(len(f) for f in frames):,} long entries (matches CSV mapping):")
+    for label, seconds in results.items():
+        print(f"  {label:<20}: {seconds:7.2f}s  {n_pages / seconds:>8.1f} pages/s")
+
+
+if __name__ == "__main__":
+    run_pdf_benchmark()
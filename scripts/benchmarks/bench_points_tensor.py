@@ -0,0 +1,71 @@
+# Benchmark: points tensor build and memory-mapped load vs re-aggregating the long frame,
+# slice latency, and the player features computed from the tensor vs from the long frame,
+# at tens of thousands of players x decades of seasons.
+# Run from the repo root:  python -m scripts.benchmarks.bench_points_tensor
+
+import os
+import shutil
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from scripts.benchmarks.bench_sliding_window import make_master
+from scripts.feature_engineering.extract_features import compute_player_features, compute_player_features_from_tensor
+from scripts.storage.points_tensor import (load_points_tensor, player_points, season_points,
+                                           season_totals_frame, write_points_tensor)
+
+SIZES = [(10_000, 10), (50_000, 30)]    # (players, seasons)
+TOURNAMENTS = ['Senior Nationals', 'Zonal', 'State Open']
+VENUES = ['Delhi', 'Pune', 'Indore']
+SLICES = 1000
+
+
+def _timed(fn):
+    start = time.perf_counter()
+    out = fn()
+    return out, time.perf_counter() - start
+
+
+def run_points_tensor_benchmark():
+    tmp = tempfile.mkdtemp()
+    try:
+        for n_players, n_seasons in SIZES:
+            df = make_master(n_players, n_seasons)
+            df['tournament_name'] = pd.Categorical(np.resize(TOURNAMENTS, len(df)))
+            df['a1_location'] = np.resize(VENUES, len(df))
+            df['a2_date'] = (df['season_year'].astype(str) + "-06-01").to_numpy()
+            out_dir = os.path.join(tmp, f"tensor_{n_players}")
+
+            _, build = _timed(lambda: write_points_tensor(df, out_dir))
+            pt, load = _timed(lambda: load_points_tensor(out_dir, csv_path=os.path.join(tmp, "missing.csv")))
+            _, pivot = _timed(lambda: df.groupby(['ttfi_id', 'season_year'])['total_seasonal_points']
+                              .max().unstack())
+            _, view = _timed(lambda: season_totals_frame(pt))
+
+            rng = np.random.default_rng(0)
+            ids = rng.choice(pt['ids'], SLICES)
+            _, per_player = _timed(lambda: [np.nansum(player_points(pt, i)) for i in ids])
+            years = rng.choice(pt['seasons'], SLICES)
+            _, per_season = _timed(lambda: [season_points(pt, y) for y in years])
+
+            reference_year = int(pt['seasons'][-1])
+            expected, frame_t = _timed(lambda: compute_player_features(df, reference_year=reference_year))
+            features, tensor_t = _timed(lambda: compute_player_features_from_tensor(pt, reference_year=reference_year))
+
+            # The tensor holds exactly the master's points, and its features match the long-frame ones
+            assert np.isclose(np.nansum(pt['points'], dtype=float), df['points_earned'].sum())
+            pd.testing.assert_frame_equal(expected.reset_index(drop=True), features, check_dtype=False)
+
+            print(f"{n_players:,} players x {n_seasons} seasons ({len(df):,} rows), tensor {pt['points'].shape}: "
+                  f"build {build:.2f}s, mmap load {load * 1e3:.0f} ms, totals view {view * 1e3:.1f} ms "
+                  f"(groupby pivot {pivot * 1e3:.0f} ms); player slice {per_player / SLICES * 1e6:.1f} us, "
+                  f"season slice {per_season / SLICES * 1e6:.1f} us; features {tensor_t:.2f}s "
+                  f"(long frame {frame_t:.2f}s)")
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    run_points_tensor_benchmark()
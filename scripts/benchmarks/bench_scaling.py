@@ -0,0 +1,147 @@
+# End-to-end scaling benchmark: every pipeline stage on synthetic TTFI data at 1x, 10x and 100x.
+# Each stage runs in a fresh process so its wall time and peak RSS are its own.
+# Run from the repo root:
+#   python -m scripts.benchmarks.bench_scaling                    # compare against the saved baseline
+#   python -m scripts.benchmarks.bench_scaling --save-baseline    # record a new baseline
+#   python -m scripts.benchmarks.bench_scaling --scales 1 10 --stages mapping elo
+
+import argparse
+import contextlib
+import importlib
+import json
+import multiprocessing as mp
+import os
+import platform
+import queue as queue_module
+import resource
+import tempfile
+import time
+
+from scripts.benchmarks.synthetic_ttfi import generate_ttfi_dataset
+
+# Configuration
+BASELINE_FILE = "data/benchmarks/scaling_baseline.json"
+SCALES = [1, 10, 100]
+# 1x is roughly the real dataset: ~300 ranked players, 5 seasons, 2 events per season
+BASE_PLAYERS = 300
+N_SEASONS = 5
+N_TOURNAMENTS = 2
+
+STAGES = [
+    ("mapping", "scripts.mapping.header_mapping:run_mapping_pipeline", {}),
+    ("features", "scripts.feature_engineering.extract_features:run_advanced_feature_pipeline", {}),
+    ("sliding_window", "scripts.feature_engineering.sliding_window:create_advanced_sliding_window", {}),
+    ("ensemble", "scripts.modeling.train_xgboost_ensemble:run_ensemble_scouting_report", {}),
+    ("clustering", "scripts.modeling.player_clustering:run_player_clustering", {}),
+    # The default 'sequential' mode is the O(n^2) legacy loop kept for parity; at 100x only the
+    # batched mode is practical, so that is what this stage measures
+    ("elo", "scripts.modeling.elo_rating_system:run_elo_simulation", {'incremental': False, 'mode': 'simultaneous'}),
+    ("survival", "scripts.modeling.survival_analysis:run_survival_analysis", {}),
+]
+
+
+def _peak_rss_mb():
+    # ru_maxrss is KiB on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if platform.system() == "Darwin" else peak / 1024
+
+
+def _stage_worker(target, kwargs, workdir, queue):
+    """Runs one stage inside `workdir` (so relative data/ paths point at the synthetic tree)."""
+    try:
+        os.chdir(workdir)
+        module_name, func_name = target.split(':')
+        func = getattr(importlib.import_module(module_name), func_name)
+        import_rss = _peak_rss_mb()
+        start = time.perf_counter()
+        with open(os.devnull, "w") as sink, contextlib.redirect_stdout(sink):
+            func(**kwargs)
+        queue.put({'seconds': round(time.perf_counter() - start, 3),
+                   'peak_rss_mb': round(_peak_rss_mb(), 1),
+                   'stage_rss_mb': round(_peak_rss_mb() - import_rss, 1)})
+    except Exception as e:
+        queue.put({'error': f"{type(e).__name__}: {e}"})
+
+
+def run_stage_isolated(target, kwargs, workdir):
+    ctx = mp.get_context("spawn")
+    queue = ctx.Queue()
+    proc = ctx.Process(target=_stage_worker, args=(target, kwargs, workdir, queue))
+    proc.start()
+    # A worker that dies without reporting (killed, or an error outside the try) must not hang us
+    while True:
+        try:
+            result = queue.get(timeout=1)
+            break
+        except queue_module.Empty:
+            if not proc.is_alive():
+                result = {'error': f"worker exited with code {proc.exitcode} without a result"}
+                break
+    proc.join()
+    return result
+
+
+def run_scale(scale, stages, seed=42):
+    """Generates the synthetic tree for one scale factor and times every stage on it."""
+    results = {}
+    with tempfile.TemporaryDirectory() as workdir:
+        raw_dir = os.path.join(workdir, "data", "raw")
+        start = time.perf_counter()
+        generate_ttfi_dataset(raw_dir, BASE_PLAYERS * scale, N_SEASONS, N_TOURNAMENTS, seed=seed)
+        print(f"\n[{scale}x] {BASE_PLAYERS * scale:,} players generated in {time.perf_counter() - start:.1f}s")
+
+        for name, target, kwargs in stages:
+            results[name] = run_stage_isolated(target, kwargs, workdir)
+            r = results[name]
+            if 'error' in r:
+                print(f"  {name:<15} FAILED  {r['error']}")
+            else:
+                print(f"  {name:<15} {r['seconds']:>8.2f}s  peak {r['peak_rss_mb']:>8.1f} MB  (+{r['stage_rss_mb']:.1f} MB)")
+    return results
+
+
+def compare_to_baseline(current, baseline):
+    print("\n--- Change vs. baseline (time ratio / peak-RSS ratio, >1 = slower/bigger) ---")
+    for scale, stages in current.items():
+        for name, r in stages.items():
+            b = baseline.get(scale, {}).get(name)
+            if not b or 'error' in r or 'error' in b:
+                continue
+            t_ratio = r['seconds'] / b['seconds'] if b['seconds'] else float('nan')
+            m_ratio = r['peak_rss_mb'] / b['peak_rss_mb'] if b['peak_rss_mb'] else float('nan')
+            flag = "  <-- regression" if t_ratio > 1.25 or m_ratio > 1.25 else ""
+            print(f"  [{scale}x] {name:<15} time x{t_ratio:5.2f}   memory x{m_ratio:5.2f}{flag}")
+
+
+def run_scaling_benchmark(scales=SCALES, stage_names=None, save_baseline=False, baseline_file=BASELINE_FILE):
+    stages = [s for s in STAGES if not stage_names or s[0] in stage_names]
+    current = {str(scale): run_scale(scale, stages) for scale in scales}
+
+    if os.path.exists(baseline_file):
+        with open(baseline_file) as f:
+            compare_to_baseline(current, json.load(f)['results'])
+
+    if save_baseline:
+        os.makedirs(os.path.dirname(baseline_file), exist_ok=True)
+        with open(baseline_file, "w") as f:
+            json.dump({
+                'recorded_at': time.strftime('%Y-%m-%d %H:%M:%S'),
+                'machine': {'cpus': os.cpu_count(), 'platform': platform.platform(), 'python': platform.python_version()},
+                'base': {'players': BASE_PLAYERS, 'seasons': N_SEASONS, 'tournaments': N_TOURNAMENTS},
+                'results': current,
+            }, f, indent=2)
+        print(f"\nSUCCESS: Baseline saved to {baseline_file}")
+    return current
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Per-stage scaling benchmark on synthetic TTFI data.")
+    parser.add_argument("--scales", nargs="+", type=int, default=SCALES)
+    parser.add_argument("--stages", nargs="+", choices=[s[0] for s in STAGES], default=None)
+    parser.add_argument("--save-baseline", action="store_true", help=f"Write the results to {BASELINE_FILE}")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    run_scaling_benchmark(args.scales, args.stages, args.save_baseline)
@@ -0,0 +1,105 @@
+# Benchmark: request latency of the scouting service on localhost with synthetic artifacts,
+# plus a hot-reload check (only the rewritten artifact is reloaded).
+# Run from the repo root:  python -m scripts.benchmarks.bench_scouting_service
+
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+import urllib.request
+
+import numpy as np
+import pandas as pd
+
+from scripts.service.scouting_service import ARTIFACTS, make_server
+
+N_PLAYERS = 50_000
+N_REQUESTS = 2000
+ARCHETYPES = ["Elite Core", "Rising Star", "Wildcard / Giant Killer", "Steady Veteran"]
+
+
+def write_artifacts(insight_dir, n_players, seed=42):
+    """Synthetic report CSVs with the columns the pipeline writes."""
+    rng = np.random.default_rng(seed)
+    ids = 200000 + np.arange(n_players)
+    names = [f"Player {i}" for i in ids]
+    pts = rng.gamma(2, 40, n_players).round(1)
+    frames = {
+        'forecast': pd.DataFrame({'ttfi_id': ids, 'player_name': names, 'total_seasonal_points': pts,
+                                  'predicted_2026_points': (pts * rng.uniform(0.7, 1.4, n_players)).round(2),
+                                  'pts_lag_1': pts, 'momentum_yoy': rng.normal(0, 20, n_players)}),
+        'elo': pd.DataFrame({'ttfi_id': ids, 'player_name': names,
+                             'elo_rating': rng.normal(1500, 150, n_players).round(2)}),
+        'glicko': pd.DataFrame({'ttfi_id': ids, 'player_name': names,
+                                'glicko_rating': rng.normal(1500, 150, n_players).round(2),
+                                'rating_deviation': rng.uniform(50, 350, n_players).round(2)})
+                    .assign(conservative_rating=lambda d: d['glicko_rating'] - 2 * d['rating_deviation']),
+        'clusters': pd.DataFrame({'ttfi_id': ids, 'player_name': names, 'total_pts': pts,
+                                  'archetype': rng.choice(ARCHETYPES, n_players)}),
+        'longevity': pd.DataFrame({'ttfi_id': ids, 'player_name': names,
+                                   'survival_prob_at_current_age': rng.uniform(0, 1, n_players)}),
+    }
+    for name, frame in frames.items():
+        frame.to_csv(os.path.join(insight_dir, ARTIFACTS[name][0]), index=False)
+    return ids
+
+
+def _get(base, path):
+    with urllib.request.urlopen(base + path) as response:
+        return json.loads(response.read())
+
+
+def _latency(base, paths):
+    times = []
+    for path in paths:
+        start = time.perf_counter()
+        _get(base, path)
+        times.append(time.perf_counter() - start)
+    times = np.array(times) * 1e3
+    return np.percentile(times, 50), np.percentile(times, 99)
+
+
+def run_scouting_service_benchmark():
+    insight_dir = tempfile.mkdtemp()
+    try:
+        ids = write_artifacts(insight_dir, N_PLAYERS)
+        start = time.perf_counter()
+        server = make_server(port=0, insight_dir=insight_dir)
+        print(f"{N_PLAYERS:,} players x {len(ARTIFACTS)} artifacts loaded in {time.perf_counter() - start:.2f}s")
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        base = f"http://127.0.0.1:{server.server_address[1]}"
+
+        rng = np.random.default_rng(0)
+        queries = {
+            'player lookup': [f"/players/{i}" for i in rng.choice(ids, N_REQUESTS)],
+            'forecast detail': [f"/forecast/{i}" for i in rng.choice(ids, N_REQUESTS)],
+            'top-10 leaderboard': [f"/leaderboard/{n}?k=10" for n in rng.choice(list(ARTIFACTS), N_REQUESTS)],
+            'archetype filter': [f"/archetypes/{a.replace(' ', '%20').replace('/', '%2F')}?k=25"
+                                 for a in rng.choice(ARCHETYPES, N_REQUESTS)],
+        }
+        for label, paths in queries.items():
+            p50, p99 = _latency(base, paths)
+            print(f"{label}: p50 {p50:.2f} ms, p99 {p99:.2f} ms over {len(paths)} requests")
+
+        # Hot reload: rewrite only the Elo ratings and wait out the change-check interval
+        cache = server.RequestHandlerClass.cache
+        before = dict(cache.tables)
+        elo_path = os.path.join(insight_dir, ARTIFACTS['elo'][0])
+        elo = pd.read_csv(elo_path)
+        elo.loc[elo['ttfi_id'] == ids[0], 'elo_rating'] = 9999.0
+        elo.to_csv(elo_path, index=False)
+        time.sleep(cache.reload_interval + 0.1)
+        assert _get(base, f"/players/{ids[0]}")['elo']['elo_rating'] == 9999.0
+        assert _get(base, "/leaderboard/elo?k=1")[0]['ttfi_id'] == ids[0]
+        reloaded = [name for name in ARTIFACTS if cache.tables[name] is not before[name]]
+        print(f"Hot reload: {', '.join(reloaded)} reloaded, the other artifacts kept their tables.")
+        server.shutdown()
+        server.server_close()
+    finally:
+        shutil.rmtree(insight_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    run_scouting_service_benchmark()
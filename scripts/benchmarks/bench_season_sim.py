@@ -0,0 +1,50 @@
+# Benchmark: Monte Carlo season simulator throughput vs. worker count, plus seed reproducibility.
+# Run from the repo root:  python -m scripts.benchmarks.bench_season_sim
+
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from scripts.modeling.season_simulator import simulate_seasons
+
+N_PLAYERS = [250, 2500]
+N_TOURNAMENTS = 6
+N_SEASONS = 20000
+
+
+def make_field(n_players, seed=42):
+    rng = np.random.default_rng(seed)
+    players = pd.DataFrame({
+        'ttfi_id': np.arange(n_players),
+        'player_name': [f"P{i}" for i in range(n_players)],
+        'elo_rating': rng.normal(1500, 150, n_players),
+        'latest_points': rng.gamma(2.0, 30.0, n_players).round(1),
+    })
+    players['latest_rank'] = players['latest_points'].rank(ascending=False, method='min').astype(int)
+    schedules = [np.sort(rng.choice([180, 120, 90, 60, 45, 30, 20, 10, 5], size=n_players // 2))[::-1].astype(float)
+                 for _ in range(N_TOURNAMENTS)]
+    entry_prob = rng.uniform(0.2, 0.9, size=(n_players, N_TOURNAMENTS))
+    return players, schedules, entry_prob
+
+
+def run_season_sim_benchmark():
+    worker_counts = sorted({1, 2, 4, os.cpu_count() or 1})
+    for n_players in N_PLAYERS:
+        players, schedules, entry_prob = make_field(n_players)
+        print(f"\n{n_players:,} players x {N_TOURNAMENTS} tournaments, {N_SEASONS:,} seasons:")
+        reference = None
+        for workers in worker_counts:
+            start = time.perf_counter()
+            summary = simulate_seasons(players, schedules, entry_prob, N_SEASONS, seed=7, workers=workers)
+            seconds = time.perf_counter() - start
+            if reference is None:
+                reference = summary
+            assert summary.equals(reference), "same seed gave different results on a different worker count"
+            print(f"  {workers} worker(s): {seconds:7.2f}s  {N_SEASONS / seconds:>10,.0f} seasons/s")
+    print(f"\n(Results identical across worker counts; this machine has {os.cpu_count()} CPU(s).)")
+
+
+if __name__ == "__main__":
+    run_season_sim_benchmark()
@@ -0,0 +1,67 @@
+# Benchmark: sliding-window builder at tens of thousands of players x decades of seasons,
+# plus a leakage check (a season's features must not change when later seasons change).
+# Run from the repo root:  python -m scripts.benchmarks.bench_sliding_window
+
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from scripts.feature_engineering.sliding_window import build_supervised_dataset
+
+SIZES = [(10_000, 10), (50_000, 30)]    # (players, seasons)
+ENTRIES_PER_SEASON = 3
+PARTICIPATION = 0.6                     # chance a player is ranked in a given season
+
+
+def make_master(n_players, n_seasons, seed=42):
+    """Long-format stand-in for the master dataset: ENTRIES_PER_SEASON results per ranked player-season."""
+    rng = np.random.default_rng(seed)
+    ranked = rng.random((n_players, n_seasons)) < PARTICIPATION
+    player_idx, season_idx = np.nonzero(ranked)
+    player_idx = np.repeat(player_idx, ENTRIES_PER_SEASON)
+    season_idx = np.repeat(season_idx, ENTRIES_PER_SEASON)
+    df = pd.DataFrame({
+        'season_year': (2000 + season_idx).astype(np.int16),
+        'ttfi_id': (200000 + player_idx).astype(np.int64),
+        'points_earned': rng.choice([0, 5, 10, 20, 45, 90], size=len(player_idx)).astype(float),
+    })
+    df['total_seasonal_points'] = df.groupby(['ttfi_id', 'season_year'])['points_earned'].transform('sum')
+    df['player_name'] = pd.Categorical(df['ttfi_id'].astype(str))
+    df['state_institution'] = pd.Categorical(np.array(['RBI', 'PSPB', 'BNG', 'MHR'])[player_idx % 4])
+    return df
+
+
+def check_no_leakage(df, cutoff):
+    """Features of season `cutoff` must not depend on seasons >= cutoff's results of later years."""
+    base = build_supervised_dataset(df)
+    shuffled = df.copy()
+    later = shuffled['season_year'] > cutoff
+    shuffled.loc[later, ['points_earned', 'total_seasonal_points']] *= 3
+    changed = build_supervised_dataset(shuffled)
+    features = [c for c in base.columns if c not in ('player_name', 'state_institution', 'total_seasonal_points')]
+    a = base[base['season_year'] == cutoff][features].reset_index(drop=True)
+    b = changed[changed['season_year'] == cutoff][features].reset_index(drop=True)
+    pd.testing.assert_frame_equal(a, b)
+
+
+def run_sliding_window_benchmark():
+    for n_players, n_seasons in SIZES:
+        df = make_master(n_players, n_seasons)
+        tracemalloc.start()
+        start = time.perf_counter()
+        supervised = build_supervised_dataset(df)
+        elapsed = time.perf_counter() - start
+        peak_mb = tracemalloc.get_traced_memory()[1] / 1e6
+        tracemalloc.stop()
+        print(f"{n_players:,} players x {n_seasons} seasons ({len(df):,} master rows): "
+              f"{len(supervised):,} supervised rows in {elapsed:.2f}s, peak {peak_mb:.0f} MB traced")
+
+    small = make_master(2_000, 8)
+    check_no_leakage(small, cutoff=2004)
+    print("Leakage check: season features are unchanged when later seasons change.")
+
+
+if __name__ == "__main__":
+    run_sliding_window_benchmark()
@@ -0,0 +1,54 @@
+# Benchmark: chunked win-probability matrix build (peak memory stays ~CHUNK_ROWS x N) and query latency.
+# Run from the repo root:  python -m scripts.benchmarks.bench_win_matrix
+
+import os
+import resource
+import tempfile
+import time
+import timeit
+
+import numpy as np
+import pandas as pd
+
+from scripts.modeling.win_probability import export_top_n, load_win_matrix, top_opponents, vs_field, win_probability
+
+N_PLAYERS = 20000
+TOP_N = [1000, 5000, 20000]
+N_QUERIES = 2000
+
+
+def run_win_matrix_benchmark():
+    rng = np.random.default_rng(42)
+    ratings = pd.DataFrame({
+        'ttfi_id': 200000 + np.arange(N_PLAYERS),
+        'player_name': [f"P{i}" for i in range(N_PLAYERS)],
+        'elo_rating': rng.normal(1500, 200, N_PLAYERS).round(2),
+    })
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in TOP_N:
+            out_dir = os.path.join(tmp, f"top{n}")
+            start = time.perf_counter()
+            export_top_n(ratings, n, out_dir)
+            build_t = time.perf_counter() - start
+            peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+            size_mb = os.path.getsize(os.path.join(out_dir, "matrix.npy")) / 1e6
+
+            wm = load_win_matrix(out_dir)
+            ids = wm['ids']
+            a, b = int(ids[n // 3]), int(ids[n // 2])
+            field = ids[rng.choice(n, 64, replace=False)].tolist()
+            timings = {
+                'pair': timeit.timeit(lambda: win_probability(wm, a, b), number=N_QUERIES),
+                'vs 64-player draw': timeit.timeit(lambda: vs_field(wm, a, field), number=N_QUERIES),
+                'vs whole field': timeit.timeit(lambda: vs_field(wm, a), number=N_QUERIES),
+                'top-5 opponents': timeit.timeit(lambda: top_opponents(wm, a, 5), number=N_QUERIES),
+            }
+            print(f"\nTop {n:,} players: {size_mb:,.0f} MB matrix built in {build_t:.2f}s (process peak RSS {peak:,.0f} MB)")
+            for name, seconds in timings.items():
+                print(f"  {name:<18}: {seconds / N_QUERIES * 1e6:8.1f} us/query")
+            del wm
+
+
+if __name__ == "__main__":
+    run_win_matrix_benchmark()
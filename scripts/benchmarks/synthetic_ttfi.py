@@ -0,0 +1,165 @@
+# Synthetic TTFI ranking files in the raw three-row header layout
+# (row 0 = venues, row 1 = dates, row 2 = column headers, then one row per player),
+# i.e. exactly what header_mapping.py and analyze_career_progression.py read.
+# write_season_pdf renders the same grid as a ruled PDF table for pdf_ingestion.py.
+#
+#   python -m scripts.benchmarks.synthetic_ttfi --players 3000 --seasons 5 --out data/raw_synthetic
+
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+# Configuration
+FIRST_SEASON = 2020
+# Points for finishing stages: winner, final, semis, quarters, last 16, 32, 64, 128, then participation
+STAGE_POINTS = [180, 120, 90, 60, 45, 30, 20, 10, 5]
+EVENT_KINDS = ["Senior National Championship", "Inter Institutional", "National Championship"]
+CITIES = ["Dehradun", "Shillong", "Jammu", "Haryana", "Vishakhapatnam", "Indore", "Panchkula", "Goa"]
+INSTITUTIONS = ["RBI", "PSPB", "RSPB", "AAI", "BNG", "MAH", "TN", "DEL", "WB", "TSTTA", "GUJ", "HAR"]
+# Name syllables: "SURNAME Given" names that look (and fuzzy-match) like the real lists
+SYLLABLES = ["ka", "ra", "vi", "sha", "an", "ni", "pri", "ya", "de", "su", "ma", "li", "go", "ta", "re",
+             "bha", "na", "ch", "ti", "ha", "mo", "je", "si", "ku", "dra", "po", "la", "va", "ri", "sa"]
+MONTHS = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
+
+
+def make_names(n, rng):
+    def words(n_syllables):
+        parts = rng.choice(SYLLABLES, size=(n, n_syllables))
+        return pd.Series(["".join(p) for p in parts])
+    return (words(3).str.upper() + " " + words(2).str.capitalize()).tolist()
+
+
+def make_players(n_players, rng, id_offset=0):
+    """Player pool with a latent skill, a career window and a home institution."""
+    return pd.DataFrame({
+        'ttfi_id': 200000 + id_offset + rng.permutation(n_players * 3)[:n_players],
+        'name': make_names(n_players, rng),
+        'institution': rng.choice(INSTITUTIONS, size=n_players),
+        'skill': rng.normal(0.0, 1.0, size=n_players),
+        'debut': rng.integers(-3, 4, size=n_players),     # season offset of the first ranked year
+        'career': rng.integers(2, 12, size=n_players),    # ranked seasons before dropping out
+    })
+
+
+def season_frame(players, season_idx, n_tournaments, rng, participation=0.6):
+    """One season's wide table: a points column per tournament plus total and position."""
+    active = players[(players['debut'] <= season_idx) & (season_idx < players['debut'] + players['career'])]
+    active = active.assign(skill=active['skill'] + rng.normal(0, 0.3, size=len(active)))
+
+    events = {}
+    for t in range(n_tournaments):
+        entered = rng.random(len(active)) < participation
+        form = active['skill'].to_numpy() + rng.normal(0, 0.7, size=len(active))
+        form[~entered] = -np.inf
+        # Finishing stage from the draw position: top 1, 2, 4, 8, ... share each stage's points
+        order = np.argsort(-form)
+        place = np.empty(len(active), dtype=int)
+        place[order] = np.arange(len(active))
+        stage = np.floor(np.log2(place + 1)).astype(int)
+        pts = np.take(STAGE_POINTS, np.minimum(stage, len(STAGE_POINTS) - 1)).astype(float)
+        pts[~entered] = np.nan
+        events[t] = pts
+
+    wide = pd.DataFrame(events, index=active.index)
+    total = wide.sum(axis=1, min_count=1)
+    keep = total.notna()
+    return active[keep], wide[keep], total[keep]
+
+
+def write_season_file(path, players, wide, total, year, event_names, rng):
+    """Writes one raw ranking CSV in the three-row header layout."""
+    n_events = wide.shape[1]
+    locations = ["", "", "", ""] + list(rng.choice(CITIES, size=n_events)) + ["", ""]
+    dates = ["", "", "", ""] + [
+        f"{d:02d} - {d + 6:02d}, {MONTHS[m]} {year}"
+        for d, m in zip(rng.integers(1, 20, size=n_events), rng.integers(0, 12, size=n_events))
+    ] + ["", ""]
+    headers = ["Sr.", "TTFI ID", "Name", "State/Inst."] + list(event_names) + ["Total Points", "Position"]
+
+    ranked = total.sort_values(ascending=False, kind='stable')
+    body = pd.DataFrame({
+        "Sr.": np.arange(1, len(ranked) + 1),
+        "TTFI ID": players.loc[ranked.index, 'ttfi_id'].to_numpy(),
+        "Name": players.loc[ranked.index, 'name'].to_numpy(),
+        "State/Inst.": players.loc[ranked.index, 'institution'].to_numpy(),
+    })
+    for i, col in enumerate(wide.columns):
+        body[event_names[i]] = wide.loc[ranked.index, col].to_numpy()
+    body["Total Points"] = ranked.to_numpy()
+    body["Position"] = ranked.rank(ascending=False, method='min').astype(int).to_numpy()
+
+    header_block = pd.DataFrame([locations, dates, headers], columns=body.columns)
+    pd.concat([header_block, body.astype(object)], ignore_index=True).to_csv(path, header=False, index=False)
+
+
+def write_season_pdf(csv_path, pdf_path, rows_per_page=40):
+    """Renders a raw ranking CSV as a ruled multi-page PDF table, the way TTFI publishes its lists.
+
+    Page 1 carries venues, dates and headers; later pages repeat only the header row.
+    """
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    from matplotlib.backends.backend_pdf import PdfPages
+
+    grid = pd.read_csv(csv_path, header=None, dtype=str).fillna("").values.tolist()
+    header_block, body = grid[:3], grid[3:]
+    with PdfPages(pdf_path) as pdf:
+        for start in range(0, max(len(body), 1), rows_per_page):
+            cells = (header_block if start == 0 else header_block[2:]) + body[start:start + rows_per_page]
+            fig = plt.figure(figsize=(11, 8.5))
+            ax = fig.add_axes([0.02, 0.02, 0.96, 0.96])
+            ax.axis('off')
+            table = ax.table(cellText=cells, loc='upper center', cellLoc='left')
+            table.auto_set_font_size(False)
+            table.set_fontsize(5)
+            table.auto_set_column_width(list(range(len(cells[0]))))
+            pdf.savefig(fig)
+            plt.close(fig)
+    return pdf_path
+
+
+def generate_ttfi_dataset(out_dir, n_players=300, n_seasons=5, n_tournaments=2, categories=None, seed=42):
+    """Writes TTFI_FINAL_RANKING_<year>[_<category>].csv files and returns their paths.
+
+    Every category gets its own player pool (disjoint ids) and its own event names,
+    so categories never share a (season_year, tournament_name) event.
+    """
+    rng = np.random.default_rng(seed)
+    categories = categories or [None]
+    os.makedirs(out_dir, exist_ok=True)
+
+    paths = []
+    for c, category in enumerate(categories):
+        players = make_players(n_players, rng, id_offset=c * n_players * 3)
+        for s in range(n_seasons):
+            year = FIRST_SEASON + s
+            event_names = [f"{EVENT_KINDS[t % len(EVENT_KINDS)]} {t // len(EVENT_KINDS) + 1}" if t >= len(EVENT_KINDS)
+                           else EVENT_KINDS[t] for t in range(n_tournaments)]
+            if category:
+                event_names = [f"{name} ({category})" for name in event_names]
+            active, wide, total = season_frame(players, s, n_tournaments, rng)
+            suffix = f"_{category}" if category else ""
+            path = os.path.join(out_dir, f"TTFI_FINAL_RANKING_{year}{suffix}.csv")
+            write_season_file(path, active, wide, total, year, event_names, rng)
+            paths.append(path)
+    return paths
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Generate synthetic raw TTFI ranking CSVs.")
+    parser.add_argument("--players", type=int, default=300, help="Player pool size per category")
+    parser.add_argument("--seasons", type=int, default=5)
+    parser.add_argument("--tournaments", type=int, default=2, help="Tournaments per season")
+    parser.add_argument("--categories", nargs="*", default=None, help="e.g. MS WS U19B")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--out", default="data/raw_synthetic")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    files = generate_ttfi_dataset(args.out, args.players, args.seasons, args.tournaments, args.categories, args.seed)
+    print(f"SUCCESS: {len(files)} synthetic ranking files written to {args.out}/")
@@ -0,0 +1,123 @@
+# Unified command line for the pipeline.
+# Every subcommand names its entry points as 'package.module:function' (like the stage targets
+# in main_scouting_Report_2026) and imports them only when it runs, so `--help` and the light
+# commands never load xgboost, sklearn, seaborn or matplotlib.
+#
+#   python -m scripts.cli ingest
+#   python -m scripts.cli elo --mode rank
+#   python -m scripts.cli survival --bootstrap 500 --workers 1
+#   python -m scripts.cli report --only report
+#
+# IMPORT_BUDGETS are the measured `-X importtime` ceilings per subcommand; check them with
+# python -m scripts.benchmarks.bench_cli_startup
+
+import argparse
+import importlib
+import sys
+
+# name: (help, entry points run in order)
+COMMANDS = {
+    'ingest': ("Map the raw ranking lists (CSV and PDF) into the master dataset",
+               ["scripts.main:main"]),
+    'features': ("Player features and the supervised sliding-window dataset",
+                 ["scripts.feature_engineering.extract_features:run_advanced_feature_pipeline",
+                  "scripts.feature_engineering.sliding_window:create_advanced_sliding_window"]),
+    'forecast': ("10-seed XGBoost ensemble forecast for 2026",
+                 ["scripts.modeling.train_xgboost_ensemble:run_ensemble_scouting_report"]),
+    'tune': ("Hyperband search for the forecaster's XGBoost hyperparameters",
+             ["scripts.modeling.hyperparameter_search:run_hyperparameter_search"]),
+    'elo': ("Replay every tournament through the Elo engine",
+            ["scripts.modeling.elo_rating_system:run_elo_simulation"]),
+    'glicko': ("Glicko-2 ratings with deviation and volatility (batch rating periods)",
+               ["scripts.modeling.elo_rating_system:run_glicko_simulation"]),
+    'cluster': ("Player archetypes (mini-batch k-means)",
+                ["scripts.modeling.player_clustering:run_player_clustering"]),
+    'survival': ("Stratified Kaplan-Meier career longevity",
+                 ["scripts.modeling.survival_analysis:run_survival_analysis"]),
+    'report': ("Run the cached stage graph and build Scouting_Report_2026.pdf",
+               ["scripts.main_scouting_Report_2026:run_scouting_pipeline"]),
+}
+
+# Seconds of import time (python -X importtime, cumulative over the entry modules) per
+# subcommand. Measured on one core; pandas alone is ~0.6s of the light commands.
+IMPORT_BUDGETS = {
+    'cli': 0.05,
+    'ingest': 1.0,
+    'features': 1.5,
+    'forecast': 3.0,
+    'tune': 3.0,
+    'elo': 1.0,
+    'glicko': 1.0,
+    'cluster': 3.5,
+    'survival': 2.0,
+    'report': 0.3,
+}
+
+
+def add_command_arguments(name, parser):
+    """Subcommand flags. Defaults are None so the entry point's own defaults apply."""
+    if name == 'elo':
+        parser.add_argument("--mode", choices=['simultaneous', 'sequential', 'rank'])
+        parser.add_argument("--full", dest='incremental', action='store_const', const=False,
+                            help="Replay every event instead of resuming from the Elo ledger")
+        parser.add_argument("--full-matrix", action='store_const', const=True,
+                            help="Export the win-probability matrix for every player, not just the top ones")
+    elif name == 'glicko':
+        parser.add_argument("--period", choices=['tournament', 'season'],
+                            help="Rating period: one tournament (default) or one whole season")
+    elif name == 'tune':
+        parser.add_argument("--mode", choices=['hyperband', 'halving'])
+        parser.add_argument("--metric", choices=['mae', 'spearman'])
+        parser.add_argument("--candidates", type=int, help="Starting configurations for --mode halving")
+        parser.add_argument("--max-rounds", type=int)
+        parser.add_argument("--workers", type=int)
+        parser.add_argument("--seed", type=int)
+    elif name == 'cluster':
+        parser.add_argument("--refit", action='store_const', const=True,
+                            help="Re-cluster instead of reusing the saved centroids")
+        parser.add_argument("--workers", type=int)
+    elif name == 'survival':
+        parser.add_argument("--top-n", type=int)
+        parser.add_argument("--bootstrap", dest='n_boot', type=int, help="Replicates (0 = no bands)")
+        parser.add_argument("--seed", type=int)
+        parser.add_argument("--workers", type=int)
+    elif name == 'report':
+        parser.add_argument("--only", nargs="+", metavar="STAGE", help="Run only these stages")
+        parser.add_argument("--force", nargs="+", metavar="STAGE",
+                            help="Re-run these stages even if their inputs are unchanged ('all' for every stage)")
+        parser.add_argument("--workers", type=int, help="Process pool size (1 = run serially)")
+        parser.add_argument("--profile", action='store_const', const=True,
+                            help="Capture a cProfile dump for every executed stage")
+
+
+def entry_modules(name):
+    return [target.split(':')[0] for target in COMMANDS[name][1]]
+
+
+def run_command(name, **kwargs):
+    """Imports the subcommand's entry points and calls them in order."""
+    result = None
+    for target in COMMANDS[name][1]:
+        module_name, func_name = target.split(':')
+        func = getattr(importlib.import_module(module_name), func_name)
+        result = func(**kwargs)
+    return result
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m scripts.cli",
+                                     description="Table tennis analytics pipeline.")
+    subparsers = parser.add_subparsers(dest='command', required=True, metavar="COMMAND")
+    for name, (help_text, _) in COMMANDS.items():
+        add_command_arguments(name, subparsers.add_parser(name, help=help_text, description=help_text))
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    kwargs = {k: v for k, v in vars(args).items() if k != 'command' and v is not None}
+    run_command(args.command, **kwargs)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
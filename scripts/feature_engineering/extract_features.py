@@ -5,13 +5,168 @@ import matplotlib
 matplotlib.use('Agg') 
 import matplotlib.pyplot as plt
 import os
+import sys
+
+# Repo root on the path, so `python scripts/feature_engineering/extract_features.py` finds the scripts package too
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if ROOT_DIR not in sys.path:
+    sys.path.append(ROOT_DIR)
+
+from scripts.storage.points_tensor import load_points_tensor
+from scripts.visualization.chart_renderer import chart, render_charts
 
 # Configuration
 INPUT_FILE = "data/processed/master_long_dataset.csv"
 OUTPUT_CSV = "data/processed/features_master.csv"
 OUTPUT_DIR = "data/insights"
 
-def run_advanced_feature_pipeline():
+DECAY_FACTOR = 0.8
+REFERENCE_YEAR = 2024
+# Tournament-tier multipliers for the pressure score: first name substring that matches wins
+TIER_WEIGHTS = {'Senior': 2.0}
+
+def tournament_weights(tournament_names, tier_weights=TIER_WEIGHTS):
+    """Tier multiplier per row, resolved once per distinct tournament name."""
+    names = pd.Series(tournament_names).astype(str)
+    lookup = {}
+    for name in names.unique():
+        lookup[name] = next((w for key, w in tier_weights.items() if key in name), 1.0)
+    return names.map(lookup).to_numpy(dtype=float)
+
+def compute_player_features(df, decay_factor=DECAY_FACTOR, tier_weights=TIER_WEIGHTS,
+                            reference_year=REFERENCE_YEAR, top_n=None):
+    """Momentum, volatility, pressure and institution for every player ranked in `reference_year`.
+
+    One grouped pass per feature over the whole frame; only seasons up to the reference
+    year are used. `top_n` optionally keeps just the highest-ranked players.
+    """
+    history = df[df['season_year'] <= reference_year]
+    latest_season = history[history['season_year'] == reference_year]
+
+    # Population: everyone ranked in the reference season, ordered by seasonal aggregate
+    player_totals = latest_season.groupby('ttfi_id').agg(
+        player_name=('player_name', 'first'),
+        institution=('state_institution', 'first'),
+        total_pts=('total_seasonal_points', 'max'),
+    ).sort_values('total_pts', ascending=False, kind='stable')
+    if top_n is not None:
+        player_totals = player_totals.head(top_n)
+    history = history[history['ttfi_id'].isin(player_totals.index)]
+
+    # FEATURE 1: Decay-Weighted Momentum
+    yearly_sums = history.groupby(['ttfi_id', 'season_year'])['points_earned'].sum().reset_index()
+    yearly_sums['weighted'] = yearly_sums['points_earned'] * decay_factor ** (reference_year - yearly_sums['season_year'])
+    momentum = yearly_sums.groupby('ttfi_id')['weighted'].sum()
+
+    # FEATURE 2: Volatility (Consistency)
+    # Using ALL historical points for statistical stability (std is NaN below 2 entries)
+    volatility = history.groupby('ttfi_id')['points_earned'].std()
+
+    # FEATURE 3: Weighted Pressure Score (tier-weighted reference-season points)
+    latest_season = latest_season[latest_season['ttfi_id'].isin(player_totals.index)]
+    weighted = latest_season['points_earned'].to_numpy() * tournament_weights(latest_season['tournament_name'], tier_weights)
+    pressure = pd.Series(weighted, index=latest_season['ttfi_id'].to_numpy()).groupby(level=0).sum()
+
+    features_df = pd.DataFrame({
+        'ttfi_id': player_totals.index,
+        'player_name': player_totals['player_name'].astype(str).to_numpy(),
+        'institution': player_totals['institution'].astype(str).to_numpy(),
+        'momentum_score': momentum.reindex(player_totals.index).round(2).to_numpy(),
+        'volatility_index': volatility.reindex(player_totals.index).round(2).to_numpy(),
+        'pressure_score': pressure.reindex(player_totals.index).fillna(0).to_numpy(),
+        'total_pts': player_totals['total_pts'].to_numpy(),
+    })
+    return features_df
+
+def compute_player_features_from_tensor(pt, decay_factor=DECAY_FACTOR, tier_weights=TIER_WEIGHTS,
+                                        reference_year=REFERENCE_YEAR, top_n=None):
+    """compute_player_features on the memory-mapped points tensor (see scripts.storage.points_tensor).
+
+    Only the population's rows up to the reference season are read from the tensor; momentum,
+    volatility and pressure are reductions over its season and tournament-slot axes.
+    """
+    # Population: everyone ranked in the reference season, ordered by seasonal aggregate
+    labels = pt['player_seasons']
+    labels = labels[labels['season_year'] == reference_year]
+    c_ref = reference_year - int(pt['seasons'][0])
+    rows = np.array([pt['index'][pid] for pid in labels['ttfi_id'].tolist()], dtype=np.int64)
+    totals = np.asarray(pt['season_totals'][rows, c_ref], dtype=float)
+    order = np.argsort(-np.nan_to_num(totals, nan=-np.inf), kind='stable')
+    if top_n is not None:
+        order = order[:top_n]
+    labels, rows, totals = labels.iloc[order], rows[order], totals[order]
+    history = np.asarray(pt['points'][rows, :c_ref + 1], dtype=float)    # players x seasons x slots
+
+    # FEATURE 1: Decay-Weighted Momentum
+    decay = decay_factor ** (reference_year - pt['seasons'][:c_ref + 1])
+    momentum = np.nansum(history, axis=2) @ decay
+
+    # FEATURE 2: Volatility (Consistency)
+    # Using ALL historical points for statistical stability (std is NaN below 2 entries)
+    entries = history.reshape(len(rows), -1)
+    count = (~np.isnan(entries)).sum(axis=1)
+    mean = np.divide(np.nansum(entries, axis=1), count, out=np.zeros(len(rows)), where=count > 0)
+    sq = np.nansum((entries - mean[:, None]) ** 2, axis=1)
+    volatility = np.sqrt(np.divide(sq, count - 1, out=np.full(len(rows), np.nan), where=count > 1))
+
+    # FEATURE 3: Weighted Pressure Score (tier weight per reference-season tournament slot)
+    events = pt['tournaments'][pt['tournaments']['season_year'] == reference_year]
+    slot_weights = np.zeros(history.shape[2])
+    slot_weights[events['slot'].to_numpy()] = tournament_weights(events['tournament_name'], tier_weights)
+    pressure = np.nansum(history[:, c_ref] * slot_weights, axis=1)
+
+    return pd.DataFrame({
+        'ttfi_id': labels['ttfi_id'].to_numpy(),
+        'player_name': labels['player_name'].to_numpy(),
+        'institution': labels['state_institution'].to_numpy(),
+        'momentum_score': momentum.round(2),
+        'volatility_index': volatility.round(2),
+        'pressure_score': pressure,
+        'total_pts': totals,
+    })
+
+def _top10_barh(data, column, color, title):
+    fig, ax = plt.subplots(figsize=(12, 8))
+    y_pos = np.arange(len(data))
+    bars = ax.barh(y_pos, data[column], color=color)
+    ax.set_yticks(y_pos, labels=data['player_name'])
+    ax.bar_label(bars, padding=5, fmt='%.1f')
+    ax.set_title(title, fontsize=14)
+    ax.invert_yaxis()
+    fig.subplots_adjust(left=0.3)
+    return fig
+
+# 1. Momentum Chart
+def plot_momentum(data):
+    return _top10_barh(data, 'momentum_score', 'skyblue', 'Top 10: Decay-Weighted Momentum')
+
+# 2. Consistency Chart (Lower is Better)
+def plot_consistency(data):
+    fig, ax = plt.subplots(figsize=(14, 10))
+    y_pos = np.arange(len(data))
+    bars = ax.barh(y_pos, data['volatility_index'], color='#2ecc71', edgecolor='black')
+    ax.set_yticks(y_pos, labels=data['player_name'], fontsize=11)
+    ax.bar_label(bars, padding=10, fmt='%.2f', fontweight='bold')
+    ax.set_title('Top 10: Most Consistent Players (5-Year History)', fontsize=16, pad=25)
+    ax.set_xlabel('Volatility Index (Lower is More Consistent)')
+    ax.invert_yaxis()
+    fig.subplots_adjust(left=0.35)
+    return fig
+
+# 3. Pressure Score Chart
+def plot_pressure(data):
+    return _top10_barh(data, 'pressure_score', 'lightgreen',
+                       'Top 10: Weighted Pressure Score (Senior Nationals Weighted 2x)')
+
+# 4. Institutional Synergy Pie
+def plot_institutional_synergy(data, population):
+    fig, ax = plt.subplots(figsize=(8, 8))
+    ax.pie(data['players'], labels=data.index, autopct='%1.1f%%', startangle=140)
+    ax.set_title(f'Institutional Synergy ({population} Representation)', fontsize=14)
+    return fig
+
+def run_advanced_feature_pipeline(decay_factor=DECAY_FACTOR, tier_weights=TIER_WEIGHTS,
+                                  reference_year=REFERENCE_YEAR, top_n=None):
     # 1. Load Data and Ensure Directories Exist
     if not os.path.exists(INPUT_FILE):
         print(f"Error: {INPUT_FILE} not found. Ensure your mapping pipeline ran correctly.")
@@ -20,116 +175,42 @@ def run_advanced_feature_pipeline():
     os.makedirs(os.path.dirname(OUTPUT_CSV), exist_ok=True)
     os.makedirs(OUTPUT_DIR, exist_ok=True)
 
-    # Force consistent data types to avoid matching errors
-    df = pd.read_csv(INPUT_FILE)
-    df['ttfi_id'] = df['ttfi_id'].astype(str).str.strip().str.replace('.0', '', regex=False)
-    df['points_earned'] = pd.to_numeric(df['points_earned'], errors='coerce').fillna(0)
-    df['season_year'] = pd.to_numeric(df['season_year'], errors='coerce')
-    
-    latest_year = 2024
-    latest_df = df[df['season_year'] == latest_year].copy()
-    
-    if latest_df.empty:
-        print(f"Error: No data found for the year {latest_year}.")
+    # Shared points tensor: memory-mapped player x season x tournament results, no re-parsing
+    pt = load_points_tensor()
+
+    if not (pt['player_seasons']['season_year'] == reference_year).any():
+        print(f"Error: No data found for the year {reference_year}.")
         return
 
-    # Identify Top 50 based on seasonal aggregate
-    player_totals = latest_df.groupby('ttfi_id').agg({
-        'player_name': 'first',
-        'total_seasonal_points': 'max'
-    }).nlargest(50, 'total_seasonal_points')
-    
-    top_50_ids = player_totals.index.tolist()
-    feature_results = []
-    decay_factor = 0.8 
-
-    for pid in top_50_ids:
-        player_history = df[df['ttfi_id'] == pid]
-        latest_season = player_history[player_history['season_year'] == latest_year]
-        
-        # FEATURE 1: Decay-Weighted Momentum
-        yearly_sums = player_history.groupby('season_year')['points_earned'].sum()
-        momentum = sum(pts * (decay_factor ** (latest_year - yr)) for yr, pts in yearly_sums.items())
-        
-        # FEATURE 2: Volatility (Consistency) 
-        # Using ALL historical points (2020-2024) for statistical stability
-        history_points = player_history['points_earned']
-        volatility = history_points.std() if len(history_points) >= 2 else np.nan   
-        
-        # FEATURE 3: Weighted Pressure Score (SNR = 2x)
-        pressure = sum(row['points_earned'] * (2.0 if 'Senior' in str(row['tournament_name']) else 1.0)
-                       for _, row in latest_season.iterrows())
-        
-        feature_results.append({
-            'ttfi_id': pid,
-            'player_name': player_totals.loc[pid, 'player_name'],
-            'institution': latest_season['state_institution'].iloc[0] if not latest_season.empty else "N/A",
-            'momentum_score': round(momentum, 2),
-            'volatility_index': round(volatility, 2),
-            'pressure_score': pressure,
-            'total_pts': player_totals.loc[pid, 'total_seasonal_points'] # <-- ADD THIS LINE
-        })
-
-    features_df = pd.DataFrame(feature_results)
+    # 2. Features for the whole ranked population (or the top_n), reduced over the tensor's axes
+    features_df = compute_player_features_from_tensor(pt, decay_factor, tier_weights, reference_year, top_n)
+    population = f"Top {top_n}" if top_n is not None else f"All {len(features_df)} Ranked Players"
     features_df.to_csv(OUTPUT_CSV, index=False)
     print(f"SUCCESS: Feature matrix saved to {OUTPUT_CSV}")
 
     # --- BLOCKING-FREE PLOTTING ---
-    
-    # 1. Momentum Chart
-    plt.figure(figsize=(12, 8))
-    top_m = features_df.nlargest(10, 'momentum_score')
-    y_pos = np.arange(len(top_m))
-    bars = plt.barh(y_pos, top_m['momentum_score'], color='skyblue')
-    plt.yticks(y_pos, top_m['player_name'])
-    plt.bar_label(bars, padding=5, fmt='%.1f')
-    plt.title('Top 10: Decay-Weighted Momentum', fontsize=14)
-    plt.gca().invert_yaxis()
-    plt.subplots_adjust(left=0.3) 
-    plt.savefig(os.path.join(OUTPUT_DIR, "momentum_score.png"))
-    plt.close()
-
-    # 2. Consistency Chart (Lower is Better)
-    plt.figure(figsize=(14, 10)) 
+    # Each chart is keyed on the rows it draws: unchanged charts are skipped, the rest render in parallel
+    charts = [
+        chart("momentum_score", "scripts.feature_engineering.extract_features:plot_momentum",
+              features_df.nlargest(10, 'momentum_score')[['player_name', 'momentum_score']],
+              os.path.join(OUTPUT_DIR, "momentum_score.png")),
+        chart("pressure_score", "scripts.feature_engineering.extract_features:plot_pressure",
+              features_df.nlargest(10, 'pressure_score')[['player_name', 'pressure_score']],
+              os.path.join(OUTPUT_DIR, "pressure_score.png")),
+        chart("institutional_synergy", "scripts.feature_engineering.extract_features:plot_institutional_synergy",
+              features_df['institution'].value_counts().head(5).rename('players').to_frame(),
+              os.path.join(OUTPUT_DIR, "institutional_synergy.png"), population=population),
+    ]
     consistent_df = features_df.dropna(subset=['volatility_index']).nsmallest(10, 'volatility_index')
-
     if not consistent_df.empty:
-        y_pos = np.arange(len(consistent_df))
-        bars = plt.barh(y_pos, consistent_df['volatility_index'], color='#2ecc71', edgecolor='black')
-        plt.yticks(y_pos, labels=consistent_df['player_name'], fontsize=11)
-        plt.bar_label(bars, padding=10, fmt='%.2f', fontweight='bold')
-        plt.title('Top 10: Most Consistent Players (5-Year History)', fontsize=16, pad=25)
-        plt.xlabel('Volatility Index (Lower is More Consistent)')
-        plt.gca().invert_yaxis() 
-        plt.subplots_adjust(left=0.35) 
-        plt.savefig(os.path.join(OUTPUT_DIR, "consistency_index.png"))
-        print("SUCCESS: Consistency graph generated.")
+        charts.append(chart("consistency_index", "scripts.feature_engineering.extract_features:plot_consistency",
+                            consistent_df[['player_name', 'volatility_index']],
+                            os.path.join(OUTPUT_DIR, "consistency_index.png")))
     else:
         print("Warning: Insufficient historical data to calculate consistency.")
-    plt.close()
-
-    # 3. Pressure Score Chart
-    plt.figure(figsize=(12, 8))
-    top_p = features_df.nlargest(10, 'pressure_score')
-    y_pos = np.arange(len(top_p))
-    bars = plt.barh(y_pos, top_p['pressure_score'], color='lightgreen')
-    plt.yticks(y_pos, top_p['player_name'])
-    plt.bar_label(bars, padding=5, fmt='%.1f')
-    plt.title('Top 10: Weighted Pressure Score (Senior Nationals Weighted 2x)', fontsize=14)
-    plt.gca().invert_yaxis()
-    plt.subplots_adjust(left=0.3)
-    plt.savefig(os.path.join(OUTPUT_DIR, "pressure_score.png"))
-    plt.close()
-
-    # 4. Institutional Synergy Pie
-    plt.figure(figsize=(8, 8))
-    inst_counts = features_df['institution'].value_counts().head(5)
-    plt.pie(inst_counts, labels=inst_counts.index, autopct='%1.1f%%', startangle=140)
-    plt.title('Institutional Synergy (Top 50 Representation)', fontsize=14)
-    plt.savefig(os.path.join(OUTPUT_DIR, "institutional_synergy.png"))
-    plt.close()
-
-    print(f"SUCCESS: 4 analysis images saved to {OUTPUT_DIR}/")
+    render_charts(charts)
+
+    print(f"SUCCESS: {len(charts)} analysis images saved to {OUTPUT_DIR}/")
 
 if __name__ == "__main__":
     run_advanced_feature_pipeline()
\ No newline at end of file
@@ -1,54 +1,136 @@
 import pandas as pd
 import numpy as np
 import os
+import sys
+
+# Repo root on the path, so `python scripts/feature_engineering/sliding_window.py` finds the scripts package too
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if ROOT_DIR not in sys.path:
+    sys.path.append(ROOT_DIR)
+
+from scripts.storage.columnar_store import load_master
 
 # Configuration
 INPUT_FILE = "data/processed/master_long_dataset.csv"
 OUTPUT_FILE = "data/processed/supervised_timeseries_data.csv"
 
-def create_advanced_sliding_window():
-    if not os.path.exists(INPUT_FILE):
-        print(f"Error: {INPUT_FILE} not found. Run mapping script first!")
-        return
+LAGS = [1, 2, 3]                    # pts_lag_k = seasonal points in calendar year T - k
+ROLLING = {                         # name: (statistic, window in seasons before T)
+    'pts_mean_3': ('mean', 3),
+    'seasons_ranked_3': ('count', 3),
+}
+MIN_HISTORY = 1                     # ranked seasons before T needed for a row to be kept
+CHUNK_ROWS = 500_000                # player-season rows per windowed pass (bounds memory)
+
+def _window_stat(window, stat):
+    """Row-wise statistic of a (rows x seasons) window, ignoring unranked (NaN) seasons."""
+    present = ~np.isnan(window)
+    count = present.sum(axis=1)
+    if stat == 'count':
+        return count.astype(float)
+    if stat == 'max':
+        return np.fmax.reduce(window, axis=1)
+    if stat == 'min':
+        return np.fmin.reduce(window, axis=1)
+    total = np.where(present, window, 0.0).sum(axis=1)
+    if stat == 'sum':
+        return total
+    mean = np.divide(total, count, out=np.full(len(count), np.nan), where=count > 0)
+    if stat == 'mean':
+        return mean
+    if stat == 'std':
+        sq = np.where(present, (window - mean[:, None]) ** 2, 0.0).sum(axis=1)
+        return np.sqrt(np.divide(sq, count - 1, out=np.full(len(count), np.nan), where=count > 1))
+    raise ValueError(f"Unknown rolling statistic '{stat}'")
+
+def build_supervised_dataset(df, lags=LAGS, rolling=ROLLING, min_history=MIN_HISTORY, chunk_rows=CHUNK_ROWS):
+    """One row per ranked player-season with lag and rolling features from earlier seasons only.
 
-    # Load and clean data
-    df = pd.read_csv(INPUT_FILE)
-    df['season_year'] = pd.to_numeric(df['season_year'])
-    df['points_earned'] = pd.to_numeric(df['points_earned'], errors='coerce').fillna(0)
+    Seasons sit on a dense player x calendar-year grid, so a skipped season is a missing lag
+    (NaN), not the previous row. career_volatility is the std of every tournament result
+    before the target season.
+    """
+    # 1. Annual aggregation, plus per-season tournament sums for the prior-only volatility
+    annual_df = (df.assign(pts_sq=df['points_earned'].astype(float) ** 2)
+                 .groupby(['ttfi_id', 'season_year'], observed=True, sort=True)
+                 .agg(player_name=('player_name', 'first'),
+                      total_seasonal_points=('total_seasonal_points', 'max'),
+                      state_institution=('state_institution', 'first'),
+                      n_entries=('points_earned', 'count'),
+                      pts_sum=('points_earned', 'sum'),
+                      pts_sq=('pts_sq', 'sum'))
+                 .reset_index())
 
-    # Calculate Career Volatility (2020-2024)
-    career_stats = df.groupby('ttfi_id')['points_earned'].std().reset_index()
-    career_stats.columns = ['ttfi_id', 'career_volatility']
+    # 2. Dense player x season grid
+    rows, players = pd.factorize(annual_df['ttfi_id'])
+    first_year = int(annual_df['season_year'].min())
+    cols = annual_df['season_year'].to_numpy(dtype=np.int64) - first_year
+    shape = (len(players), cols.max() + 1)
 
-    # Annual Aggregation for the Sliding Window
-    annual_df = df.groupby(['ttfi_id', 'player_name', 'season_year']).agg({
-        'total_seasonal_points': 'max',
-        'state_institution': 'first'
-    }).reset_index()
+    def grid(values, fill):
+        out = np.full(shape, fill, dtype=float)
+        out[rows, cols] = values
+        return out
 
-    annual_df = annual_df.sort_values(['ttfi_id', 'season_year'])
+    points = grid(annual_df['total_seasonal_points'].to_numpy(dtype=float), np.nan)
 
-    # Merge career consistency into the annual timeline
-    annual_df = annual_df.merge(career_stats, on='ttfi_id', how='left')
+    # Everything strictly before T: exclusive cumulative sums along the season axis
+    def prior(values):
+        dense = grid(values, 0.0)
+        return (np.cumsum(dense, axis=1) - dense)[rows, cols]
 
-    # Create Time-Series Lags (T-1, T-2, T-3)
-    annual_df['pts_lag_1'] = annual_df.groupby('ttfi_id')['total_seasonal_points'].shift(1)
-    annual_df['pts_lag_2'] = annual_df.groupby('ttfi_id')['total_seasonal_points'].shift(2)
-    annual_df['pts_lag_3'] = annual_df.groupby('ttfi_id')['total_seasonal_points'].shift(3)
+    n_prior = prior(annual_df['n_entries'].to_numpy(dtype=float))
+    sum_prior = prior(annual_df['pts_sum'].to_numpy(dtype=float))
+    sq_prior = prior(annual_df['pts_sq'].to_numpy(dtype=float))
+    seasons_prior = prior(np.ones(len(annual_df)))
+    var = np.divide(sq_prior - sum_prior ** 2 / np.maximum(n_prior, 1), n_prior - 1,
+                    out=np.full(len(annual_df), np.nan), where=n_prior > 1)
+    annual_df['career_volatility'] = np.sqrt(np.maximum(var, 0))
+
+    # 3. Lags and rolling windows, gathered from the grid in row chunks
+    depth = max(list(lags) + [w for _, w in rolling.values()] + [1])
+    features = {f'pts_lag_{k}': np.empty(len(annual_df)) for k in lags}
+    features.update({name: np.empty(len(annual_df)) for name in rolling})
+    for start in range(0, len(annual_df), chunk_rows):
+        r, c = rows[start:start + chunk_rows], cols[start:start + chunk_rows]
+        back = c[:, None] - np.arange(1, depth + 1)[None, :]      # column j = season T - (j + 1)
+        window = np.where(back >= 0, points[r[:, None], np.maximum(back, 0)], np.nan)
+        for k in lags:
+            features[f'pts_lag_{k}'][start:start + len(r)] = window[:, k - 1]
+        for name, (stat, width) in rolling.items():
+            features[name][start:start + len(r)] = _window_stat(window[:, :width], stat)
+    for name, values in features.items():
+        annual_df[name] = values
 
     # Momentum: YoY Growth
-    annual_df['momentum_yoy'] = annual_df['pts_lag_1'] - annual_df['pts_lag_2']
+    if {'pts_lag_1', 'pts_lag_2'} <= set(annual_df.columns):
+        annual_df['momentum_yoy'] = annual_df['pts_lag_1'] - annual_df['pts_lag_2']
+
+    # Fill missing volatility with that season's mean (itself built from earlier seasons only)
+    season_mean = annual_df.groupby('season_year')['career_volatility'].transform('mean')
+    annual_df['career_volatility'] = annual_df['career_volatility'].fillna(season_mean)
+
+    # Drop rows without enough history to establish a trend
+    keep = seasons_prior >= min_history
+    columns = (['ttfi_id', 'player_name', 'season_year', 'total_seasonal_points', 'state_institution',
+                'career_volatility'] + [f'pts_lag_{k}' for k in lags]
+               + (['momentum_yoy'] if 'momentum_yoy' in annual_df else []) + list(rolling))
+    return annual_df.loc[keep, columns].reset_index(drop=True)
+
+def create_advanced_sliding_window():
+    if not os.path.exists(INPUT_FILE):
+        print(f"Error: {INPUT_FILE} not found. Run mapping script first!")
+        return
 
-    # Fill missing volatility with the global mean
-    avg_vol = annual_df['career_volatility'].mean()
-    annual_df['career_volatility'] = annual_df['career_volatility'].fillna(avg_vol)
-    
-    # Drop rows without enough history to establish a 2026 trend
-    supervised_df = annual_df.dropna(subset=['pts_lag_3'])
+    # Load typed data (points and years are already numeric in the columnar store)
+    df = load_master(columns=['season_year', 'ttfi_id', 'player_name', 'state_institution',
+                              'total_seasonal_points', 'points_earned'])
+    supervised_df = build_supervised_dataset(df)
 
     os.makedirs(os.path.dirname(OUTPUT_FILE), exist_ok=True)
     supervised_df.to_csv(OUTPUT_FILE, index=False)
     print(f"SUCCESS: Supervised dataset with Career Volatility created ({len(supervised_df)} rows).")
+    return supervised_df
 
 if __name__ == "__main__":
-    create_advanced_sliding_window()
\ No newline at end of file
+    create_advanced_sliding_window()
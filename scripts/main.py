@@ -1,4 +1,11 @@
 import os
+import sys
+
+# Repo root on the path, so `python scripts/main.py` finds the scripts package too
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.append(ROOT_DIR)
+
 from scripts.mapping.header_mapping import run_mapping_pipeline
 
 def main():
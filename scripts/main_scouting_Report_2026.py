@@ -1,8 +1,6 @@
 import os
 import sys
-import pandas as pd
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_pdf import PdfPages
+import argparse
 from datetime import datetime
 
 # --- ROBUST PATH MANAGEMENT ---
@@ -10,81 +8,148 @@ from datetime import datetime
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 if SCRIPT_DIR not in sys.path:
     sys.path.append(SCRIPT_DIR)
+# Shared engines are imported package-style (scripts.modeling...), so the repo root is needed too
+ROOT_DIR = os.path.dirname(SCRIPT_DIR)
+if ROOT_DIR not in sys.path:
+    sys.path.append(ROOT_DIR)
+
+from scripts.pipeline.stage_runner import run_dag, stage
+from scripts.visualization.chart_renderer import CHART_DIR, chart_payload, load_chart
+
+# --- PIPELINE STAGES ---
+# Each stage declares the files it reads and writes. Dependencies follow from those
+# files, and a stage is skipped when its inputs hash the same as on the last run.
+# Model modules (and matplotlib) are imported inside the stage workers, not here.
+MASTER = "data/processed/master_long_dataset.csv"
+FEATURES = "data/processed/features_master.csv"
+SUPERVISED = "data/processed/supervised_timeseries_data.csv"
+TUNED_PARAMS = "data/models/tuned_xgboost_params.json"      # optional, from `python -m scripts.cli tune`
+INSIGHTS = "data/insights"
+
+# Charts in the PDF, in page order. Each page is the chart's cached Figure, saved as vector graphics.
+REPORT_CHARTS = [
+    "momentum_score",
+    "consistency_index",
+    "player_archetype_clusters",
+    "career_survival_curve",
+    "scouting_heatmap_top20",
+    "most_progress_player"
+]
+
+STAGES = [
+    stage("features", "scripts.feature_engineering.extract_features:run_advanced_feature_pipeline",
+          inputs=[MASTER],
+          outputs=[FEATURES] + [out for name in ["momentum_score", "consistency_index",
+                                                 "pressure_score", "institutional_synergy"]
+                                for out in (f"{INSIGHTS}/{name}.png", chart_payload(name))]),
+    stage("sliding_window", "scripts.feature_engineering.sliding_window:create_advanced_sliding_window",
+          inputs=[MASTER], outputs=[SUPERVISED]),
+    stage("forecast", "scripts.modeling.train_xgboost_ensemble:run_ensemble_scouting_report",
+          inputs=[SUPERVISED, TUNED_PARAMS], outputs=[f"{INSIGHTS}/ensemble_2026_scouting_report.csv"]),
+    # After the forecast, so the heatmap loads the ensemble it registered instead of training its own
+    stage("heatmap", "scripts.visualization.scouting_heatmap:generate_scouting_heatmap",
+          inputs=[SUPERVISED, TUNED_PARAMS, f"{INSIGHTS}/ensemble_2026_scouting_report.csv"],
+          outputs=[f"{INSIGHTS}/scouting_heatmap_top20.png", chart_payload("scouting_heatmap_top20")]),
+    stage("clustering", "scripts.modeling.player_clustering:run_player_clustering",
+          inputs=[FEATURES],
+          outputs=[f"{INSIGHTS}/player_archetype_clusters.png", f"{INSIGHTS}/player_clusters_report.csv",
+                   "data/models/player_clusters.json", chart_payload("player_archetype_clusters")]),
+    stage("elo", "scripts.modeling.elo_rating_system:run_elo_simulation",
+          inputs=[MASTER], outputs=[f"{INSIGHTS}/player_elo_ratings.csv",
+                                    "data/processed/win_probability/matrix.npy"]),
+    stage("glicko", "scripts.modeling.elo_rating_system:run_glicko_simulation",
+          inputs=[MASTER], outputs=[f"{INSIGHTS}/player_glicko_ratings.csv"]),
+    stage("season_sim", "scripts.modeling.season_simulator:run_season_simulation",
+          inputs=[MASTER, f"{INSIGHTS}/player_elo_ratings.csv"],
+          outputs=[f"{INSIGHTS}/season_simulation_2026.csv"]),
+    stage("survival", "scripts.modeling.survival_analysis:run_survival_analysis",
+          inputs=[MASTER],
+          outputs=[f"{INSIGHTS}/career_survival_curve.png", f"{INSIGHTS}/career_longevity_report.csv",
+                   f"{INSIGHTS}/career_survival_curves.csv", chart_payload("career_survival_curve")]),
+    stage("progression", "scripts.visualization.analyze_career_progression:analyze_most_progress",
+          inputs=[MASTER],
+          outputs=[f"{INSIGHTS}/career_progression_leaderboard.csv", f"{INSIGHTS}/most_progress_player.png",
+                   chart_payload("most_progress_player")]),
+    stage("report", "scripts.main_scouting_Report_2026:build_pdf_report",
+          inputs=[chart_payload(name) for name in REPORT_CHARTS],
+          outputs=[f"{INSIGHTS}/Scouting_Report_2026.pdf"]),
+]
+
+def build_pdf_report():
+    # matplotlib is only needed here; the scheduler itself starts without it
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    from matplotlib.backends.backend_pdf import PdfPages
 
-# --- IMPORT MODELS ---
-try:
-    from feature_engineering.extract_features import run_advanced_feature_pipeline
-    from feature_engineering.sliding_window import create_advanced_sliding_window
-    from modeling.train_xgboost_ensemble import run_ensemble_scouting_report
-    from modeling.player_clustering import run_player_clustering
-    from modeling.elo_rating_system import run_elo_simulation
-    from modeling.survival_analysis import run_survival_analysis
-except ImportError as e:
-    print(f"❌ Critical Import Error: {e}")
-    print("\nTroubleshooting:")
-    print("1. Ensure 'scripts/modeling/train_xgboost_ensemble.py' exists.")
-    print("2. Ensure '__init__.py' exists in 'modeling' and 'feature_engineering' folders.")
-    sys.exit(1)
-
-def run_scouting_pipeline():
-    print("\n🚀 GENERATING 2026 TABLE TENNIS SCOUTING REPORT\n" + "="*50)
-    
-    # 1. DATA REFRESH
-    print("[1/3] Processing 5-Year Data & Volatility...")
-    run_advanced_feature_pipeline()
-    create_advanced_sliding_window()
-
-    # 2. RUN MODELS
-    print("\n[2/3] Running AI Ensemble, Skill Ratings, and Longevity Analysis...")
-    run_ensemble_scouting_report() 
-    run_player_clustering()        
-    run_elo_simulation()           
-    run_survival_analysis()        
-
-    # 3. PDF COMPILATION
-    print("\n[3/3] Saving PDF Report...")
     # Navigate to the root's data/insights folder
-    ROOT_DIR = os.path.dirname(SCRIPT_DIR)
     insights_dir = os.path.join(ROOT_DIR, "data", "insights")
     pdf_path = os.path.join(insights_dir, "Scouting_Report_2026.pdf")
-    
-    visuals = [
-        "momentum_score.png",
-        "consistency_index.png",
-        "player_archetype_clusters.png",
-        "career_survival_curve.png",
-        "scouting_heatmap_top20.png"
-    ]
 
     try:
         os.makedirs(insights_dir, exist_ok=True)
         with PdfPages(pdf_path) as pdf:
             # Report Cover
             plt.figure(figsize=(8.5, 11))
-            plt.text(0.5, 0.6, "2026 Table Tennis\nPerformance Forecast", 
+            plt.text(0.5, 0.6, "2026 Table Tennis\nPerformance Forecast",
                      fontsize=24, ha='center', fontweight='bold')
-            plt.text(0.5, 0.45, f"Date: {datetime.now().strftime('%B %Y')}", 
+            plt.text(0.5, 0.45, f"Date: {datetime.now().strftime('%B %Y')}",
                      fontsize=14, ha='center')
             plt.axis('off')
             pdf.savefig()
             plt.close()
 
-            # Add Model Visuals
-            for img_name in visuals:
-                path = os.path.join(insights_dir, img_name)
-                if os.path.exists(path):
-                    img = plt.imread(path)
+            # Add Model Visuals: the figure objects from the chart cache, saved as vector pages
+            for name in REPORT_CHARTS:
+                fig = load_chart(name, os.path.join(ROOT_DIR, CHART_DIR))
+                png_path = os.path.join(insights_dir, f"{name}.png")
+                if fig is not None:
+                    pdf.savefig(fig)
+                    plt.close(fig)
+                elif os.path.exists(png_path):
+                    # Chart rendered before the chart cache existed: fall back to the raster image
+                    img = plt.imread(png_path)
                     plt.figure(figsize=(11, 8.5))
                     plt.imshow(img)
                     plt.axis('off')
                     pdf.savefig(bbox_inches='tight')
                     plt.close()
-                    print(f"  ✅ Added to PDF: {img_name}")
+                else:
+                    continue
+                print(f"  ✅ Added to PDF: {name}")
 
         print(f"\nFinal Report Saved: {pdf_path}\n" + "="*50)
-        
+
     except Exception as e:
         print(f"❌ Error creating PDF: {e}")
 
+def run_scouting_pipeline(only=None, force=None, workers=None, profile=False):
+    print("\n🚀 GENERATING 2026 TABLE TENNIS SCOUTING REPORT\n" + "="*50)
+    # Stage paths are relative to the repo root
+    os.chdir(ROOT_DIR)
+
+    status, manifest_path = run_dag(STAGES, only=only, force=force, workers=workers, profile=profile)
+
+    print("\n--- Stage Summary ---")
+    for name, result in status.items():
+        print(f"  {name:<15} {result}")
+    print(f"Run manifest: {manifest_path}")
+    print(f"Compare runs: python -m scripts.pipeline.run_manifest compare <older.json> {manifest_path}")
+    return status
+
+def parse_args(argv=None):
+    names = [s['name'] for s in STAGES]
+    parser = argparse.ArgumentParser(description="Build the 2026 scouting report (cached, parallel stages).")
+    parser.add_argument("--only", nargs="+", choices=names, metavar="STAGE",
+                        help=f"Run only these stages. Choices: {', '.join(names)}")
+    parser.add_argument("--force", nargs="+", choices=names + ['all'], metavar="STAGE",
+                        help="Re-run these stages even if their inputs are unchanged ('all' for every stage)")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Process pool size for independent stages (1 = run serially)")
+    parser.add_argument("--profile", action="store_true",
+                        help="Capture a cProfile dump for every executed stage")
+    return parser.parse_args(argv)
+
 if __name__ == "__main__":
-    run_scouting_pipeline()
\ No newline at end of file
+    args = parse_args()
+    run_scouting_pipeline(only=args.only, force=args.force, workers=args.workers, profile=args.profile)
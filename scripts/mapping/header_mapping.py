@@ -1,89 +1,143 @@
 #Data Cleaning
 
 import os
+import sys
 import pandas as pd
+import numpy as np
 import re
+from concurrent.futures import ProcessPoolExecutor
+
+# Repo root on the path, so `python scripts/mapping/header_mapping.py` finds the scripts package too
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if ROOT_DIR not in sys.path:
+    sys.path.append(ROOT_DIR)
+
+from scripts.storage.columnar_store import write_master_store
 
 
 # Configuration
 RAW_DIR = "data/raw"
 PROCESSED_DIR = "data/processed"
 
+OUTPUT_COLUMNS = [
+    'season_year', 'ttfi_id', 'player_name', 'state_institution', 'total_seasonal_points',
+    'final_rank_position', 'tournament_name', 'a1_location', 'a2_date', 'points_earned'
+]
+
 def clean_text(text):
     if pd.isna(text) or text == "": return ""
     return re.sub(r'\s+', ' ', str(text)).strip()
 
-def run_mapping_pipeline():
-    all_rows = []
-    csv_files = [f for f in os.listdir(RAW_DIR) if f.endswith('.csv')]
-    
-    for filename in csv_files:
-        path = os.path.join(RAW_DIR, filename)
-        year_match = re.search(r'20\d{2}', filename)
-        year = year_match.group(0) if year_match else "Unknown"
-        
-        # Load raw CSV
-        df_raw = pd.read_csv(path, header=None)
-        
-        locations = df_raw.iloc[0].fillna("").tolist()
-        dates = df_raw.iloc[1].fillna("").tolist()
-        headers = df_raw.iloc[2].fillna("").tolist()
-        data_rows = df_raw.iloc[3:]
-
-        # --- STEP 1: STRICT METADATA MAPPING ---
-        col_map = {}
-        tournament_indices = []
-        
-        for i, h in enumerate(headers):
-            h_clean = clean_text(h).lower()
-            
-            # Explicit metadata checks - looking for the specific ID/Name columns
-            if i < 4: # Player metadata is ALWAYS in the first few columns
-                if 'id' in h_clean: col_map['ttfi_id'] = i
-                elif 'name' in h_clean: col_map['player_name'] = i
-                elif 'state' in h_clean or h_clean == 'inst.': col_map['state_inst'] = i
-                continue
-
-            # Summary/Total point columns
-            if 'points' in h_clean and 'best' not in h_clean: 
-                col_map['total_points'] = i
-            elif 'position' in h_clean or 'rank' in h_clean: 
-                col_map['rank_position'] = i
-            
-            # --- STEP 2: TOURNAMENT DETECTION ---
-            # If it's not metadata and has points/tournament keywords, it's an event
-            elif any(key in h_clean for key in ['ranking', 'institutional', 'national', 'championship']):
-                tournament_indices.append(i)
-
-        # --- STEP 3: DATA EXTRACTION ---
-        for _, row in data_rows.iterrows():
-            if pd.isna(row[col_map.get('player_name', 2)]): continue
-                
-            player_base = {
-                'season_year': year,
-                'ttfi_id': row[col_map.get('ttfi_id')],
-                'player_name': clean_text(row[col_map.get('player_name')]),
-                'state_institution': clean_text(row[col_map.get('state_inst')]),
-                'total_seasonal_points': row[col_map.get('total_points')],
-                'final_rank_position': row[col_map.get('rank_position')]
-            }
-            
-            for t_idx in tournament_indices:
-                points_val = row[t_idx]
-                if pd.notna(points_val) and str(points_val).strip() != "":
-                    entry = player_base.copy()
-                    entry.update({
-                        'tournament_name': clean_text(headers[t_idx]),
-                        'a1_location': clean_text(locations[t_idx]),
-                        'a2_date': clean_text(dates[t_idx]),
-                        'points_earned': points_val
-                    })
-                    all_rows.append(entry)
-
-    master_df = pd.DataFrame(all_rows)
-    os.makedirs(PROCESSED_DIR, exist_ok=True)
-    master_df.to_csv(os.path.join(PROCESSED_DIR, "master_long_dataset.csv"), index=False)
+def clean_text_column(series):
+    """Column-wise clean_text: collapse whitespace and strip, NaN becomes ''."""
+    return series.fillna("").astype(str).str.replace(r'\s+', ' ', regex=True).str.strip()
+
+def detect_columns(headers):
+    """Maps the metadata columns and lists the tournament columns of a TTFI header row."""
+    col_map = {}
+    tournament_indices = []
+
+    for i, h in enumerate(headers):
+        h_clean = clean_text(h).lower()
+
+        # Explicit metadata checks - looking for the specific ID/Name columns
+        if i < 4: # Player metadata is ALWAYS in the first few columns
+            if 'id' in h_clean: col_map['ttfi_id'] = i
+            elif 'name' in h_clean: col_map['player_name'] = i
+            elif 'state' in h_clean or h_clean == 'inst.': col_map['state_inst'] = i
+            continue
+
+        # Summary/Total point columns
+        if 'points' in h_clean and 'best' not in h_clean:
+            col_map['total_points'] = i
+        elif 'position' in h_clean or 'rank' in h_clean:
+            col_map['rank_position'] = i
+
+        # If it's not metadata and has points/tournament keywords, it's an event
+        elif any(key in h_clean for key in ['ranking', 'institutional', 'national', 'championship']):
+            tournament_indices.append(i)
+
+    return col_map, tournament_indices
+
+def season_from_path(path):
+    year_match = re.search(r'20\d{2}', os.path.basename(path))
+    return year_match.group(0) if year_match else "Unknown"
+
+def map_raw_file(path):
+    """Reshapes one raw TTFI ranking CSV (locations, dates, headers, players) to long format."""
+    # Load raw CSV
+    return reshape_raw_table(pd.read_csv(path, header=None), season_from_path(path))
+
+def reshape_raw_table(df_raw, year):
+    """Wide raw ranking grid (row 0 locations, row 1 dates, row 2 headers, then players) -> long format."""
+    locations = df_raw.iloc[0].fillna("").tolist()
+    dates = df_raw.iloc[1].fillna("").tolist()
+    headers = df_raw.iloc[2].fillna("").tolist()
+
+    # --- STEP 1 & 2: METADATA MAPPING + TOURNAMENT DETECTION ---
+    col_map, tournament_indices = detect_columns(headers)
+
+    # --- STEP 3: DATA EXTRACTION (vectorized wide -> long) ---
+    data_rows = df_raw.iloc[3:]
+    data_rows = data_rows[data_rows[col_map.get('player_name', 2)].notna()]
+
+    player_base = pd.DataFrame({
+        'season_year': year,
+        'ttfi_id': data_rows[col_map.get('ttfi_id')].to_numpy(),
+        'player_name': clean_text_column(data_rows[col_map.get('player_name')]).to_numpy(),
+        'state_institution': clean_text_column(data_rows[col_map.get('state_inst')]).to_numpy(),
+        'total_seasonal_points': data_rows[col_map.get('total_points')].to_numpy(),
+        'final_rank_position': data_rows[col_map.get('rank_position')].to_numpy(),
+    })
+
+    # A tournament cell counts as an entry when it holds a non-blank value
+    points = data_rows[tournament_indices]
+    non_blank = points.astype(str).apply(lambda col: col.str.strip()).ne("")
+    filled = (points.notna() & non_blank).to_numpy(dtype=bool)
+
+    # np.nonzero walks the grid row by row, which keeps the original player-then-event order
+    row_pos, col_pos = np.nonzero(filled)
+    long_df = player_base.iloc[row_pos].reset_index(drop=True)
+
+    event_meta = pd.DataFrame({
+        'tournament_name': clean_text_column(pd.Series(headers)[tournament_indices]).to_numpy(),
+        'a1_location': clean_text_column(pd.Series(locations)[tournament_indices]).to_numpy(),
+        'a2_date': clean_text_column(pd.Series(dates)[tournament_indices]).to_numpy(),
+    })
+    long_df = pd.concat([long_df, event_meta.iloc[col_pos].reset_index(drop=True)], axis=1)
+    long_df['points_earned'] = points.to_numpy()[row_pos, col_pos]
+
+    return long_df[OUTPUT_COLUMNS]
+
+def run_mapping_pipeline(raw_dir=RAW_DIR, processed_dir=PROCESSED_DIR, workers=None, resolve_ids=True):
+    csv_files = [os.path.join(raw_dir, f) for f in os.listdir(raw_dir) if f.endswith('.csv')]
+
+    # One worker process per raw file; a single file is not worth the pool start-up
+    if len(csv_files) > 1 and workers != 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            frames = list(pool.map(map_raw_file, csv_files))
+    else:
+        frames = [map_raw_file(path) for path in csv_files]
+
+    # Seasons published only as PDF (no CSV with the same name) go through the page-parallel PDF parser
+    csv_stems = {os.path.splitext(os.path.basename(p))[0] for p in csv_files}
+    pdf_files = [os.path.join(raw_dir, f) for f in os.listdir(raw_dir)
+                 if f.lower().endswith('.pdf') and os.path.splitext(f)[0] not in csv_stems]
+    if pdf_files:
+        from scripts.mapping.pdf_ingestion import ingest_pdfs
+        frames += ingest_pdfs(sorted(pdf_files), workers, os.path.join(processed_dir, "pdf_page_cache"))
+
+    master_df = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=OUTPUT_COLUMNS)
+    # Canonical player ids/spellings across seasons (missing ids, respelled names)
+    if resolve_ids and len(master_df):
+        from scripts.mapping.identity_resolution import resolve_identities
+        master_df, _ = resolve_identities(master_df, os.path.join(processed_dir, "player_identity_map.csv"))
+    os.makedirs(processed_dir, exist_ok=True)
+    master_df.to_csv(os.path.join(processed_dir, "master_long_dataset.csv"), index=False)
+    # Typed Parquet copy partitioned by season_year for the downstream stages
+    write_master_store(master_df, os.path.join(processed_dir, "master_long_dataset"))
     print(f"PIPELINE SUCCESS: Processed {len(master_df)} tournament entries.")
+    return master_df
 
 if __name__ == "__main__":
-    run_mapping_pipeline()
\ No newline at end of file
+    run_mapping_pipeline()
@@ -0,0 +1,262 @@
+# Player identity resolution: one canonical player id (and name spelling) per real player.
+# Raw TTFI lists drop or mangle ids and respell names across seasons ("AMRUTHA PUSHPAK Shekhar" /
+# "Amrutha Pushpak Shekhar", "SELENADEEPTHI Selvakumar" / "Selena Deepti Selvakumar").
+# Candidate pairs come from blocks (state/institution token + name-token prefix) and are scored in one
+# vectorized RapidFuzz call; the resolved mapping is persisted so later runs only resolve new rows.
+#
+#   python -m scripts.mapping.identity_resolution
+
+import os
+
+import numpy as np
+import pandas as pd
+from rapidfuzz import fuzz, process
+
+from scripts.storage.columnar_store import MASTER_CSV, STORE_DIR, normalize_ttfi_id, write_master_store
+
+# Configuration
+IDENTITY_MAP = "data/processed/player_identity_map.csv"
+MATCH_THRESHOLD = 90      # a row without a usable id joins an existing player
+MERGE_THRESHOLD = 95      # two different ids are the same player (seasons must not overlap either)
+BLOCK_PREFIX = 3          # name tokens sharing this many leading letters land in the same block
+MAX_BLOCK_SIZE = 400      # bigger blocks (very common tokens) do not discriminate and are skipped
+SYNTHETIC_ID_BASE = 900000000
+KEY_COLUMNS = ['raw_ttfi_id', 'player_name', 'state_institution']
+MAP_COLUMNS = KEY_COLUMNS + ['seasons_mask', 'last_season', 'canonical_id', 'method', 'score']
+
+
+def name_key(names):
+    """Lower-case letters/digits only, single spaces: 'AKULA  Sreeja.' -> 'akula sreeja'."""
+    return names.astype(str).str.lower().str.replace(r'[^a-z0-9]+', ' ', regex=True).str.strip()
+
+
+def pair_scores(left, right, score_cutoff=0):
+    """Element-wise similarity of two aligned name-key arrays (0-100; 0 below `score_cutoff`).
+
+    Best of a token-sorted ratio (catches 'DEY Srijanee' / 'Srijanee Dey') and a ratio with the
+    spaces removed (catches 'SELENADEEPTHI' / 'Selena Deepti').
+    """
+    sorted_ratio = process.cpdist(left, right, scorer=fuzz.token_sort_ratio, score_cutoff=score_cutoff, workers=-1)
+    joined = process.cpdist(np.char.replace(left.astype(str), ' ', ''), np.char.replace(right.astype(str), ' ', ''),
+                            scorer=fuzz.ratio, score_cutoff=score_cutoff, workers=-1)
+    return np.maximum(sorted_ratio, joined)
+
+
+def blocks(obs, by_institution=True):
+    """One row per (observation, block key): institution token x name-token prefix.
+
+    Institutions are written many ways ('MHR / RBI', 'MHR A', 'RBI'), so each of their tokens
+    is a blocking key of its own; a player matches across years if any institution carries over.
+    by_institution=False blocks on all name-token prefixes together, whatever the institution
+    (players who changed institution but kept their spelling up to word order).
+    """
+    if not by_institution:
+        prefixes = obs['name_key'].str.split().map(lambda tokens: ' '.join(sorted(t[:BLOCK_PREFIX] for t in tokens)))
+        return pd.DataFrame({'obs': obs.index, 'block': prefixes.to_numpy()})
+    name_tokens = obs['name_key'].str.split().explode().dropna()
+    keys = name_tokens[name_tokens.str.len() >= 2].str[:BLOCK_PREFIX].rename('name').rename_axis('obs').reset_index()
+    inst_tokens = obs['state_institution'].astype(str).str.upper().str.findall(r'[A-Z]{2,}').explode().fillna('')
+    keys = keys.merge(inst_tokens.rename('inst').rename_axis('obs').reset_index(), on='obs')
+    return pd.DataFrame({'obs': keys['obs'], 'block': keys['inst'] + '|' + keys['name']}).drop_duplicates()
+
+
+def _block_join(left, right, by_institution):
+    lb, rb = blocks(left, by_institution), blocks(right, by_institution)
+    sizes = lb['block'].value_counts().add(rb['block'].value_counts(), fill_value=0)
+    common = sizes.index[sizes <= MAX_BLOCK_SIZE]
+    return lb[lb['block'].isin(common)].merge(rb[rb['block'].isin(common)], on='block', suffixes=('_l', '_r'))
+
+
+def candidate_pairs(left, right, threshold, cross_institution_threshold=MERGE_THRESHOLD):
+    """Scored (left obs, right obs) pairs that share a block - never all pairs.
+
+    Pairs within an institution block need `threshold`; pairs found only through the name-only
+    blocks need the stricter `cross_institution_threshold`.
+    """
+    found = []
+    for by_institution, cutoff in ((True, threshold), (False, cross_institution_threshold)):
+        pairs = _block_join(left, right, by_institution)
+        pairs = pairs[pairs['obs_l'] != pairs['obs_r']].drop_duplicates(['obs_l', 'obs_r'])
+        l_keys = left.loc[pairs['obs_l'], 'name_key'].to_numpy()
+        r_keys = right.loc[pairs['obs_r'], 'name_key'].to_numpy()
+        # A ratio of 2*matches/(len_a + len_b) can't reach the cutoff if the lengths differ too much
+        l_len, r_len = left.loc[pairs['obs_l'], 'name_len'].to_numpy(), right.loc[pairs['obs_r'], 'name_len'].to_numpy()
+        reachable = 200 * np.minimum(l_len, r_len) >= cutoff * (l_len + r_len)
+        pairs, l_keys, r_keys = pairs[reachable], l_keys[reachable], r_keys[reachable]
+        if pairs.empty:
+            continue
+        pairs = pairs[['obs_l', 'obs_r']].assign(score=pair_scores(l_keys, r_keys, cutoff))
+        found.append(pairs[pairs['score'] >= cutoff])
+    if not found:
+        return pd.DataFrame({'obs_l': [], 'obs_r': [], 'score': []}).astype({'obs_l': int, 'obs_r': int})
+    return pd.concat(found).drop_duplicates(['obs_l', 'obs_r']).reset_index(drop=True)
+
+
+def _seasons_by_player(obs):
+    """{canonical_id: OR of its variants' season bitmasks}."""
+    ordered = obs.sort_values('canonical_id', kind='stable')
+    ids = ordered['canonical_id'].to_numpy()
+    starts = np.flatnonzero(np.r_[True, ids[1:] != ids[:-1]]) if len(ids) else np.array([], dtype=int)
+    masks = np.bitwise_or.reduceat(ordered['seasons_mask'].to_numpy(dtype='int64'), starts) if len(ids) else []
+    return dict(zip(ids[starts], masks))
+
+
+def raw_id_key(df):
+    """Lookup key columns of the raw rows: normalised id as text ('' when missing), name, institution."""
+    return pd.DataFrame({
+        'raw_ttfi_id': normalize_ttfi_id(df['ttfi_id']).astype('string').fillna('').astype(str).to_numpy(),
+        'player_name': df['player_name'].astype(str).to_numpy(),
+        'state_institution': df['state_institution'].fillna('').astype(str).to_numpy(),
+    })
+
+
+def build_observations(df):
+    """Distinct (raw id, name, institution) rows with the seasons they appear in as a bitmask."""
+    # Files whose season could not be read (season 'Unknown') still count, they just set no bit
+    years = pd.to_numeric(df['season_year'], errors='coerce').astype('Int64').array
+    seen = raw_id_key(df).assign(season_year=years).drop_duplicates()
+    # One bit per distinct season of this data rather than per calendar year, so any years fit
+    codes, seasons = pd.factorize(seen['season_year'], sort=True)
+    if len(seasons) > 63:
+        raise ValueError(f"{len(seasons)} seasons do not fit in a 64-bit season mask.")
+    seen['season_bit'] = np.where(codes >= 0, np.left_shift(1, np.maximum(codes, 0)), 0).astype('int64')
+    # Distinct seasons are distinct powers of two, so their sum is the bitwise OR
+    return seen.groupby(KEY_COLUMNS, sort=False).agg(
+        seasons_mask=('season_bit', 'sum'), last_season=('season_year', 'max')
+    ).reset_index()
+
+
+def load_identity_map(map_path=IDENTITY_MAP):
+    if not os.path.exists(map_path):
+        return pd.DataFrame(columns=MAP_COLUMNS)
+    return pd.read_csv(map_path, dtype={'raw_ttfi_id': str, 'player_name': str, 'state_institution': str},
+                       keep_default_na=False)
+
+
+def save_identity_map(identity_map, map_path=IDENTITY_MAP):
+    os.makedirs(os.path.dirname(map_path) or ".", exist_ok=True)
+    identity_map[MAP_COLUMNS].to_csv(map_path + ".tmp", index=False)
+    os.replace(map_path + ".tmp", map_path)
+
+
+def _find(parent, x):
+    while parent.setdefault(x, x) != x:
+        parent[x] = parent[parent[x]]
+        x = parent[x]
+    return x
+
+
+def resolve_identities(df, map_path=IDENTITY_MAP, match_threshold=MATCH_THRESHOLD,
+                       merge_threshold=MERGE_THRESHOLD):
+    """Rewrites `ttfi_id` / `player_name` of `df` to canonical ids and spellings.
+
+    Rows already in the persisted map keep their resolution; only new (id, name, institution)
+    combinations are matched. Returns (resolved df, identity map).
+    """
+    # 1. Which observations are new since the last run
+    obs = build_observations(df)
+    known = load_identity_map(map_path)
+    obs = obs.merge(known[KEY_COLUMNS + ['canonical_id', 'method', 'score']], on=KEY_COLUMNS, how='left')
+    obs['canonical_id'] = obs['canonical_id'].astype('Int64')
+    obs['name_key'] = name_key(obs['player_name'])
+    obs['name_len'] = obs['name_key'].str.len()
+    is_new = obs['canonical_id'].isna()
+
+    # 2. New rows with a usable id: that id's existing player, else a player of their own
+    id_to_canonical = known[known['raw_ttfi_id'] != ''].groupby('raw_ttfi_id')['canonical_id'].first()
+    with_id = is_new & (obs['raw_ttfi_id'] != '')
+    raw_ids = obs.loc[with_id, 'raw_ttfi_id']
+    obs.loc[with_id, 'canonical_id'] = raw_ids.map(id_to_canonical).fillna(raw_ids.astype('int64')).astype('int64')
+    obs.loc[with_id, ['method', 'score']] = ['id', 100.0]
+
+    # 3. Different ids, same player: near-identical name in the same block, never in the same season
+    parent, merged = {}, set()
+    if with_id.any():
+        resolved = obs[obs['canonical_id'].notna()]
+        masks = _seasons_by_player(resolved)
+        pairs = candidate_pairs(obs[with_id], resolved, merge_threshold, merge_threshold)
+        for l, r, score in pairs.itertuples(index=False):
+            a, b = _find(parent, obs.at[l, 'canonical_id']), _find(parent, obs.at[r, 'canonical_id'])
+            if a != b and not (masks[a] & masks[b]):
+                parent[a] = b
+                masks[b] |= masks[a]
+                merged.add(b)
+                obs.loc[l, ['method', 'score']] = ['merged', score]
+        obs['canonical_id'] = obs['canonical_id'].map(lambda c: _find(parent, c) if pd.notna(c) else c)
+        merged = {_find(parent, c) for c in merged}
+
+    # 4. New rows without an id: best-scoring existing player in their blocks...
+    no_id = obs.index[is_new & (obs['raw_ttfi_id'] == '')]
+    if len(no_id):
+        resolved = obs[obs['canonical_id'].notna()]
+        masks = _seasons_by_player(resolved)
+        pairs = candidate_pairs(obs.loc[no_id], resolved, match_threshold, merge_threshold)
+        pairs = pairs.sort_values('score', ascending=False, kind='stable')
+        for l, group in pairs.groupby('obs_l', sort=False):
+            for r, score in zip(group['obs_r'], group['score']):
+                target = obs.at[r, 'canonical_id']
+                # The same name twice in one season is two players, unless it is spelled identically
+                if score == 100 or not (masks[target] & obs.at[l, 'seasons_mask']):
+                    obs.loc[l, ['canonical_id', 'method', 'score']] = [target, 'fuzzy', score]
+                    masks[target] |= obs.at[l, 'seasons_mask']
+                    break
+
+        # ...else clustered with the other unmatched rows, one synthetic id per cluster
+        rest = obs.loc[no_id][obs.loc[no_id, 'canonical_id'].isna()]
+        cluster, masks = {}, rest['seasons_mask'].to_dict()
+        for l, r, _ in candidate_pairs(rest, rest, match_threshold, merge_threshold).itertuples(index=False):
+            a, b = _find(cluster, l), _find(cluster, r)
+            if a != b and not (masks[a] & masks[b]):
+                cluster[a] = b
+                masks[b] |= masks[a]
+        used = obs['canonical_id'].dropna()
+        next_id = max(SYNTHETIC_ID_BASE, int(used.max()) + 1 if len(used) else 0)
+        roots = pd.Series([_find(cluster, i) for i in rest.index], index=rest.index)
+        synthetic = {root: next_id + n for n, root in enumerate(pd.unique(roots))}
+        obs.loc[rest.index, 'canonical_id'] = roots.map(synthetic)
+        obs.loc[rest.index, ['method', 'score']] = ['new', 100.0]
+
+    # 5. A merged player keeps the id it was listed under most recently
+    obs['canonical_id'] = obs['canonical_id'].astype('int64')
+    preferred = {}
+    if merged:
+        latest = obs[obs['canonical_id'].isin(merged) & (obs['raw_ttfi_id'] != '')]
+        latest = latest.sort_values('last_season', ascending=False, kind='stable').drop_duplicates('canonical_id')
+        preferred = dict(zip(latest['canonical_id'], latest['raw_ttfi_id'].astype('int64')))
+        obs['canonical_id'] = obs['canonical_id'].map(lambda c: preferred.get(c, c))
+
+    # Variants from earlier runs that are not in this data stay in the map (and follow any merge)
+    earlier = known.merge(obs[KEY_COLUMNS], on=KEY_COLUMNS, how='left', indicator=True)
+    earlier = earlier[earlier['_merge'] == 'left_only'].drop(columns='_merge')
+    earlier['canonical_id'] = earlier['canonical_id'].astype('int64').map(
+        lambda c: preferred.get(_find(parent, c), _find(parent, c)))
+    identity_map = pd.concat([earlier[MAP_COLUMNS], obs[MAP_COLUMNS]], ignore_index=True) if len(earlier) else obs[MAP_COLUMNS]
+    save_identity_map(identity_map, map_path)
+
+    # 6. Canonical spelling = the most recent one
+    canonical_name = (identity_map.sort_values('last_season', ascending=False, kind='stable')
+                      .drop_duplicates('canonical_id').set_index('canonical_id')['player_name'])
+
+    ids = raw_id_key(df).merge(obs[KEY_COLUMNS + ['canonical_id']], on=KEY_COLUMNS, how='left')['canonical_id']
+    resolved_df = df.copy()
+    resolved_df['ttfi_id'] = ids.to_numpy()
+    resolved_df['player_name'] = ids.map(canonical_name).to_numpy()
+
+    print(f"Identity resolution: {len(obs)} name/id variants ({int(is_new.sum())} new) -> "
+          f"{obs['canonical_id'].nunique()} players ({(obs['method'] == 'merged').sum()} id merges, "
+          f"{(obs['method'] == 'fuzzy').sum()} fuzzy matches, {(obs['method'] == 'new').sum()} synthetic ids)")
+    return resolved_df, identity_map
+
+
+def run_identity_resolution(master_csv=MASTER_CSV, store_dir=STORE_DIR, map_path=IDENTITY_MAP):
+    """Resolves the master long dataset in place (CSV and columnar store)."""
+    master_df = pd.read_csv(master_csv)
+    resolved_df, identity_map = resolve_identities(master_df, map_path)
+    resolved_df.to_csv(master_csv, index=False)
+    write_master_store(resolved_df, store_dir)
+    print(f"SUCCESS: Identity map saved to {map_path}")
+    return resolved_df
+
+
+if __name__ == "__main__":
+    run_identity_resolution()
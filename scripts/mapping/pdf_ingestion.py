@@ -0,0 +1,187 @@
+# PDF ranking-list ingestion: TTFI lists published only as PDFs -> the master long-format schema.
+# Pages are parsed with pdfplumber across a process pool and cached by (file hash, page number),
+# so a re-run skips unchanged PDFs entirely. Any edit to a PDF changes its hash, so an edited file
+# is re-parsed in full (a page-level content key would need every page loaded just to hash it).
+#
+#   python -m scripts.mapping.pdf_ingestion --raw-dir data/raw
+
+import argparse
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from scripts.mapping.header_mapping import OUTPUT_COLUMNS, detect_columns, reshape_raw_table, season_from_path
+
+# Configuration
+RAW_DIR = "data/raw"
+PROCESSED_DIR = "data/processed"
+PAGE_CACHE_DIR = "data/processed/pdf_page_cache"
+PAGES_PER_TASK = 8
+# pdfplumber table finder settings; part of the cache key, so changing them re-parses every page
+TABLE_SETTINGS = {"vertical_strategy": "lines", "horizontal_strategy": "lines"}
+
+
+def pdf_cache_key(path, table_settings=TABLE_SETTINGS):
+    """Content hash of the PDF plus the extraction settings: a renamed file keeps its cache."""
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    digest.update(json.dumps(table_settings, sort_keys=True).encode())
+    return digest.hexdigest()[:16]
+
+
+def page_cache_path(cache_dir, key, page_no):
+    return os.path.join(cache_dir, key, f"page_{page_no:05d}.json")
+
+
+def page_count(path, cache_dir, key):
+    meta_path = os.path.join(cache_dir, key, "meta.json")
+    if os.path.exists(meta_path):
+        with open(meta_path) as f:
+            return json.load(f)['pages']
+
+    # pypdfium2 reads the page tree without laying out any page
+    import pypdfium2
+    doc = pypdfium2.PdfDocument(path)
+    n_pages = len(doc)
+    doc.close()
+
+    os.makedirs(os.path.dirname(meta_path), exist_ok=True)
+    with open(meta_path, "w") as f:
+        json.dump({'source': os.path.basename(path), 'pages': n_pages}, f)
+    return n_pages
+
+
+def extract_pages(path, page_numbers, cache_dir, key, table_settings=TABLE_SETTINGS):
+    """Worker: parses the table rows of some pages of one PDF and writes each page to the cache."""
+    import pdfplumber
+
+    with pdfplumber.open(path) as pdf:
+        for page_no in page_numbers:
+            page = pdf.pages[page_no]
+            rows = []
+            for table in page.extract_tables(table_settings):
+                rows.extend([["" if cell is None else cell for cell in row] for row in table])
+            page.close()
+
+            out = page_cache_path(cache_dir, key, page_no)
+            with open(out + ".tmp", "w") as f:
+                json.dump(rows, f)
+            os.replace(out + ".tmp", out)
+    return len(page_numbers)
+
+
+def load_page_rows(cache_dir, key, n_pages):
+    pages = []
+    for page_no in range(n_pages):
+        with open(page_cache_path(cache_dir, key, page_no)) as f:
+            pages.append(json.load(f))
+    return pages
+
+
+def _header_index(rows):
+    """Index of the column-header row on a page, or None when the page only continues the table."""
+    for i, row in enumerate(rows):
+        col_map, tournaments = detect_columns(row)
+        if 'ttfi_id' in col_map and 'player_name' in col_map and tournaments:
+            return i
+    return None
+
+
+def assemble_raw_table(pages):
+    """Stitches per-page table rows into the raw CSV layout (locations, dates, headers, players).
+
+    The first page carrying a header row supplies the header block (the two rows above it are the
+    venues and dates). On every page, rows down to a repeated header are dropped.
+    """
+    header_block, players = None, []
+    for rows in pages:
+        idx = _header_index(rows)
+        if idx is not None:
+            if header_block is None:
+                above = [[""] * len(rows[idx])] * 2 + rows[max(idx - 2, 0):idx]
+                header_block = above[-2:] + [rows[idx]]
+            rows = rows[idx + 1:]
+        players.extend(rows)
+
+    if header_block is None:
+        return None
+
+    width = len(header_block[2])
+    col_map, _ = detect_columns(header_block[2])
+    name_col = col_map['player_name']
+    grid = [(list(r) + [""] * width)[:width] for r in header_block + players]
+    df_raw = pd.DataFrame(grid)
+    # Keep the header block, then only rows that name a player (drops blank filler and footer rows)
+    is_player = df_raw[name_col].astype(str).str.strip().ne("")
+    is_player.iloc[:3] = True
+    df_raw = df_raw[is_player].reset_index(drop=True)
+
+    # Blank cells behave like the empty cells of a raw CSV read
+    cells = df_raw.apply(lambda col: col.astype(str).str.strip())
+    return df_raw.mask(cells.eq(""), np.nan)
+
+
+def ingest_pdfs(pdf_paths, workers=None, cache_dir=PAGE_CACHE_DIR, table_settings=TABLE_SETTINGS):
+    """Parses every uncached page of `pdf_paths` in parallel and returns one long frame per PDF."""
+    # 1. Which pages still need parsing
+    files, tasks = [], []
+    for path in pdf_paths:
+        key = pdf_cache_key(path, table_settings)
+        n_pages = page_count(path, cache_dir, key)
+        files.append((path, key, n_pages))
+        missing = [p for p in range(n_pages) if not os.path.exists(page_cache_path(cache_dir, key, p))]
+        tasks.extend((path, missing[i:i + PAGES_PER_TASK], key)
+                     for i in range(0, len(missing), PAGES_PER_TASK))
+
+    total_pages = sum(n for _, _, n in files)
+    parsed = sum(len(pages) for _, pages, _ in tasks)
+    print(f"PDF ingestion: {len(files)} files, {total_pages} pages ({total_pages - parsed} cached, {parsed} to parse)")
+
+    # 2. Page batches across the pool; each batch opens its PDF once
+    if len(tasks) > 1 and workers != 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            list(pool.map(extract_pages, [t[0] for t in tasks], [t[1] for t in tasks],
+                          [cache_dir] * len(tasks), [t[2] for t in tasks], [table_settings] * len(tasks)))
+    else:
+        for path, pages, key in tasks:
+            extract_pages(path, pages, cache_dir, key, table_settings)
+
+    # 3. Cached pages -> raw grid -> the same long format as the CSV mapping
+    frames = []
+    for path, key, n_pages in files:
+        df_raw = assemble_raw_table(load_page_rows(cache_dir, key, n_pages))
+        if df_raw is None:
+            print(f"  ⚠️ No ranking table header found in {os.path.basename(path)}; skipped.")
+            continue
+        frames.append(reshape_raw_table(df_raw, season_from_path(path)))
+    return frames
+
+
+def run_pdf_ingestion(raw_dir=RAW_DIR, processed_dir=PROCESSED_DIR, workers=None, cache_dir=PAGE_CACHE_DIR):
+    pdf_paths = sorted(os.path.join(raw_dir, f) for f in os.listdir(raw_dir) if f.lower().endswith('.pdf'))
+    frames = ingest_pdfs(pdf_paths, workers, cache_dir)
+
+    pdf_df = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=OUTPUT_COLUMNS)
+    os.makedirs(processed_dir, exist_ok=True)
+    pdf_df.to_csv(os.path.join(processed_dir, "pdf_long_dataset.csv"), index=False)
+    print(f"SUCCESS: {len(pdf_df)} tournament entries from {len(frames)} PDFs saved to {processed_dir}/pdf_long_dataset.csv")
+    return pdf_df
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Extract TTFI ranking tables from PDFs into long format.")
+    parser.add_argument("--raw-dir", default=RAW_DIR)
+    parser.add_argument("--processed-dir", default=PROCESSED_DIR)
+    parser.add_argument("--workers", type=int, default=None, help="Process pool size (1 = parse serially)")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    run_pdf_ingestion(args.raw_dir, args.processed_dir, args.workers)
@@ -0,0 +1,136 @@
+import hashlib
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from scripts.feature_engineering.sliding_window import build_supervised_dataset
+from scripts.modeling.ensemble_runner import fit_seed_ensemble, predict_ensemble
+from scripts.modeling.model_registry import data_hash, load_tuned_params
+from scripts.modeling.train_xgboost_ensemble import ENSEMBLE_PARAMS, ENSEMBLE_SEEDS
+from scripts.storage.columnar_store import load_master
+
+# Configuration
+CACHE_DIR = "data/processed/backtest_folds"
+OUTPUT_DIR = "data/insights"
+FEATURES = ['pts_lag_1', 'pts_lag_2', 'pts_lag_3', 'momentum_yoy', 'career_volatility']
+TARGET = 'total_seasonal_points'
+TOP_K = 10
+
+
+def fold_years(supervised_df):
+    """Every season that can be back-tested: it needs at least one earlier season to train on."""
+    years = sorted(supervised_df['season_year'].unique())
+    return [int(y) for y in years[1:]]
+
+
+def build_fold(supervised_df, test_year, features=FEATURES, target=TARGET):
+    """Walk-forward split for one cutoff: train < test_year - 1, early-stop on test_year - 1, test on test_year.
+
+    With only one earlier season there is nothing to early-stop on, so that season is all training data.
+    """
+    past = supervised_df[supervised_df['season_year'] < test_year]
+    has_val = past['season_year'].nunique() >= 2
+    val_year = test_year - 1 if has_val else None
+
+    split = np.where(past['season_year'] == val_year, 'val', 'train')
+    fold = pd.concat([
+        past.assign(split=split),
+        supervised_df[supervised_df['season_year'] == test_year].assign(split='test'),
+    ])
+    return fold[['ttfi_id', 'season_year', 'split'] + list(features) + [target]].reset_index(drop=True)
+
+
+def cached_fold_path(supervised_df, test_year, features=FEATURES, target=TARGET, cache_dir=CACHE_DIR):
+    """Builds the fold's feature matrix once and returns its Parquet path (reused while the data is unchanged)."""
+    key = hashlib.sha1(
+        f"{data_hash(supervised_df, ['ttfi_id', 'season_year'] + list(features) + [target])}"
+        f"|{test_year}|{','.join(features)}|{target}".encode()
+    ).hexdigest()[:16]
+    path = os.path.join(cache_dir, f"fold_{test_year}_{key}.parquet")
+    if not os.path.exists(path):
+        os.makedirs(cache_dir, exist_ok=True)
+        build_fold(supervised_df, test_year, features, target).to_parquet(path + ".tmp", index=False)
+        os.replace(path + ".tmp", path)
+    return path
+
+
+def fold_metrics(actual, predicted, top_k=TOP_K):
+    """Spearman rank correlation, top-k hit rate and MAE of one fold's forecast."""
+    actual = pd.Series(np.asarray(actual, dtype=float))
+    predicted = pd.Series(np.asarray(predicted, dtype=float))
+    k = min(top_k, len(actual))
+    hits = len(set(actual.nlargest(k).index) & set(predicted.nlargest(k).index))
+    return {
+        'n_players': len(actual),
+        'spearman': round(actual.corr(predicted, method='spearman'), 4) if len(actual) > 1 else np.nan,
+        f'top_{top_k}_hit_rate': round(hits / k, 4) if k else np.nan,
+        'mae': round(float(np.mean(np.abs(actual - predicted))), 3),
+    }
+
+
+def evaluate_fold(fold_path, params, seeds, features=FEATURES, target=TARGET, top_k=TOP_K, threads=1):
+    """Trains the seed ensemble on one cached fold and scores its test season."""
+    fold = pd.read_parquet(fold_path)
+    train, val, test = (fold[fold['split'] == s] for s in ('train', 'val', 'test'))
+    if val.empty:
+        params = {k: v for k, v in params.items() if k != 'early_stopping_rounds'}
+
+    boosters, stats = fit_seed_ensemble(
+        train[features], train[target],
+        val[features] if not val.empty else None, val[target] if not val.empty else None,
+        params, seeds, workers=1, threads_per_model=threads
+    )
+    predicted = predict_ensemble(boosters, test[features])
+
+    result = {'test_year': int(test['season_year'].iloc[0]), 'train_rows': len(train), 'val_rows': len(val)}
+    result.update(fold_metrics(test[target].to_numpy(), predicted, top_k))
+    result['fit_seconds'] = stats['wall_seconds']
+    return result
+
+
+def run_backtest(params=None, seeds=None, top_k=TOP_K, workers=None, supervised_df=None):
+    """Walk-forward backtest of the ensemble for every possible cutoff year, folds in parallel."""
+    params = load_tuned_params(ENSEMBLE_PARAMS) if params is None else params
+    seeds = ENSEMBLE_SEEDS if seeds is None else seeds
+
+    # 1. Supervised frame straight from the sliding-window builder (no CSV round trip)
+    if supervised_df is None:
+        supervised_df = build_supervised_dataset(load_master(
+            columns=['season_year', 'ttfi_id', 'player_name', 'state_institution',
+                     'total_seasonal_points', 'points_earned']))
+
+    years = fold_years(supervised_df)
+    if not years:
+        print("Backtest: need at least two seasons with full lag history; nothing to evaluate.")
+        return pd.DataFrame()
+
+    # 2. Cached per-fold feature matrices
+    fold_paths = [cached_fold_path(supervised_df, year) for year in years]
+
+    # 3. One process per fold; each fold's seeds share that process's share of the cores
+    workers = min(workers or os.cpu_count() or 1, len(fold_paths))
+    threads = max(1, (os.cpu_count() or 1) // workers)
+    print(f"Backtesting {len(years)} folds ({years[0]}-{years[-1]}) on {workers} workers...")
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(evaluate_fold, fold_paths, [params] * len(fold_paths),
+                                    [seeds] * len(fold_paths), [FEATURES] * len(fold_paths),
+                                    [TARGET] * len(fold_paths), [top_k] * len(fold_paths),
+                                    [threads] * len(fold_paths)))
+    else:
+        results = [evaluate_fold(path, params, seeds, top_k=top_k, threads=threads) for path in fold_paths]
+
+    report = pd.DataFrame(results)
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+    report.to_csv(os.path.join(OUTPUT_DIR, "backtest_report.csv"), index=False)
+
+    print("\n--- Walk-Forward Backtest ---")
+    print(report.to_string(index=False))
+    print(f"\nSUCCESS: Backtest report saved to {OUTPUT_DIR}/backtest_report.csv")
+    return report
+
+
+if __name__ == "__main__":
+    run_backtest()
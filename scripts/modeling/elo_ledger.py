@@ -0,0 +1,139 @@
+import hashlib
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from scripts.modeling.elo_engine import BASE_RATING, K_FACTOR, iter_tournaments, update_tournament
+
+# Configuration
+LEDGER_DIR = "data/processed/elo_ledger"
+EVENTS_FILE = "events.json"
+HISTORY_FILE = "history.csv"
+
+
+def _event_hash(rows):
+    """Content hash of one tournament: who entered, in which order, with how many points."""
+    payload = pd.util.hash_pandas_object(rows[['ttfi_id', 'points_earned']], index=False)
+    return hashlib.sha1(payload.to_numpy().tobytes()).hexdigest()
+
+
+def build_event_index(df):
+    """Chronological list of events in `df`, each with its row positions and content hash."""
+    events = []
+    for year, tourney, rows in iter_tournaments(df['season_year'].to_numpy(), df['tournament_name'].to_numpy()):
+        events.append({
+            'season_year': int(year),
+            'tournament_name': str(tourney),
+            'n_entries': len(rows),
+            'hash': _event_hash(df.iloc[rows]),
+            'rows': rows,
+        })
+    return events
+
+
+def load_ledger(ledger_dir=LEDGER_DIR):
+    """Returns (manifest, history_df). An empty ledger is returned if nothing was saved yet."""
+    events_path = os.path.join(ledger_dir, EVENTS_FILE)
+    history_path = os.path.join(ledger_dir, HISTORY_FILE)
+    if not (os.path.exists(events_path) and os.path.exists(history_path)):
+        return {'mode': None, 'k_factor': None, 'events': []}, pd.DataFrame(columns=['seq', 'ttfi_id', 'rating'])
+
+    with open(events_path) as f:
+        manifest = json.load(f)
+    history = pd.read_csv(history_path, dtype={'ttfi_id': str})
+    return manifest, history
+
+
+def save_ledger(manifest, history, ledger_dir=LEDGER_DIR):
+    # Write to temp files first so an interrupted run never leaves a half-written checkpoint
+    os.makedirs(ledger_dir, exist_ok=True)
+    events_path = os.path.join(ledger_dir, EVENTS_FILE)
+    history_path = os.path.join(ledger_dir, HISTORY_FILE)
+
+    history.to_csv(history_path + ".tmp", index=False)
+    with open(events_path + ".tmp", "w") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(history_path + ".tmp", history_path)
+    os.replace(events_path + ".tmp", events_path)
+
+
+def first_changed_event(stored_events, events):
+    """Index of the first event that is new or differs from the checkpoint."""
+    for seq, (old, new) in enumerate(zip(stored_events, events)):
+        if (old['season_year'], old['tournament_name'], old['hash']) != \
+           (new['season_year'], new['tournament_name'], new['hash']):
+            return seq
+    return min(len(stored_events), len(events))
+
+
+def ratings_before(history, seq):
+    """Latest rating of every player strictly before event `seq`."""
+    past = history[history['seq'] < seq]
+    if past.empty:
+        return {}
+    return past.sort_values('seq').groupby('ttfi_id')['rating'].last().to_dict()
+
+
+def update_ledger(df, mode='sequential', k_factor=K_FACTOR, ledger_dir=LEDGER_DIR, full_replay=False):
+    """Brings the persisted ledger up to date with `df` and returns {ttfi_id: rating}.
+
+    Only events after the first new or edited one are replayed. Changing the mode or
+    K-factor invalidates the checkpoint and forces a full replay.
+    """
+    df = df.dropna(subset=['ttfi_id']).reset_index(drop=True)
+    df['ttfi_id'] = df['ttfi_id'].astype(str)
+    df['points_earned'] = pd.to_numeric(df['points_earned'], errors='coerce').fillna(0)
+
+    events = build_event_index(df)
+    manifest, history = load_ledger(ledger_dir)
+
+    settings_changed = manifest['mode'] != mode or manifest['k_factor'] != k_factor
+    start = 0 if (full_replay or settings_changed) else first_changed_event(manifest['events'], events)
+
+    # Restore the checkpointed state just before the first event we have to (re)play
+    history = history[history['seq'] < start]
+    state = ratings_before(history, start)
+
+    player_idx, unique_players = pd.factorize(df['ttfi_id'])
+    ratings = np.array([state.get(pid, BASE_RATING) for pid in unique_players], dtype=np.float64)
+    points = df['points_earned'].to_numpy()
+
+    new_history = []
+    for seq in range(start, len(events)):
+        rows = events[seq]['rows']
+        idx = player_idx[rows]
+        update_tournament(ratings, idx, points[rows], mode=mode, k_factor=k_factor)
+        touched = np.unique(idx)
+        new_history.append(pd.DataFrame({
+            'seq': seq,
+            'ttfi_id': unique_players[touched],
+            'rating': ratings[touched],
+        }))
+
+    if new_history:
+        parts = ([history] if not history.empty else []) + new_history
+        history = pd.concat(parts, ignore_index=True)
+
+    manifest = {
+        'mode': mode,
+        'k_factor': k_factor,
+        'events': [{k: v for k, v in e.items() if k != 'rows'} for e in events],
+    }
+    save_ledger(manifest, history, ledger_dir)
+
+    replayed = len(events) - start
+    print(f"Elo ledger: {replayed} of {len(events)} events applied (replayed from event #{start}).")
+
+    return dict(zip(unique_players, ratings))
+
+
+def get_rating_history(ttfi_id, ledger_dir=LEDGER_DIR):
+    """Rating of one player after each event they entered, in chronological order."""
+    manifest, history = load_ledger(ledger_dir)
+    events = pd.DataFrame(manifest['events'], columns=['season_year', 'tournament_name'])
+    events['seq'] = np.arange(len(events))
+
+    player = history[history['ttfi_id'] == str(ttfi_id)]
+    return player.merge(events, on='seq', how='left')[['seq', 'season_year', 'tournament_name', 'rating']]
@@ -1,56 +1,64 @@
 import pandas as pd
 import numpy as np
 import os
+import sys
+
+# Repo root on the path, so `python scripts/modeling/elo_rating_system.py` finds the scripts package too
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if ROOT_DIR not in sys.path:
+    sys.path.append(ROOT_DIR)
+
+from scripts.modeling.elo_engine import run_elo_engine
+from scripts.modeling.elo_ledger import update_ledger
+from scripts.modeling.glicko_engine import run_glicko_engine
+from scripts.modeling.win_probability import (MATRIX_DIR, MATRIX_TOP_N, export_top_n,
+                                              load_win_matrix, win_probability)
+from scripts.storage.columnar_store import load_master
 
 # Configuration
 INPUT_FILE = "data/processed/master_long_dataset.csv"
 OUTPUT_DIR = "data/insights"
 K_FACTOR = 32 # Standard sensitivity for skill rating changes
 
-def calculate_elo(rating_a, rating_b, actual_a):
-    """Calculates the new ratings for two players after a match."""
-    expected_a = 1 / (1 + 10 ** ((rating_b - rating_a) / 400))
-    new_rating_a = rating_a + K_FACTOR * (actual_a - expected_a)
-    return round(new_rating_a, 2)
+def run_elo_simulation(mode='sequential', incremental=True, full_matrix=False):
+    """Replays every tournament through the vectorized Elo engine.
 
-def run_elo_simulation():
+    mode: 'sequential' (the original pairwise loop; reproduces the published ratings and is
+    what the pipeline runs), 'simultaneous' (order-independent batch update with K scaled to
+    ~log2(n) matches, so ratings land on a much narrower range and only roughly agree with the
+    sequential order) or 'rank' (O(n log n) approximation for huge fields).
+    incremental: resume from the Elo ledger checkpoint and apply only new or edited events.
+    full_matrix: export the win-probability matrix for every player, not just the top MATRIX_TOP_N.
+    """
     if not os.path.exists(INPUT_FILE):
         print(f"Error: {INPUT_FILE} not found.")
         return
 
     # 1. Load and Sort Data Chronologically
-    df = pd.read_csv(INPUT_FILE)
-    df['season_year'] = pd.to_numeric(df['season_year'])
+    df = load_master(columns=['season_year', 'ttfi_id', 'player_name', 'tournament_name', 'points_earned'])
+    # Rows without an ID would all collapse onto one factorize code (-1 = the last player)
+    df = df.dropna(subset=['ttfi_id'])
     # Sorting by year to ensure ratings evolve over time
     df = df.sort_values(by=['season_year', 'tournament_name'])
-
-    # 2. Initialize Ratings
-    unique_players = df['ttfi_id'].unique()
-    player_ratings = {pid: 1500 for pid in unique_players}
     player_names = df.set_index('ttfi_id')['player_name'].to_dict()
 
-    # 3. Simulate Tournament "Virtual Matches"
-    # We group by tournament to compare players playing in the same event
-    grouped = df.groupby(['season_year', 'tournament_name'])
-    
-    print("Simulating Elo ratings across 5 seasons...")
-    
-    for (year, tourney), group in grouped:
-        # Sort players in this tournament by points (Highest to lowest)
-        standings = group.sort_values(by='points_earned', ascending=False)
-        pids = standings['ttfi_id'].tolist()
-        
-        # Every player 'plays' everyone else in the tournament
-        # Higher points = Win, Lower points = Loss
-        for i in range(len(pids)):
-            for j in range(i + 1, len(pids)):
-                p1, p2 = pids[i], pids[j]
-                
-                r1, r2 = player_ratings[p1], player_ratings[p2]
-                
-                # p1 finished higher than p2, so p1 wins
-                player_ratings[p1] = calculate_elo(r1, r2, 1)
-                player_ratings[p2] = calculate_elo(r2, r1, 0)
+    # 2. Simulate Tournament "Virtual Matches"
+    # Each (season_year, tournament_name) event is resolved as one array operation
+    print(f"Simulating Elo ratings across {df['season_year'].nunique()} seasons ({mode} mode)...")
+
+    if incremental:
+        # 3a. Resume from the persisted ledger, replaying only unseen/edited events
+        ledger_ratings = update_ledger(df, mode=mode, k_factor=K_FACTOR)
+        player_ratings = {pid: round(ledger_ratings[str(pid)], 2) for pid in df['ttfi_id'].unique()}
+    else:
+        # 3b. Full replay from 1500 (one array slot per player)
+        player_idx, unique_players = pd.factorize(df['ttfi_id'])
+        ratings = run_elo_engine(
+            player_idx, df['season_year'].to_numpy(), df['tournament_name'].to_numpy(),
+            df['points_earned'].to_numpy(),
+            n_players=len(unique_players), mode=mode, k_factor=K_FACTOR
+        )
+        player_ratings = dict(zip(unique_players, np.round(ratings, 2)))
 
     # 4. Convert Results to DataFrame
     elo_df = pd.DataFrame([
@@ -58,11 +66,18 @@ def run_elo_simulation():
         for pid, rating in player_ratings.items()
     ])
 
-    # 5. Generate Win Probability Matrix (Top 5 Players)
+    # 5. Generate Win Probability Matrix (top MATRIX_TOP_N players unless full_matrix; skipped if ratings are unchanged)
     top_5 = elo_df.nlargest(5, 'elo_rating')
     print("\n--- Current Top 5 by Elo Rating (Skill Level) ---")
     print(top_5[['player_name', 'elo_rating']].to_string(index=False))
 
+    _, written = export_top_n(elo_df, None if full_matrix else MATRIX_TOP_N, MATRIX_DIR)
+    if len(top_5) >= 2:
+        wm = load_win_matrix(MATRIX_DIR)
+        a, b = top_5['ttfi_id'].iloc[0], top_5['ttfi_id'].iloc[1]
+        print(f"P({top_5['player_name'].iloc[0]} beats {top_5['player_name'].iloc[1]}) = "
+              f"{win_probability(wm, a, b):.3f}  (matrix {'written to' if written else 'unchanged in'} {MATRIX_DIR}/)")
+
     # Save results
     os.makedirs(OUTPUT_DIR, exist_ok=True)
     elo_df.sort_values('elo_rating', ascending=False).to_csv(
@@ -70,5 +85,52 @@ def run_elo_simulation():
     )
     print(f"\nSUCCESS: Elo ratings saved to {OUTPUT_DIR}/player_elo_ratings.csv")
 
+def run_glicko_simulation(period='tournament'):
+    """Glicko-2 alternative to run_elo_simulation: rating, deviation (confidence) and volatility.
+
+    period: 'tournament' (each event is a rating period) or 'season' (all of a season's
+    events form one period). Every participant of a period is updated at once.
+    """
+    if not os.path.exists(INPUT_FILE):
+        print(f"Error: {INPUT_FILE} not found.")
+        return
+
+    # 1. Load data (the engine orders events chronologically itself); rows without an ID are
+    # dropped, as factorize would code them all -1 (= the last player's slot)
+    df = load_master(columns=['season_year', 'ttfi_id', 'player_name', 'tournament_name', 'points_earned'])
+    df = df.dropna(subset=['ttfi_id'])
+    player_names = df.set_index('ttfi_id')['player_name'].to_dict()
+
+    # 2. Batch Glicko-2 replay (one array slot per player)
+    print(f"Simulating Glicko-2 ratings across {df['season_year'].nunique()} seasons (one period per {period})...")
+    player_idx, unique_players = pd.factorize(df['ttfi_id'])
+    rating, rd, volatility = run_glicko_engine(
+        player_idx, df['season_year'].to_numpy(), df['tournament_name'].to_numpy(),
+        df['points_earned'].to_numpy(), n_players=len(unique_players), period=period
+    )
+
+    # 3. Convert Results to DataFrame
+    glicko_df = pd.DataFrame({
+        'ttfi_id': unique_players,
+        'player_name': [player_names[pid] for pid in unique_players],
+        'glicko_rating': np.round(rating, 2),
+        'rating_deviation': np.round(rd, 2),
+        'volatility': np.round(volatility, 5),
+    })
+    # Conservative skill estimate: a 95% lower bound, so a barely-seen player can't top the table
+    glicko_df['conservative_rating'] = (glicko_df['glicko_rating'] - 2 * glicko_df['rating_deviation']).round(2)
+
+    print("\n--- Current Top 5 by Glicko-2 (rating - 2 RD) ---")
+    print(glicko_df.nlargest(5, 'conservative_rating')[['player_name', 'glicko_rating', 'rating_deviation']]
+          .to_string(index=False))
+
+    # Save results
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+    glicko_df.sort_values('conservative_rating', ascending=False).to_csv(
+        os.path.join(OUTPUT_DIR, "player_glicko_ratings.csv"), index=False
+    )
+    print(f"\nSUCCESS: Glicko-2 ratings saved to {OUTPUT_DIR}/player_glicko_ratings.csv")
+    return glicko_df
+
 if __name__ == "__main__":
     run_elo_simulation()
\ No newline at end of file
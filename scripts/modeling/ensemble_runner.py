@@ -0,0 +1,83 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import xgboost as xgb
+
+# Configuration
+# Keys that belong to the training loop rather than to the booster itself
+LOOP_KEYS = ('n_estimators', 'early_stopping_rounds', 'n_jobs')
+
+
+def thread_budget(n_models, workers=None, threads_per_model=None, cores=None):
+    """Splits the machine's cores between concurrent models so workers x threads never exceeds them."""
+    cores = cores or os.cpu_count() or 1
+    if workers is None:
+        workers = min(n_models, cores) if threads_per_model is None else max(1, cores // threads_per_model)
+    workers = max(1, min(workers, n_models))
+    if threads_per_model is None:
+        threads_per_model = max(1, cores // workers)
+    return workers, threads_per_model
+
+
+def booster_params(params, seed, nthread):
+    """Translates XGBRegressor-style hyperparameters to xgb.train parameters."""
+    booster = {k: v for k, v in params.items() if k not in LOOP_KEYS}
+    booster.setdefault('objective', 'reg:squarederror')
+    booster.update(seed=seed, nthread=nthread)
+    return booster
+
+
+def build_matrices(X_train, y_train, X_val=None, y_val=None):
+    """Quantised training matrix (and validation matrix on the same bins), built once per ensemble."""
+    dtrain = xgb.QuantileDMatrix(X_train, label=y_train)
+    dval = xgb.QuantileDMatrix(X_val, label=y_val, ref=dtrain) if X_val is not None else None
+    return dtrain, dval
+
+
+def fit_seed_ensemble(X_train, y_train, X_val, y_val, params, seeds, workers=None, threads_per_model=None):
+    """Fits one booster per seed, `workers` at a time with `threads_per_model` threads each.
+
+    The training/validation matrices are built once and shared by every seed. XGBoost
+    releases the GIL while boosting, so a thread pool keeps all cores busy without copies.
+    Returns (boosters in seed order, stats dict with wall/CPU time and utilisation).
+    """
+    workers, threads_per_model = thread_budget(len(seeds), workers, threads_per_model)
+    dtrain, dval = build_matrices(X_train, y_train, X_val, y_val)
+    evals = [(dval, 'validation')] if dval is not None else []
+
+    def fit(seed):
+        return xgb.train(
+            booster_params(params, seed, threads_per_model), dtrain,
+            num_boost_round=params.get('n_estimators', 100),
+            evals=evals,
+            early_stopping_rounds=params.get('early_stopping_rounds') if evals else None,
+            verbose_eval=False,
+        )
+
+    wall_start, cpu_start = time.perf_counter(), time.process_time()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        boosters = list(pool.map(fit, seeds))
+    wall, cpu = time.perf_counter() - wall_start, time.process_time() - cpu_start
+
+    cores = os.cpu_count() or 1
+    stats = {
+        'workers': workers,
+        'threads_per_model': threads_per_model,
+        'wall_seconds': round(wall, 3),
+        'cpu_seconds': round(cpu, 3),
+        'cpu_utilisation': round(cpu / (wall * cores), 3) if wall > 0 else 0.0,
+    }
+    return boosters, stats
+
+
+def predict_ensemble(boosters, X):
+    """Mean prediction of all boosters, each cut at its early-stopping best iteration."""
+    dmatrix = xgb.DMatrix(X)
+    preds = []
+    for booster in boosters:
+        best = booster.attr('best_iteration')
+        iteration_range = (0, int(best) + 1) if best is not None else (0, 0)
+        preds.append(booster.predict(dmatrix, iteration_range=iteration_range))
+    return np.mean(preds, axis=0)
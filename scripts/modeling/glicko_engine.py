@@ -0,0 +1,157 @@
+import numpy as np
+
+from scripts.modeling.elo_engine import iter_tournaments
+
+# Configuration
+BASE_RATING = 1500
+BASE_RD = 350          # rating deviation of a new player (also the cap for inactive players)
+BASE_VOLATILITY = 0.06
+TAU = 0.5              # constrains volatility changes (Glickman suggests 0.3 - 1.2)
+GLICKO_SCALE = 173.7178
+EPSILON = 1e-6         # convergence tolerance of the volatility iteration
+MAX_ITERATIONS = 100
+BLOCK_SIZE = 2048      # Max rows of the pairwise matrices held in memory at once
+
+PERIODS = ('tournament', 'season')
+
+
+def g(phi):
+    """Glicko-2 weight of an opponent's result: less for opponents with uncertain ratings."""
+    return 1.0 / np.sqrt(1.0 + 3.0 * phi ** 2 / np.pi ** 2)
+
+
+def _event_sums(mu, phi, points, players, weight):
+    # Every entrant 'plays' every other entrant of the event against the pre-period ratings.
+    # Actual score: 1 = finished with more points, 0.5 = tie, 0 = fewer points.
+    # Returns per-entry sum(w g^2 E (1 - E)) (= 1/v) and sum(w g (s - E)).
+    n = len(mu)
+    g_opp = g(phi)
+    info, score = np.zeros(n), np.zeros(n)
+    for start in range(0, n, BLOCK_SIZE):
+        stop = min(start + BLOCK_SIZE, n)
+        expected = 1.0 / (1.0 + np.exp(-g_opp[None, :] * (mu[start:stop, None] - mu[None, :])))
+        actual = 0.5 * (np.sign(points[start:stop, None] - points[None, :]) + 1.0)
+        w = np.where(players[start:stop, None] == players[None, :], 0.0, weight)
+        info[start:stop] = (w * g_opp[None, :] ** 2 * expected * (1.0 - expected)).sum(axis=1)
+        score[start:stop] = (w * g_opp[None, :] * (actual - expected)).sum(axis=1)
+    return info, score
+
+
+def update_volatility(sigma, phi, v, delta, tau=TAU, epsilon=EPSILON):
+    """New volatility for every player at once (Glickman's Illinois iteration, step 5)."""
+    a = np.log(sigma ** 2)
+    phi2 = phi ** 2
+
+    def f(x):
+        ex = np.exp(x)
+        return ex * (delta ** 2 - phi2 - v - ex) / (2.0 * (phi2 + v + ex) ** 2) - (x - a) / tau ** 2
+
+    # Bracket [A, B] around the root
+    A = a.copy()
+    big = delta ** 2 > phi2 + v
+    B = np.where(big, np.log(np.maximum(delta ** 2 - phi2 - v, 1e-300)), a - tau)
+    pending = ~big
+    k = 1
+    while pending.any() and k < MAX_ITERATIONS:
+        pending &= f(a - k * tau) < 0
+        B = np.where(pending, a - (k + 1) * tau, B)
+        k += 1
+
+    fA, fB = f(A), f(B)
+    active = np.abs(B - A) > epsilon
+    for _ in range(MAX_ITERATIONS):
+        if not active.any():
+            break
+        C = A + (A - B) * fA / (fB - fA)
+        fC = f(C)
+        swap = fC * fB <= 0
+        A = np.where(active & swap, B, A)
+        fA = np.where(active & swap, fB, np.where(active, fA / 2.0, fA))
+        B = np.where(active, C, B)
+        fB = np.where(active, fC, fB)
+        active &= np.abs(B - A) > epsilon
+    return np.exp(A / 2.0)
+
+
+def glicko2_step(mu, phi, sigma, info, score, tau=TAU):
+    """Steps 3-8 of Glicko-2 for players who played (info > 0); returns new (mu, phi, sigma)."""
+    v = 1.0 / info
+    delta = v * score
+    new_sigma = update_volatility(sigma, phi, v, delta, tau)
+    phi_star = np.sqrt(phi ** 2 + new_sigma ** 2)
+    new_phi = 1.0 / np.sqrt(1.0 / phi_star ** 2 + info)
+    new_mu = mu + new_phi ** 2 * score
+    return new_mu, new_phi, new_sigma
+
+
+def update_period(mu, phi, sigma, events, tau=TAU):
+    """Applies one rating period to the global (mu, phi, sigma) arrays in place.
+
+    `events` is a list of (player_idx, points) arrays, one pair per tournament in the period.
+    Everyone in the period is updated at once from the pre-period ratings; players who sat
+    it out keep their rating while their deviation grows (capped at BASE_RD).
+    """
+    info = np.zeros(len(mu))
+    score = np.zeros(len(mu))
+    for player_idx, points in events:
+        player_idx = np.asarray(player_idx, dtype=np.int64)
+        n = len(player_idx)
+        if n < 2:
+            continue
+        # Like the batched Elo modes, an entrant in an n-player draw plays about log2(n) real
+        # matches, not n - 1, so each virtual pairing counts as log2(n) / (n - 1) of a game
+        e_info, e_score = _event_sums(mu[player_idx], phi[player_idx], np.asarray(points, dtype=np.float64),
+                                      player_idx, np.log2(n) / (n - 1))
+        np.add.at(info, player_idx, e_info)
+        np.add.at(score, player_idx, e_score)
+
+    played = info > 0
+    idle = ~played
+    phi[idle] = np.minimum(np.sqrt(phi[idle] ** 2 + sigma[idle] ** 2), BASE_RD / GLICKO_SCALE)
+    if played.any():
+        mu[played], phi[played], sigma[played] = glicko2_step(
+            mu[played], phi[played], sigma[played], info[played], score[played], tau)
+    return mu, phi, sigma
+
+
+def iter_periods(season_years, tournament_names, period='tournament'):
+    """Yields the row positions of each event, grouped into rating periods, in chronological order."""
+    if period not in PERIODS:
+        raise ValueError(f"Unknown rating period '{period}'. Choose from {PERIODS}.")
+    batch, batch_year = [], None
+    for year, _, rows in iter_tournaments(season_years, tournament_names):
+        if period == 'tournament':
+            yield [rows]
+            continue
+        if batch and year != batch_year:
+            yield batch
+            batch = []
+        batch.append(rows)
+        batch_year = year
+    if batch:
+        yield batch
+
+
+def run_glicko_engine(player_idx, season_years, tournament_names, points,
+                      n_players=None, period='tournament', tau=TAU, initial=None):
+    """Replays every event as Glicko-2 rating periods (one per tournament, or one per season).
+
+    Returns (rating, rating_deviation, volatility) arrays on the familiar 1500 scale.
+    `initial` optionally resumes from a previous (rating, rating_deviation, volatility).
+    """
+    player_idx = np.asarray(player_idx, dtype=np.int64)
+    points = np.asarray(points, dtype=np.float64)
+    n_players = int(player_idx.max()) + 1 if n_players is None else n_players
+    if initial is None:
+        rating = np.full(n_players, float(BASE_RATING))
+        rd = np.full(n_players, float(BASE_RD))
+        sigma = np.full(n_players, BASE_VOLATILITY)
+    else:
+        rating, rd, sigma = (np.asarray(a, dtype=np.float64).copy() for a in initial)
+
+    # Glicko-2 works on its own scale
+    mu = (rating - BASE_RATING) / GLICKO_SCALE
+    phi = rd / GLICKO_SCALE
+    for batch in iter_periods(season_years, tournament_names, period):
+        update_period(mu, phi, sigma, [(player_idx[rows], points[rows]) for rows in batch], tau)
+    return mu * GLICKO_SCALE + BASE_RATING, phi * GLICKO_SCALE, sigma
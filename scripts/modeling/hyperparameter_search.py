@@ -0,0 +1,246 @@
+# Hyperparameter search for the XGBoost forecaster: Hyperband / successive halving over the
+# walk-forward backtest folds.
+# Boosting rounds are the budget. Many random configurations get a few rounds, the best 1/ETA
+# advance with ETA x more rounds, and so on up to MAX_ROUNDS. Hyperband runs several such
+# brackets, trading the number of configurations against the rounds each one starts with.
+# Candidates are scored with one seed (the 10-seed ensemble only averages away noise) on the
+# mean of every fold's test season. Each worker builds every fold's training matrix once and
+# reuses it for all of its candidates. The winner is written to TUNED_PARAMS_FILE, which the
+# forecast, the heatmap and the backtest all load on top of their defaults.
+#
+#   python -m scripts.modeling.hyperparameter_search --workers 4
+#   python -m scripts.modeling.hyperparameter_search --mode halving --candidates 27 --metric spearman
+
+import argparse
+import json
+import math
+import os
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+import xgboost as xgb
+
+from scripts.feature_engineering.sliding_window import build_supervised_dataset
+from scripts.modeling.backtest import FEATURES, TARGET, cached_fold_path, fold_metrics, fold_years
+from scripts.modeling.ensemble_runner import booster_params, build_matrices, thread_budget
+from scripts.modeling.model_registry import TUNED_PARAMS_FILE, data_hash
+from scripts.modeling.train_xgboost_ensemble import ENSEMBLE_PARAMS
+from scripts.storage.columnar_store import load_master
+
+# Configuration
+# name: (scale, low, high); 'int' and 'uniform' draw uniformly, 'log' draws log-uniformly
+SEARCH_SPACE = {
+    'learning_rate': ('log', 0.005, 0.3),
+    'max_depth': ('int', 2, 8),
+    'min_child_weight': ('log', 1.0, 20.0),
+    'subsample': ('uniform', 0.5, 1.0),
+    'colsample_bytree': ('uniform', 0.5, 1.0),
+    'reg_lambda': ('log', 0.1, 10.0),
+}
+MIN_ROUNDS = 50
+MAX_ROUNDS = 1200
+ETA = 3                         # keep the best 1/ETA of each rung, give them ETA x the rounds
+HALVING_CANDIDATES = 27         # starting configurations for --mode halving
+EARLY_STOPPING_ROUNDS = 50
+METRICS = {'mae': 1, 'spearman': -1}    # metric: sign that turns it into a loss (lower is better)
+SEARCH_SEED = 2026
+MODEL_SEED = 100
+
+
+def sample_configs(n, rng, space=SEARCH_SPACE):
+    """`n` random configurations from the search space."""
+    configs = []
+    for _ in range(n):
+        config = {}
+        for name, (scale, low, high) in space.items():
+            if scale == 'int':
+                config[name] = int(rng.integers(low, high + 1))
+            elif scale == 'log':
+                config[name] = round(float(np.exp(rng.uniform(np.log(low), np.log(high)))), 4)
+            else:
+                config[name] = round(float(rng.uniform(low, high)), 4)
+        configs.append(config)
+    return configs
+
+
+def load_fold_matrices(fold_path, features=FEATURES, target=TARGET):
+    """One cached fold as XGBoost matrices: quantised train (+ validation on the same bins) and test."""
+    fold = pd.read_parquet(fold_path)
+    train, val, test = (fold[fold['split'] == s] for s in ('train', 'val', 'test'))
+    dtrain, dval = build_matrices(train[features], train[target],
+                                  val[features] if not val.empty else None,
+                                  val[target] if not val.empty else None)
+    return {'test_year': int(test['season_year'].iloc[0]), 'dtrain': dtrain, 'dval': dval,
+            'dtest': xgb.DMatrix(test[features]), 'y_test': test[target].to_numpy()}
+
+
+# Per-process fold matrices, built once by _init_worker and shared by every candidate it scores
+_FOLDS = []
+_THREADS = 1
+
+
+def _init_worker(fold_paths, threads):
+    global _FOLDS, _THREADS
+    _FOLDS = [load_fold_matrices(path) for path in fold_paths]
+    _THREADS = threads
+
+
+def evaluate_config(config, rounds, seed=MODEL_SEED):
+    """Worker: trains `config` for up to `rounds` rounds on every fold; mean test-season metrics."""
+    scores = []
+    for fold in _FOLDS:
+        evals = [(fold['dval'], 'validation')] if fold['dval'] is not None else []
+        booster = xgb.train(booster_params(config, seed, _THREADS), fold['dtrain'],
+                            num_boost_round=int(rounds), evals=evals,
+                            early_stopping_rounds=EARLY_STOPPING_ROUNDS if evals else None,
+                            verbose_eval=False)
+        best = booster.attr('best_iteration')
+        iteration_range = (0, int(best) + 1) if best is not None else (0, 0)
+        predicted = booster.predict(fold['dtest'], iteration_range=iteration_range)
+        with warnings.catch_warnings():
+            # Short-budget candidates can predict a constant; their Spearman is simply NaN
+            warnings.filterwarnings('ignore', message="An input array is constant")
+            scores.append(fold_metrics(fold['y_test'], predicted))
+    return {'mae': round(float(np.mean([s['mae'] for s in scores])), 3),
+            'spearman': round(float(np.nanmean([s['spearman'] for s in scores])), 4)}
+
+
+def loss(result, metric):
+    value = result[metric]
+    return math.inf if value is None or np.isnan(value) else METRICS[metric] * value
+
+
+def successive_halving(configs, min_rounds, max_rounds, evaluate, metric='mae', eta=ETA):
+    """Scores `configs` at `min_rounds`, keeps the best 1/eta at eta x the rounds, until one is left
+    or `max_rounds` is reached. Returns one record per (config, rung)."""
+    history = []
+    rounds = int(round(min_rounds))
+    while True:
+        results = evaluate(configs, rounds)
+        history.extend(dict(config=c, rounds=rounds, **r) for c, r in zip(configs, results))
+        if len(configs) <= 1 or rounds >= max_rounds:
+            return history
+        order = sorted(range(len(configs)), key=lambda i: loss(results[i], metric))
+        configs = [configs[i] for i in order[:max(1, len(configs) // eta)]]
+        rounds = min(max_rounds, rounds * eta)
+
+
+def max_bracket(min_rounds, max_rounds, eta=ETA):
+    """Index of Hyperband's most aggressive bracket (eta ** s configs starting at max_rounds / eta ** s)."""
+    return int(math.floor(math.log(max_rounds / min_rounds, eta) + 1e-9))
+
+
+def hyperband(sample, min_rounds, max_rounds, evaluate, metric='mae', eta=ETA):
+    """Hyperband: successive-halving brackets from many configs at few rounds to few at `max_rounds`."""
+    s_max = max_bracket(min_rounds, max_rounds, eta)
+    history = []
+    for s in range(s_max, -1, -1):
+        n = int(math.ceil((s_max + 1) / (s + 1) * eta ** s))
+        bracket = successive_halving(sample(n), max_rounds / eta ** s, max_rounds, evaluate, metric, eta)
+        history.extend(dict(record, bracket=s) for record in bracket)
+    return history
+
+
+def run_hyperparameter_search(mode='hyperband', metric='mae', candidates=HALVING_CANDIDATES,
+                              min_rounds=MIN_ROUNDS, max_rounds=MAX_ROUNDS, eta=ETA,
+                              workers=None, seed=SEARCH_SEED, supervised_df=None, out_path=TUNED_PARAMS_FILE):
+    start = time.perf_counter()
+
+    # 1. Walk-forward folds, cached as Parquet by the backtest
+    if supervised_df is None:
+        supervised_df = build_supervised_dataset(load_master(
+            columns=['season_year', 'ttfi_id', 'player_name', 'state_institution',
+                     'total_seasonal_points', 'points_earned']))
+    years = fold_years(supervised_df)
+    if not years:
+        print("Tuning: need at least two seasons with full lag history; nothing to evaluate.")
+        return None
+    fold_paths = [cached_fold_path(supervised_df, year) for year in years]
+
+    # 2. Candidates of a rung run in parallel; each worker builds the fold matrices once
+    widest = candidates if mode == 'halving' else eta ** max_bracket(min_rounds, max_rounds, eta)
+    workers, threads = thread_budget(widest, workers)
+    print(f"Tuning on {len(years)} folds ({years[0]}-{years[-1]}), {mode}, metric={metric}, "
+          f"{workers} workers x {threads} threads...")
+    pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                               initargs=(fold_paths, threads)) if workers > 1 else None
+    if pool is None:
+        _init_worker(fold_paths, threads)
+
+    def evaluate(configs, rounds):
+        if pool is None:
+            return [evaluate_config(c, rounds) for c in configs]
+        return list(pool.map(evaluate_config, configs, [rounds] * len(configs)))
+
+    rng = np.random.default_rng(seed)
+    try:
+        if mode == 'halving':
+            history = successive_halving(sample_configs(candidates, rng), min_rounds, max_rounds,
+                                         evaluate, metric, eta)
+        else:
+            history = hyperband(lambda n: sample_configs(n, rng), min_rounds, max_rounds, evaluate, metric, eta)
+
+        # 3. Hand-picked defaults as the baseline, at their own round budget
+        defaults = {k: v for k, v in ENSEMBLE_PARAMS.items() if k in SEARCH_SPACE}
+        baseline = evaluate([defaults], ENSEMBLE_PARAMS['n_estimators'])[0]
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    # 4. Winner: the best configuration that was trained with the full round budget
+    finals = [h for h in history if h['rounds'] >= max_rounds] or history
+    best = min(finals, key=lambda h: loss(h, metric))
+    if loss(baseline, metric) <= loss(best, metric):
+        best = dict(config=defaults, rounds=ENSEMBLE_PARAMS['n_estimators'], **baseline)
+        print("No sampled configuration beat the hand-picked defaults; keeping them.")
+
+    params = dict(best['config'], n_estimators=int(best['rounds']), early_stopping_rounds=EARLY_STOPPING_ROUNDS)
+    result = {
+        'params': params,
+        'metric': metric,
+        'score': {'mae': best['mae'], 'spearman': best['spearman']},
+        'baseline': baseline,
+        'mode': mode,
+        'evaluations': len(history),
+        'folds': years,
+        'data': data_hash(supervised_df, ['ttfi_id', 'season_year'] + FEATURES + [TARGET]),
+        'created_at': time.strftime('%Y-%m-%d %H:%M:%S'),
+    }
+    os.makedirs(os.path.dirname(out_path), exist_ok=True)
+    with open(out_path + ".tmp", "w") as f:
+        json.dump(result, f, indent=2)
+    os.replace(out_path + ".tmp", out_path)
+
+    trials = pd.DataFrame([dict(h['config'], rounds=h['rounds'], mae=h['mae'], spearman=h['spearman'],
+                                bracket=h.get('bracket')) for h in history])
+    print("\n--- Final rung ---")
+    print(trials[trials['rounds'] >= max_rounds].sort_values(metric, ascending=METRICS[metric] > 0)
+          .head(5).to_string(index=False))
+    print(f"\nBaseline (hand-picked): mae {baseline['mae']}, spearman {baseline['spearman']}")
+    print(f"Winner: mae {best['mae']}, spearman {best['spearman']} -> {params}")
+    print(f"SUCCESS: {len(history)} evaluations in {time.perf_counter() - start:.1f}s; "
+          f"tuned parameters saved to {out_path}")
+    return result
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Hyperband / successive-halving search for the XGBoost forecaster.")
+    parser.add_argument("--mode", choices=['hyperband', 'halving'], default='hyperband')
+    parser.add_argument("--metric", choices=list(METRICS), default='mae')
+    parser.add_argument("--candidates", type=int, default=HALVING_CANDIDATES,
+                        help="Starting configurations for --mode halving")
+    parser.add_argument("--min-rounds", type=int, default=MIN_ROUNDS)
+    parser.add_argument("--max-rounds", type=int, default=MAX_ROUNDS)
+    parser.add_argument("--eta", type=int, default=ETA)
+    parser.add_argument("--workers", type=int, default=None, help="Process pool size (1 = run in this process)")
+    parser.add_argument("--seed", type=int, default=SEARCH_SEED)
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    run_hyperparameter_search(args.mode, args.metric, args.candidates, args.min_rounds, args.max_rounds,
+                              args.eta, args.workers, args.seed)
@@ -0,0 +1,153 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+
+import pandas as pd
+import xgboost as xgb
+
+from scripts.modeling.ensemble_runner import fit_seed_ensemble, predict_ensemble
+
+# Configuration
+REGISTRY_DIR = "data/models"
+MANIFEST_FILE = "manifest.json"
+TUNED_PARAMS_FILE = "data/models/tuned_xgboost_params.json"     # written by hyperparameter_search
+
+
+def load_tuned_params(defaults, path=TUNED_PARAMS_FILE):
+    """`defaults` overridden by the tuned hyperparameters, if a search has been run."""
+    if not os.path.exists(path):
+        return dict(defaults)
+    with open(path) as f:
+        return dict(defaults, **json.load(f)['params'])
+
+
+def data_hash(df, columns):
+    """Content hash of the columns a model is trained on (row order included)."""
+    hashed = pd.util.hash_pandas_object(df[columns], index=False)
+    return hashlib.sha1(hashed.to_numpy().tobytes()).hexdigest()
+
+
+def registry_key(df, features, target, params, seeds, validation_year):
+    """Registry entry id: same data + features + hyperparameters + seeds = same models."""
+    spec = {
+        'data': data_hash(df, ['season_year'] + list(features) + [target]),
+        'features': list(features),
+        'target': target,
+        'params': params,
+        'seeds': list(seeds),
+        'validation_year': validation_year,
+    }
+    return hashlib.sha1(json.dumps(spec, sort_keys=True).encode()).hexdigest()[:16], spec
+
+
+def _entry_dir(key, registry_dir=REGISTRY_DIR):
+    return os.path.join(registry_dir, key)
+
+
+def load_ensemble(key, registry_dir=REGISTRY_DIR):
+    """Returns (models, manifest) for a registered ensemble, or (None, None) if it is not cached."""
+    manifest_path = os.path.join(_entry_dir(key, registry_dir), MANIFEST_FILE)
+    if not os.path.exists(manifest_path):
+        return None, None
+
+    with open(manifest_path) as f:
+        manifest = json.load(f)
+    models = []
+    for seed in manifest['seeds']:
+        booster = xgb.Booster()
+        booster.load_model(os.path.join(_entry_dir(key, registry_dir), f"seed_{seed}.ubj"))
+        models.append(booster)
+    return models, manifest
+
+
+def save_ensemble(key, spec, models, registry_dir=REGISTRY_DIR, training_stats=None):
+    entry_dir = _entry_dir(key, registry_dir)
+    os.makedirs(registry_dir, exist_ok=True)
+    tmp_dir = tempfile.mkdtemp(dir=registry_dir, prefix=key + ".tmp.")
+    for seed, model in zip(spec['seeds'], models):
+        model.save_model(os.path.join(tmp_dir, f"seed_{seed}.ubj"))
+
+    manifest = dict(spec, key=key, created_at=time.strftime('%Y-%m-%d %H:%M:%S'),
+                    best_iterations=[int(m.attr('best_iteration') or -1) for m in models],
+                    training=training_stats)
+    with open(os.path.join(tmp_dir, MANIFEST_FILE), "w") as f:
+        json.dump(manifest, f, indent=2)
+
+    # An entry without a manifest is a leftover of an interrupted save
+    if not os.path.exists(os.path.join(entry_dir, MANIFEST_FILE)):
+        shutil.rmtree(entry_dir, ignore_errors=True)
+    try:
+        os.rename(tmp_dir, entry_dir)
+    except OSError:
+        # Another process registered the same key first; same key = same models, so keep theirs
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+    return manifest
+
+
+def train_seed_ensemble(df, features, target, params, seeds, validation_year, workers=None, threads_per_model=None):
+    """Fits one booster per seed: train on seasons before `validation_year`, early-stop on it.
+
+    Seeds run in parallel under an explicit thread budget (see ensemble_runner).
+    """
+    train_df = df[df['season_year'] < validation_year]
+    val_df = df[df['season_year'] == validation_year]
+
+    models, stats = fit_seed_ensemble(
+        train_df[features], train_df[target], val_df[features], val_df[target],
+        params, seeds, workers=workers, threads_per_model=threads_per_model
+    )
+    print(f"  > {len(models)} consensus rounds locked in {stats['wall_seconds']}s "
+          f"({stats['workers']} workers x {stats['threads_per_model']} threads, "
+          f"CPU utilisation {stats['cpu_utilisation']:.0%}).")
+    return models, stats
+
+
+def get_or_train_ensemble(df, features, target, params, seeds, validation_year=2024, registry_dir=REGISTRY_DIR):
+    """Loads the registered ensemble for this data/config, training and registering it only on a miss."""
+    key, spec = registry_key(df, features, target, params, seeds, validation_year)
+    models, manifest = load_ensemble(key, registry_dir)
+    if models is not None:
+        print(f"Model registry hit [{key}]: reusing {len(models)} cached boosters (no retraining).")
+        return models, manifest
+
+    print(f"Model registry miss [{key}]: training {len(seeds)}-seed ensemble...")
+    models, stats = train_seed_ensemble(df, features, target, params, seeds, validation_year)
+    manifest = save_ensemble(key, spec, models, registry_dir, training_stats=stats)
+    return models, manifest
+
+
+def list_ensembles(registry_dir=REGISTRY_DIR):
+    """Manifests of every registered ensemble, newest first."""
+    if not os.path.isdir(registry_dir):
+        return []
+    manifests = []
+    for key in os.listdir(registry_dir):
+        path = os.path.join(registry_dir, key, MANIFEST_FILE)
+        if os.path.exists(path):
+            with open(path) as f:
+                manifests.append(json.load(f))
+    return sorted(manifests, key=lambda m: m['created_at'], reverse=True)
+
+
+def predict(rows, key=None, models=None, registry_dir=REGISTRY_DIR):
+    """Batch consensus forecast: mean prediction of every seed model for each row.
+
+    Either pass the loaded `models`, a registry `key`, or neither to use the newest entry.
+    `rows` only needs the entry's feature columns.
+    """
+    manifest = None
+    if models is None:
+        if key is None:
+            entries = list_ensembles(registry_dir)
+            if not entries:
+                raise FileNotFoundError(f"No registered ensembles in {registry_dir}.")
+            key = entries[0]['key']
+        models, manifest = load_ensemble(key, registry_dir)
+        if models is None:
+            raise KeyError(f"Ensemble '{key}' not found in {registry_dir}.")
+
+    features = manifest['features'] if manifest else models[0].feature_names
+    return predict_ensemble(models, rows[features])
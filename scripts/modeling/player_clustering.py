@@ -2,91 +2,241 @@ import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
 import seaborn as sns
-from sklearn.cluster import KMeans
+from sklearn.cluster import MiniBatchKMeans
+from sklearn.metrics import silhouette_score
 from sklearn.preprocessing import StandardScaler
 from sklearn.decomposition import PCA
+from concurrent.futures import ProcessPoolExecutor
+import argparse
+import json
 import os
+import sys
+
+# Repo root on the path, so `python scripts/modeling/player_clustering.py` finds the scripts package too
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if ROOT_DIR not in sys.path:
+    sys.path.append(ROOT_DIR)
+
+from scripts.visualization.chart_renderer import chart, render_charts
 
 # Configuration
 INPUT_FILE = "data/processed/features_master.csv"
 OUTPUT_DIR = "data/insights"
+MODEL_FILE = "data/models/player_clusters.json"
 
-def run_player_clustering():
-    if not os.path.exists(INPUT_FILE):
-        print(f"Error: {INPUT_FILE} not found. Run extract_features.py first!")
-        return
+# We use: Momentum, Volatility (Risk), Pressure (Big Games), and Total Pts
+CLUSTER_FEATURES = ['momentum_score', 'volatility_index', 'pressure_score', 'total_pts']
+K_RANGE = range(3, 9)           # candidate cluster counts, scored in parallel
+SILHOUETTE_SAMPLE = 5000        # players sampled per silhouette score (exact below this)
+BATCH_SIZE = 1024
+N_INIT = 3
+RANDOM_STATE = 42
+# Drift rule saved with the model: refit once more than MAX_OUTLIER_SHARE of the players sit
+# further from their centroid than the DRIFT_QUANTILE of the distances at fit time
+DRIFT_QUANTILE = 0.95
+MAX_OUTLIER_SHARE = 0.20
 
-    # 1. Load Data
-    df = pd.read_csv(INPUT_FILE)
-    
-    # Select features for clustering
-    # We use: Momentum, Volatility (Risk), Pressure (Big Games), and Total Pts
-    cluster_features = ['momentum_score', 'volatility_index', 'pressure_score', 'total_pts']
-    
-    # Handle any remaining NaNs (players with very little history)
-    data = df[cluster_features].fillna(df[cluster_features].mean())
-
-    # 2. Scale Features
+def label_archetype(profiles, thresholds):
+    """Archetype name for each row of `profiles`, judged against the `thresholds` (feature means)."""
+    return np.select(
+        [(profiles['pressure_score'] > thresholds['pressure_score']) & (profiles['total_pts'] > thresholds['total_pts']),
+         profiles['momentum_score'] > thresholds['momentum_score'],
+         profiles['volatility_index'] > thresholds['volatility_index']],
+        ["Elite Core", "Rising Star", "Wildcard / Giant Killer"],
+        default="Steady Veteran")
+
+def score_k(k, scaled_data, sample_size=SILHOUETTE_SAMPLE, random_state=RANDOM_STATE):
+    """Worker: mini-batch k-means for one k, scored by a sampled silhouette."""
+    kmeans = MiniBatchKMeans(n_clusters=k, batch_size=BATCH_SIZE, n_init=N_INIT, random_state=random_state)
+    labels = kmeans.fit_predict(scaled_data)
+    sample = min(sample_size, len(scaled_data)) if sample_size else None
+    silhouette = silhouette_score(scaled_data, labels, sample_size=sample, random_state=random_state)
+    return {'k': k, 'silhouette': float(silhouette), 'inertia': float(kmeans.inertia_),
+            'centroids': kmeans.cluster_centers_}
+
+def fit_cluster_model(df, features=CLUSTER_FEATURES, k_range=K_RANGE, workers=None):
+    """Scaler, auto-k centroids and archetype per cluster, as a JSON-serialisable dict."""
+    # 1. Scale Features (NaNs = players with very little history, filled with the population mean)
+    fill = df[features].mean()
     scaler = StandardScaler()
-    scaled_data = scaler.fit_transform(data)
-
-    # 3. K-Means Clustering (Using K=4 as a standard sports archetype baseline)
-    kmeans = KMeans(n_clusters=4, random_state=42, n_init=10)
-    df['cluster'] = kmeans.fit_predict(scaled_data)
-
-    # 4. Archetype Labeling Logic
-    # We analyze the averages of each cluster to assign human-readable names
-    cluster_profiles = df.groupby('cluster')[cluster_features].mean()
-    
-    # Logic to map cluster numbers to names based on their 'DNA'
-    # This is a simplified mapping; usually, we look at the 'pressure_score' and 'momentum'
-    def label_archetype(row):
-        if row['pressure_score'] > cluster_profiles['pressure_score'].mean() and row['total_pts'] > cluster_profiles['total_pts'].mean():
-            return "Elite Core"
-        elif row['momentum_score'] > cluster_profiles['momentum_score'].mean():
-            return "Rising Star"
-        elif row['volatility_index'] > cluster_profiles['volatility_index'].mean():
-            return "Wildcard / Giant Killer"
-        else:
-            return "Steady Veteran"
+    scaled_data = scaler.fit_transform(df[features].fillna(fill))
 
-    df['archetype'] = df.apply(label_archetype, axis=1)
+    # 2. Every candidate k in parallel; the best sampled silhouette wins
+    ks = [k for k in k_range if k < len(df)]
+    workers = min(workers or os.cpu_count() or 1, len(ks))
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(score_k, ks, [scaled_data] * len(ks)))
+    else:
+        results = [score_k(k, scaled_data) for k in ks]
+    best = max(results, key=lambda r: r['silhouette'])
 
-    # 5. PCA for 2D Visualization
-    pca = PCA(n_components=2)
-    pca_results = pca.fit_transform(scaled_data)
-    df['pca_1'] = pca_results[:, 0]
-    df['pca_2'] = pca_results[:, 1]
+    # 3. Archetype Labeling Logic: each cluster's profile against the mean of all profiles
+    profiles = pd.DataFrame(scaler.inverse_transform(best['centroids']), columns=features)
+    archetypes = label_archetype(profiles, profiles.mean())
+
+    model = {
+        'features': list(features),
+        'fill_values': fill.tolist(),
+        'scaler_mean': scaler.mean_.tolist(),
+        'scaler_scale': scaler.scale_.tolist(),
+        'k': best['k'],
+        'centroids': best['centroids'].tolist(),
+        'archetypes': archetypes.tolist(),
+        'k_scores': {r['k']: round(r['silhouette'], 4) for r in results},
+        'n_players': len(df),
+    }
+
+    # 4. Drift rule, from how far the fitted players sit from their own centroids
+    fit_distances = assign_clusters(df, model)['centroid_distance']
+    model['drift_rule'] = {
+        'distance_quantile': DRIFT_QUANTILE,
+        'max_distance': round(float(fit_distances.quantile(DRIFT_QUANTILE)), 4),
+        'max_outlier_share': MAX_OUTLIER_SHARE,
+    }
+    return model
+
+def save_cluster_model(model, path=MODEL_FILE):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path + ".tmp", "w") as f:
+        json.dump(model, f, indent=2)
+    os.replace(path + ".tmp", path)
+
+def load_cluster_model(path=MODEL_FILE):
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+def scale_features(df, model):
+    data = df[model['features']].fillna(dict(zip(model['features'], model['fill_values'])))
+    return (data.to_numpy(dtype=float) - np.array(model['scaler_mean'])) / np.array(model['scaler_scale'])
+
+def assign_clusters(df, model):
+    """Nearest-centroid cluster and archetype for each player row (no refit)."""
+    scaled = scale_features(df, model)
+    centroids = np.array(model['centroids'])
+    # ||x - c||^2 = ||x||^2 - 2 x.c + ||c||^2, one matrix product for the whole population
+    dist = (scaled ** 2).sum(axis=1)[:, None] - 2 * scaled @ centroids.T + (centroids ** 2).sum(axis=1)[None, :]
+    cluster = dist.argmin(axis=1)
+    assigned = df.copy()
+    assigned['cluster'] = cluster
+    assigned['archetype'] = np.array(model['archetypes'])[cluster]
+    assigned['centroid_distance'] = np.sqrt(np.maximum(dist[np.arange(len(dist)), cluster], 0)).round(4)
+    return assigned
+
+def outlier_share(assigned, model):
+    """Share of assigned players beyond the model's drift distance."""
+    return float((assigned['centroid_distance'] > model['drift_rule']['max_distance']).mean())
 
-    # 6. Generate Cluster Map
-    plt.figure(figsize=(12, 8))
+def refit_reason(assigned, model, refit=False):
+    """Why the saved model must be refitted (None = keep it); `assigned` is None without a model."""
+    if refit:
+        return "refit requested"
+    if model is None:
+        return f"no saved model at {MODEL_FILE}"
+    if model['features'] != CLUSTER_FEATURES:
+        return "feature list changed"
+    if 'drift_rule' not in model:
+        return "saved model has no drift rule"
+    share = outlier_share(assigned, model)
+    if share > model['drift_rule']['max_outlier_share']:
+        return (f"drift: {share:.1%} of players beyond distance {model['drift_rule']['max_distance']}, "
+                f"limit {model['drift_rule']['max_outlier_share']:.0%}")
+    return None
+
+def plot_archetype_map(data, k):
+    fig, ax = plt.subplots(figsize=(12, 8))
     sns.scatterplot(
-        x='pca_1', y='pca_2', 
-        hue='archetype', 
+        x='pca_1', y='pca_2',
+        hue='archetype',
         style='archetype',
-        data=df, 
-        s=150, 
+        data=data,
+        s=150 if len(data) <= 1000 else 10,
         palette='viridis',
-        alpha=0.8
+        alpha=0.8,
+        # Large populations are rasterized so the vector PDF page stays small
+        rasterized=len(data) > 5000,
+        ax=ax
     )
-    
+
     # Annotate Top 10 players for reference
-    top_players = df.nlargest(10, 'total_pts')
+    top_players = data.nlargest(10, 'total_pts')
     for i, row in top_players.iterrows():
-        plt.text(row['pca_1']+0.1, row['pca_2'], row['player_name'], fontsize=9, alpha=0.7)
+        ax.text(row['pca_1']+0.1, row['pca_2'], row['player_name'], fontsize=9, alpha=0.7)
+
+    ax.set_title(f'Table Tennis Player Archetypes (Mini-Batch K-Means, k={k})', fontsize=15, fontweight='bold')
+    ax.set_xlabel('Principal Component 1 (Performance Volume)')
+    ax.set_ylabel('Principal Component 2 (Performance Style)')
+    ax.grid(True, linestyle='--', alpha=0.5)
+    return fig
+
+def run_player_clustering(refit=False, workers=None):
+    if not os.path.exists(INPUT_FILE):
+        print(f"Error: {INPUT_FILE} not found. Run extract_features.py first!")
+        return
+
+    # 1. Load Data
+    df = pd.read_csv(INPUT_FILE)
 
-    plt.title('Table Tennis Player Archetypes (Unsupervised K-Means)', fontsize=15, fontweight='bold')
-    plt.xlabel('Principal Component 1 (Performance Volume)')
-    plt.ylabel('Principal Component 2 (Performance Style)')
-    plt.grid(True, linestyle='--', alpha=0.5)
-    
+    # 2. New and changed players go to the saved centroids; refit only on request, a feature
+    # list change or when the saved drift rule trips
+    model = None if refit else load_cluster_model()
+    usable = model is not None and model['features'] == CLUSTER_FEATURES
+    assigned = assign_clusters(df, model) if usable else None
+    reason = refit_reason(assigned, model, refit)
+    if reason:
+        model = fit_cluster_model(df, workers=workers)
+        save_cluster_model(model)
+        scores = ", ".join(f"k={k}: {s}" for k, s in model['k_scores'].items())
+        print(f"Fitted mini-batch k-means on {len(df)} players, k={model['k']} ({reason}; sampled silhouette {scores}).")
+        assigned = assign_clusters(df, model)
+    else:
+        print(f"Assigned {len(df)} players to the saved {model['k']} centroids ({MODEL_FILE}); "
+              f"{outlier_share(assigned, model):.1%} beyond the drift distance.")
+
+    # 3. Nearest-centroid assignment
+    df = assigned
+
+    # 4. PCA for 2D Visualization
+    pca = PCA(n_components=2)
+    pca_results = pca.fit_transform(scale_features(df, model))
+    df['pca_1'] = pca_results[:, 0]
+    df['pca_2'] = pca_results[:, 1]
+
+    # 5. Generate Cluster Map (cached on the plotted points)
     os.makedirs(OUTPUT_DIR, exist_ok=True)
-    plt.savefig(os.path.join(OUTPUT_DIR, "player_archetype_clusters.png"))
-    
-    # 7. Save results
+    render_charts([chart("player_archetype_clusters", "scripts.modeling.player_clustering:plot_archetype_map",
+                         df[['player_name', 'total_pts', 'archetype', 'pca_1', 'pca_2']],
+                         os.path.join(OUTPUT_DIR, "player_archetype_clusters.png"), k=model['k'])])
+
+    # 6. Save results
     df.to_csv(os.path.join(OUTPUT_DIR, "player_clusters_report.csv"), index=False)
     print("SUCCESS: Player clustering and PCA map generated.")
     print(df['archetype'].value_counts())
+    return df
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Player archetypes via mini-batch k-means with automatic k.")
+    parser.add_argument("--refit", action="store_true", help="Re-cluster instead of reusing the saved centroids")
+    parser.add_argument("--workers", type=int, default=None, help="Process pool size for the k search")
+    parser.add_argument("--assign", metavar="CSV",
+                        help="Only assign the players in this feature CSV to the saved centroids")
+    return parser.parse_args(argv)
 
 if __name__ == "__main__":
-    run_player_clustering()
\ No newline at end of file
+    args = parse_args()
+    if args.assign:
+        model = load_cluster_model()
+        if model is None:
+            print(f"Error: {MODEL_FILE} not found. Run player_clustering.py first!")
+        else:
+            assigned = assign_clusters(pd.read_csv(args.assign), model)
+            out_path = os.path.splitext(args.assign)[0] + "_archetypes.csv"
+            assigned.to_csv(out_path, index=False)
+            print(f"SUCCESS: {len(assigned)} players assigned to archetypes, saved to {out_path}")
+            if 'drift_rule' in model:
+                print(f"{outlier_share(assigned, model):.1%} of them beyond the drift distance "
+                      f"(refit above {model['drift_rule']['max_outlier_share']:.0%}).")
+    else:
+        run_player_clustering(refit=args.refit, workers=args.workers)
@@ -0,0 +1,212 @@
+# Monte Carlo 2026 season simulator.
+# Replays the latest season's tournament calendar tens of thousands of times from the Elo ratings:
+# each tournament draws who enters, orders the entrants by rating + Gumbel noise (a Plackett-Luce
+# draw, so P(i finishes ahead of j) is exactly the Elo expected score) and pays out that event's
+# historical points schedule by finishing place. Seasons run in fixed-size batches of NumPy draws,
+# each batch with its own child seed, so results do not depend on how many workers run them.
+#
+#   python -m scripts.modeling.season_simulator --seasons 50000 --workers 4
+
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from scripts.modeling.elo_engine import ELO_SCALE
+from scripts.storage.columnar_store import load_master
+
+# Configuration
+RATINGS_FILE = "data/insights/player_elo_ratings.csv"
+OUTPUT_DIR = "data/insights"
+N_SEASONS = 20000
+SEED = 2026
+BATCH_CELLS = 2_000_000     # seasons x players simulated per batch (bounds worker memory)
+HISTORY_SEASONS = 2         # seasons used for each player's entry probability
+PRIOR_WEIGHT = 1.0          # pseudo-seasons of the event's overall entry rate mixed into each player's
+TOP_K = 10
+RANK_JUMP_K = 5
+POINT_BINS = 512
+RANK_BINS = 512             # rank histogram bins: exact ranks for small fields, log-spaced beyond
+
+
+def build_calendar(master_df, ratings_df, history_seasons=HISTORY_SEASONS, prior_weight=PRIOR_WEIGHT):
+    """Players, their ratings/entry probabilities and the tournament points schedules.
+
+    The simulated field is everyone ranked in the latest season (the same population as the
+    ensemble report); the calendar is that season's tournaments.
+    """
+    latest_year = int(master_df['season_year'].max())
+    latest = master_df[master_df['season_year'] == latest_year]
+
+    # Baseline rank: the latest season's final standings
+    totals = latest.groupby('ttfi_id')['points_earned'].sum()
+    players = pd.DataFrame({'ttfi_id': totals.index, 'latest_points': totals.to_numpy()})
+    players['latest_rank'] = players['latest_points'].rank(ascending=False, method='min').astype(int)
+    names = latest.drop_duplicates('ttfi_id').set_index('ttfi_id')['player_name'].astype(str)
+    players['player_name'] = players['ttfi_id'].map(names)
+    players['elo_rating'] = players['ttfi_id'].map(ratings_df.set_index('ttfi_id')['elo_rating'])
+    missing = players['elo_rating'].isna()
+    if missing.any():
+        print(f"  {missing.sum()} players without an Elo rating start at the field's median rating.")
+        players['elo_rating'] = players['elo_rating'].fillna(ratings_df['elo_rating'].median())
+
+    # Each event's payout by finishing place, best first
+    tournaments = sorted(latest['tournament_name'].astype(str).unique())
+    schedules = [np.sort(latest.loc[latest['tournament_name'].astype(str) == t, 'points_earned'].to_numpy(dtype=float))[::-1]
+                 for t in tournaments]
+
+    # Entry probability per (player, event): own record over the recent seasons, shrunk to the event's rate
+    recent = master_df[master_df['season_year'] > latest_year - history_seasons]
+    recent = recent[recent['ttfi_id'].isin(players['ttfi_id'])]
+    active = recent.groupby('ttfi_id')['season_year'].nunique().reindex(players['ttfi_id']).fillna(0).to_numpy()
+    entered = (recent.assign(tournament_name=recent['tournament_name'].astype(str))
+               .drop_duplicates(['ttfi_id', 'season_year', 'tournament_name'])
+               .pivot_table(index='ttfi_id', columns='tournament_name', values='season_year', aggfunc='count')
+               .reindex(index=players['ttfi_id'], columns=tournaments).fillna(0).to_numpy())
+    field_rate = np.array([len(s) for s in schedules]) / len(players)
+    entry_prob = (entered + prior_weight * field_rate[None, :]) / (active[:, None] + prior_weight)
+
+    return players, tournaments, schedules, np.clip(entry_prob, 0.0, 1.0)
+
+
+def _ranks_desc(values):
+    """Competition ranks (1 = best, ties share the better rank) along axis 1."""
+    order = np.argsort(-values, axis=1, kind='stable')
+    ordered = np.take_along_axis(values, order, axis=1)
+    cols = np.arange(values.shape[1])
+    new_group = np.ones_like(ordered, dtype=bool)
+    new_group[:, 1:] = ordered[:, 1:] != ordered[:, :-1]
+    group_start = np.maximum.accumulate(np.where(new_group, cols, 0), axis=1)
+    ranks = np.empty_like(order)
+    np.put_along_axis(ranks, order, group_start + 1, axis=1)
+    return ranks
+
+
+def _row_histograms(bins, n_bins):
+    """hist[p, b] = how many rows (seasons) put player p in bin b; one bincount for the whole batch."""
+    n_players = bins.shape[1]
+    flat = (np.arange(n_players)[None, :] * n_bins + bins).ravel()
+    return np.bincount(flat, minlength=n_players * n_bins).reshape(n_players, n_bins)
+
+
+def simulate_batch(n_seasons, strength, entry_prob, schedules, seed, point_edges, rank_edges, baseline_rank,
+                   top_k=TOP_K, rank_jump_k=RANK_JUMP_K):
+    """Plays n_seasons seasons at once and returns mergeable per-player tallies."""
+    rng = np.random.default_rng(seed)
+    n_players = len(strength)
+    totals = np.zeros((n_seasons, n_players))
+
+    for t, schedule in enumerate(schedules):
+        enters = rng.random((n_seasons, n_players)) < entry_prob[:, t]
+        performance = strength + rng.gumbel(size=(n_seasons, n_players))
+        performance[~enters] = -np.inf
+        # Pay out by finishing place: one argsort per event, then scatter the schedule back
+        # (non-entrants sort last and are masked out)
+        order = np.argsort(-performance, axis=1)
+        payout = np.empty_like(performance)
+        np.put_along_axis(payout, order, schedule[np.minimum(np.arange(n_players), len(schedule) - 1)][None, :], axis=1)
+        totals += np.where(enters, payout, 0.0)
+
+    ranks = _ranks_desc(totals)
+    rank_jump = baseline_rank[None, :] - ranks
+    point_bins = np.clip(np.searchsorted(point_edges, totals, side='right') - 1, 0, len(point_edges) - 2)
+    rank_bins = np.searchsorted(rank_edges, ranks, side='right') - 1
+    return {
+        'n': n_seasons,
+        'points_sum': totals.sum(axis=0),
+        'points_sq': (totals ** 2).sum(axis=0),
+        'rank_sum': ranks.sum(axis=0, dtype=np.int64),
+        'top_k': (ranks <= top_k).sum(axis=0),
+        'jump_gt_k': (rank_jump > rank_jump_k).sum(axis=0),
+        # rank_hist[p, b] / point_hist[p, b]: how often player p finished in rank / points bin b
+        'rank_hist': _row_histograms(rank_bins, len(rank_edges)),
+        'point_hist': _row_histograms(point_bins, len(point_edges) - 1),
+    }
+
+
+def _hist_quantile(hist, values, q):
+    """Per-row quantile of a histogram whose bin b represents values[b]."""
+    cdf = np.cumsum(hist, axis=1) / hist.sum(axis=1, keepdims=True)
+    return values[np.argmax(cdf >= q, axis=1)]
+
+
+def simulate_seasons(players, schedules, entry_prob, n_seasons=N_SEASONS, seed=SEED, workers=None,
+                     top_k=TOP_K, rank_jump_k=RANK_JUMP_K):
+    """Runs n_seasons simulated seasons across a process pool and returns the per-player summary."""
+    n_players = len(players)
+    strength = players['elo_rating'].to_numpy(dtype=float) * np.log(10) / ELO_SCALE
+    baseline_rank = players['latest_rank'].to_numpy()
+    max_points = sum(s[0] for s in schedules if len(s))
+    point_edges = np.linspace(0.0, max_points + 1e-9, POINT_BINS + 1)
+    # Bin b holds ranks rank_edges[b] .. rank_edges[b + 1] - 1
+    rank_edges = np.unique(np.geomspace(1, n_players + 1, RANK_BINS + 1).astype(int))
+
+    # Fixed batches with spawned child seeds: the same seed gives the same result on any worker count
+    batch = max(1, min(n_seasons, BATCH_CELLS // max(n_players, 1)))
+    sizes = [min(batch, n_seasons - start) for start in range(0, n_seasons, batch)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    args = [(size, strength, entry_prob, schedules, child, point_edges, rank_edges, baseline_rank, top_k, rank_jump_k)
+            for size, child in zip(sizes, seeds)]
+
+    workers = min(workers or os.cpu_count() or 1, len(sizes))
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            parts = list(pool.map(simulate_batch, *zip(*args)))
+    else:
+        parts = [simulate_batch(*a) for a in args]
+    tally = {key: sum(p[key] for p in parts) for key in parts[0]}
+
+    n = tally['n']
+    mean = tally['points_sum'] / n
+    summary = players[['ttfi_id', 'player_name', 'elo_rating', 'latest_rank', 'latest_points']].copy()
+    summary['expected_points'] = mean.round(2)
+    summary['points_sd'] = np.sqrt(np.maximum(tally['points_sq'] / n - mean ** 2, 0)).round(2)
+    for q in (0.1, 0.5, 0.9):
+        # Quantiles are read off POINT_BINS-wide bins (lower edge), so a pointless season reads 0
+        summary[f'points_p{int(q * 100)}'] = _hist_quantile(tally['point_hist'], point_edges[:-1], q).round(1)
+    summary['expected_rank'] = (tally['rank_sum'] / n).round(2)
+    for q in (0.1, 0.5, 0.9):
+        summary[f'rank_p{int(q * 100)}'] = _hist_quantile(tally['rank_hist'], rank_edges, q)
+    summary[f'p_top{top_k}'] = (tally['top_k'] / n).round(4)
+    summary[f'p_rank_jump_gt{rank_jump_k}'] = (tally['jump_gt_k'] / n).round(4)
+    return summary.sort_values('expected_points', ascending=False, kind='stable').reset_index(drop=True)
+
+
+def run_season_simulation(n_seasons=N_SEASONS, seed=SEED, workers=None):
+    if not os.path.exists(RATINGS_FILE):
+        print(f"Error: {RATINGS_FILE} not found. Run elo_rating_system.py first.")
+        return
+
+    # 1. Ratings and the calendar to replay
+    ratings_df = pd.read_csv(RATINGS_FILE)
+    master_df = load_master(columns=['season_year', 'ttfi_id', 'player_name', 'tournament_name', 'points_earned'])
+    players, tournaments, schedules, entry_prob = build_calendar(master_df, ratings_df)
+    print(f"Simulating {n_seasons:,} seasons: {len(players)} players x {len(tournaments)} tournaments (seed {seed})...")
+
+    # 2. Batched draws across the process pool
+    summary = simulate_seasons(players, schedules, entry_prob, n_seasons, seed, workers)
+
+    # 3. Save the distribution summary
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+    out_path = os.path.join(OUTPUT_DIR, "season_simulation_2026.csv")
+    summary.to_csv(out_path, index=False)
+    print("\n--- Projected 2026 Top 10 by Expected Points (Monte Carlo) ---")
+    print(summary.head(10)[['player_name', 'elo_rating', 'expected_points', 'points_p10', 'points_p90',
+                            'expected_rank', f'p_top{TOP_K}', f'p_rank_jump_gt{RANK_JUMP_K}']].to_string(index=False))
+    print(f"\nSUCCESS: Season simulation saved to {out_path}")
+    return summary
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Monte Carlo simulation of the 2026 season from Elo ratings.")
+    parser.add_argument("--seasons", type=int, default=N_SEASONS)
+    parser.add_argument("--seed", type=int, default=SEED)
+    parser.add_argument("--workers", type=int, default=None, help="Process pool size (1 = run in this process)")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    run_season_simulation(args.seasons, args.seed, args.workers)
@@ -1,65 +1,256 @@
-import pandas as pd
+# Career longevity: how long do players stay in the national top N?
+# A spell is a run of consecutive seasons with final_rank_position <= TOP_N; it ends (the event)
+# when the player is outside the top N in the next season and is censored when it reaches the
+# latest season. Kaplan-Meier curves are fitted for every stratum of every stratifier at once
+# with NumPy bincounts, and bootstrap bands come from resampling spells within each stratum
+# in seeded batches across a process pool.
+#
+#   python -m scripts.modeling.survival_analysis --top-n 50 --bootstrap 2000 --workers 4
+
+import argparse
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
 import numpy as np
+import pandas as pd
 import matplotlib.pyplot as plt
-from lifelines import KaplanMeierFitter
-import os
+
+# Repo root on the path, so `python scripts/modeling/survival_analysis.py` finds the scripts package too
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if ROOT_DIR not in sys.path:
+    sys.path.append(ROOT_DIR)
+
+from scripts.storage.columnar_store import load_master
+from scripts.visualization.chart_renderer import chart, render_charts
 
 # Configuration
 INPUT_FILE = "data/processed/master_long_dataset.csv"
 OUTPUT_DIR = "data/insights"
+TOP_N = 50
+TIER_EDGES = [10, 25]       # rank at spell start: 1-10, 11-25, 26-TOP_N
+STRATIFIERS = ['overall', 'institution', 'tier', 'cohort']
+N_BOOTSTRAP = 2000
+BOOT_BATCH = 250            # bootstrap replicates per pool task
+CONFIDENCE = 0.95
+SEED = 2026
+
+
+def tier_labels(top_n=TOP_N, edges=TIER_EDGES):
+    bounds = [0] + [e for e in edges if e < top_n] + [top_n]
+    return ["Top 10" if (lo, hi) == (0, 10) else f"{lo + 1}-{hi}" for lo, hi in zip(bounds[:-1], bounds[1:])]
+
+
+def build_spells(df, top_n=TOP_N):
+    """One row per top-N spell: player, start/end season, duration (seasons) and observed (1 = dropped out).
+
+    Seasons are counted by their position in the seasons present in the data, so a year with no
+    ranking list does not split a spell. Spells already running in the first season are
+    left-truncated; their true start is unknown and they count from that season.
+    """
+    seasons = np.sort(df['season_year'].unique())
+    latest = seasons[-1]
+
+    # 1. Top-N membership per player-season
+    ranked = (df.dropna(subset=['ttfi_id', 'final_rank_position'])
+              .groupby(['ttfi_id', 'season_year'], observed=True, sort=True)
+              .agg(rank=('final_rank_position', 'min'), player_name=('player_name', 'first'),
+                   institution=('state_institution', 'first'))
+              .reset_index())
+    elite = ranked[ranked['rank'] <= top_n].reset_index(drop=True)
+
+    # 2. A new spell starts at a new player or after a season outside the top N
+    pos = np.searchsorted(seasons, elite['season_year'].to_numpy())
+    ids = elite['ttfi_id'].to_numpy()
+    new_spell = np.ones(len(elite), dtype=bool)
+    new_spell[1:] = (ids[1:] != ids[:-1]) | (pos[1:] != pos[:-1] + 1)
+    elite['spell'] = np.cumsum(new_spell)
+
+    spells = elite.groupby('spell').agg(
+        ttfi_id=('ttfi_id', 'first'), player_name=('player_name', 'last'),
+        institution=('institution', 'first'), start_rank=('rank', 'first'),
+        start_year=('season_year', 'first'), end_year=('season_year', 'last'),
+        duration=('season_year', 'size')).reset_index(drop=True)
+    spells['observed'] = (spells['end_year'] < latest).astype(int)
+
+    # 3. Strata: institution (before any "/ state" suffix), rank tier at spell start, debut cohort
+    spells['institution'] = spells['institution'].astype(str).str.split('/').str[0].str.strip()
+    tier_idx = np.searchsorted([e for e in TIER_EDGES if e < top_n], spells['start_rank'].to_numpy(), side='left')
+    spells['tier'] = np.array(tier_labels(top_n))[tier_idx]
+    spells['cohort'] = spells.groupby('ttfi_id')['start_year'].transform('min').astype(str)
+    spells['overall'] = 'All players'
+    return spells
+
+
+def _km_from_counts(exits, deaths):
+    """Survival and at-risk counts from per-duration exit/death counts (last axis = duration)."""
+    # At risk at t: every spell lasting t seasons or longer
+    at_risk = np.flip(np.flip(exits, -1).cumsum(axis=-1), -1)
+    hazard = np.divide(deaths, at_risk, out=np.zeros(deaths.shape), where=at_risk > 0)
+    return np.cumprod(1.0 - hazard, axis=-1), at_risk
+
+
+def kaplan_meier(durations, events, groups, n_groups, max_time):
+    """Kaplan-Meier for many strata at once.
+
+    durations: int seasons (1..max_time), events: 1 = dropped out, groups: stratum code per spell.
+    Returns (survival, at_risk, deaths), each n_groups x max_time; column t is duration t + 1.
+    """
+    idx = groups * max_time + (durations - 1)
+    size = n_groups * max_time
+    exits = np.bincount(idx, minlength=size).reshape(n_groups, max_time)
+    deaths = np.bincount(idx, weights=events, minlength=size).reshape(n_groups, max_time)
+    survival, at_risk = _km_from_counts(exits, deaths)
+    return survival, at_risk, deaths
+
+
+def bootstrap_batch(n_boot, exits, deaths, seed):
+    """Survival curves for n_boot resamples (spells drawn with replacement within each stratum).
 
-def run_survival_analysis():
+    A KM curve only depends on how many spells fall in each (duration, dropped out) cell, so a
+    resample is one multinomial draw over a stratum's cells: the cost does not grow with the
+    number of spells.
+    """
+    rng = np.random.default_rng(seed)
+    cells = np.concatenate([deaths, exits - deaths], axis=1).astype(np.int64)
+    n = cells.sum(axis=1)
+    probs = cells / np.maximum(n, 1)[:, None]
+    counts = rng.multinomial(n, probs, size=(n_boot, len(n)))
+    max_time = exits.shape[1]
+    boot_deaths = counts[..., :max_time]
+    survival, _ = _km_from_counts(boot_deaths + counts[..., max_time:], boot_deaths)
+    return survival
+
+
+def fit_stratified_curves(spells, stratifiers=STRATIFIERS, n_boot=N_BOOTSTRAP, seed=SEED, workers=None,
+                          confidence=CONFIDENCE):
+    """Long table of survival curves with bootstrap bands for every stratum of every stratifier."""
+    # 1. Stack the spells once per stratifier; each (stratifier, stratum) becomes one group code
+    keys = pd.concat([pd.DataFrame({'stratifier': s, 'stratum': spells[s].astype(str).to_numpy()})
+                      for s in stratifiers], ignore_index=True)
+    codes = keys.groupby(['stratifier', 'stratum'], sort=False).ngroup().to_numpy()
+    uniques = keys.drop_duplicates().reset_index(drop=True)
+    n_groups = len(uniques)
+    durations = np.tile(spells['duration'].to_numpy(dtype=np.int64), len(stratifiers))
+    events = np.tile(spells['observed'].to_numpy(dtype=float), len(stratifiers))
+    max_time = int(durations.max())
+
+    survival, at_risk, deaths = kaplan_meier(durations, events, codes, n_groups, max_time)
+
+    # 2. Bootstrap in fixed batches with spawned seeds: identical bands for any worker count
+    lower = upper = np.full(survival.shape, np.nan)
+    if n_boot > 0:
+        sizes = [min(BOOT_BATCH, n_boot - start) for start in range(0, n_boot, BOOT_BATCH)]
+        seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+        exits = at_risk - np.pad(at_risk[:, 1:], ((0, 0), (0, 1)))
+        args = [(size, exits, deaths, child) for size, child in zip(sizes, seeds)]
+        workers = min(workers or os.cpu_count() or 1, len(sizes))
+        if workers > 1:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                reps = list(pool.map(bootstrap_batch, *zip(*args)))
+        else:
+            reps = [bootstrap_batch(*a) for a in args]
+        alpha = (1.0 - confidence) / 2
+        lower, upper = np.quantile(np.concatenate(reps), [alpha, 1.0 - alpha], axis=0)
+
+    # 3. Long format; durations nobody in the stratum reached are dropped
+    g, t = np.nonzero(at_risk > 0)
+    curves = pd.DataFrame({
+        'stratifier': uniques['stratifier'].to_numpy()[g],
+        'stratum': uniques['stratum'].to_numpy()[g],
+        'n_spells': at_risk[:, 0][g],
+        'duration': t + 1,
+        'at_risk': at_risk[g, t],
+        'dropouts': deaths[g, t].astype(int),
+        'survival': survival[g, t].round(4),
+        'survival_lower': lower[g, t].round(4),
+        'survival_upper': upper[g, t].round(4),
+    })
+    return curves
+
+
+def median_survival(curve):
+    """First duration at which survival falls to 0.5 or below (inf if it never does)."""
+    below = curve[curve['survival'] <= 0.5]
+    return int(below['duration'].iloc[0]) if len(below) else float('inf')
+
+
+def plot_survival_curves(curves, top_n):
+    fig, axes = plt.subplots(1, 2, figsize=(15, 6.5), sharey=True)
+    panels = [('overall', axes[0], 'All Players'), ('tier', axes[1], 'By Rank Tier at Spell Start')]
+    for stratifier, ax, title in panels:
+        for stratum, curve in curves[curves['stratifier'] == stratifier].groupby('stratum', sort=False):
+            # Survival is 1 at duration 0; the step drops as each season's dropouts are counted
+            x = np.r_[0, curve['duration']]
+            line = ax.step(x, np.r_[1.0, curve['survival']], where='post',
+                           label=f"{stratum} (n={curve['n_spells'].iloc[0]})")[0]
+            ax.fill_between(x, np.r_[1.0, curve['survival_lower']], np.r_[1.0, curve['survival_upper']],
+                            step='post', alpha=0.2, color=line.get_color())
+        ax.set_title(title, fontsize=13)
+        ax.set_xlabel(f'Consecutive Seasons in National Top {top_n}', fontsize=12)
+        ax.grid(True, linestyle='--', alpha=0.6)
+        ax.legend()
+    axes[0].set_ylabel('Survival Probability', fontsize=12)
+    fig.suptitle(f'Player Longevity: Probability of Staying in Top {top_n} ({int(CONFIDENCE * 100)}% bootstrap bands)',
+                 fontsize=15, fontweight='bold')
+    fig.tight_layout()
+    return fig
+
+
+def run_survival_analysis(top_n=TOP_N, n_boot=N_BOOTSTRAP, seed=SEED, workers=None):
     if not os.path.exists(INPUT_FILE):
         print(f"Error: {INPUT_FILE} not found.")
         return
 
     # 1. Load Data
-    df = pd.read_csv(INPUT_FILE)
-    df['season_year'] = pd.to_numeric(df['season_year'])
-    
-    # 2. Define "Survival" Data
-    # For each player, find the start year and end year in the Top 50
-    # We define an 'Event' as a player who was in Top 50 but is no longer there in 2024.
-    
-    career_stats = df.groupby('ttfi_id').agg({
-        'season_year': ['min', 'max', 'count'],
-        'player_name': 'first'
-    })
-    career_stats.columns = ['start_year', 'end_year', 'years_active', 'player_name']
-    
-    # Duration: How many years have they survived?
-    career_stats['duration'] = (career_stats['end_year'] - career_stats['start_year']) + 1
-    
-    # Observed (Event): 1 if they are NOT in 2024 (their career 'ended'), 0 if they are still active
-    career_stats['observed'] = (career_stats['end_year'] < 2024).astype(int)
-
-    # 3. Fit the Kaplan-Meier Model
-    kmf = KaplanMeierFitter()
-    kmf.fit(durations=career_stats['duration'], event_observed=career_stats['observed'])
-
-    # 4. Visualization
-    plt.figure(figsize=(10, 7))
-    kmf.plot_survival_function()
-    
-    plt.title('Player Longevity: Probability of Staying in Top 50', fontsize=15, fontweight='bold')
-    plt.xlabel('Years in National Top 50', fontsize=12)
-    plt.ylabel('Survival Probability (Percentage)', fontsize=12)
-    plt.grid(True, linestyle='--', alpha=0.6)
-    
+    df = load_master(columns=['season_year', 'ttfi_id', 'player_name', 'state_institution', 'final_rank_position'])
+
+    # 2. Top-N spells (event = dropping out of the top N the next season)
+    spells = build_spells(df, top_n)
+    print(f"{len(spells)} top-{top_n} spells from {spells['ttfi_id'].nunique()} players "
+          f"({spells['observed'].sum()} ended, {(spells['observed'] == 0).sum()} still running)")
+
+    # 3. Kaplan-Meier per stratum with bootstrap bands
+    curves = fit_stratified_curves(spells, n_boot=n_boot, seed=seed, workers=workers)
+
     os.makedirs(OUTPUT_DIR, exist_ok=True)
-    plt.savefig(os.path.join(OUTPUT_DIR, "career_survival_curve.png"))
-    
-    # 5. Export Longevity Risk Report
+    curves.to_csv(os.path.join(OUTPUT_DIR, "career_survival_curves.csv"), index=False)
+
+    # 4. Visualization (cached on the plotted curves)
+    render_charts([chart("career_survival_curve", "scripts.modeling.survival_analysis:plot_survival_curves",
+                         curves[curves['stratifier'].isin(['overall', 'tier'])].reset_index(drop=True),
+                         os.path.join(OUTPUT_DIR, "career_survival_curve.png"), top_n=top_n)])
+
+    # 5. Export Longevity Risk Report (each player's latest spell)
     # Lower survival probability = Higher risk of falling out of 2026 rankings
-    career_stats['survival_prob_at_current_age'] = kmf.predict(career_stats['duration']).values
-    
+    overall = curves[curves['stratifier'] == 'overall'].set_index('duration')['survival']
+    report = spells.sort_values('start_year').groupby('ttfi_id').agg(
+        player_name=('player_name', 'last'), institution=('institution', 'last'), tier=('tier', 'last'),
+        cohort=('cohort', 'first'), spells=('duration', 'size'), years_active=('duration', 'sum'),
+        start_year=('start_year', 'last'), end_year=('end_year', 'last'),
+        duration=('duration', 'last'), observed=('observed', 'last'))
+    report['survival_prob_at_current_age'] = report['duration'].map(overall)
+
     report_path = os.path.join(OUTPUT_DIR, "career_longevity_report.csv")
-    career_stats.sort_values('survival_prob_at_current_age').to_csv(report_path)
-    
-    print(f"SUCCESS: Survival Curve and Longevity Report saved to {OUTPUT_DIR}/")
+    report.sort_values('survival_prob_at_current_age').to_csv(report_path)
+
+    print(f"SUCCESS: Survival Curves and Longevity Report saved to {OUTPUT_DIR}/")
     print("\n--- Average Career Half-Life ---")
-    print(f"Median Survival Time: {kmf.median_survival_time_} years")
+    print(f"Median Survival Time: {median_survival(overall.reset_index())} seasons")
+    tiers = curves[curves['stratifier'] == 'tier'].groupby('stratum', sort=False)
+    print("By tier: " + ", ".join(f"{tier} {median_survival(curve)}" for tier, curve in tiers))
+    return curves
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Stratified Kaplan-Meier career longevity with bootstrap bands.")
+    parser.add_argument("--top-n", type=int, default=TOP_N)
+    parser.add_argument("--bootstrap", type=int, default=N_BOOTSTRAP, help="Replicates (0 = no bands)")
+    parser.add_argument("--seed", type=int, default=SEED)
+    parser.add_argument("--workers", type=int, default=None, help="Process pool size (1 = run in this process)")
+    return parser.parse_args(argv)
+
 
 if __name__ == "__main__":
-    # Ensure lifelines is installed: pip install lifelines
-    run_survival_analysis()
\ No newline at end of file
+    args = parse_args()
+    run_survival_analysis(args.top_n, args.bootstrap, args.seed, args.workers)
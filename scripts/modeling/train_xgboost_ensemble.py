@@ -1,13 +1,30 @@
 import pandas as pd
-import numpy as np
-import xgboost as xgb
-import matplotlib.pyplot as plt
 import os
+import sys
+
+# Repo root on the path, so `python scripts/modeling/train_xgboost_ensemble.py` finds the scripts package too
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if ROOT_DIR not in sys.path:
+    sys.path.append(ROOT_DIR)
+
+from scripts.modeling.model_registry import get_or_train_ensemble, load_tuned_params, predict
 
 # Configuration
 INPUT_FILE = "data/processed/supervised_timeseries_data.csv"
 INSIGHT_DIR = "data/insights"
 
+ENSEMBLE_PARAMS = {
+    'n_estimators': 1200,
+    'learning_rate': 0.02,  # Fine-tuned for ensemble stability
+    'max_depth': 6,
+    'subsample': 0.85,
+    'colsample_bytree': 0.85,
+    'early_stopping_rounds': 50,
+    'n_jobs': -1,
+}
+# Deterministic seeding for 100% consistency
+ENSEMBLE_SEEDS = [100 + i for i in range(10)]
+
 def run_ensemble_scouting_report():
     if not os.path.exists(INPUT_FILE):
         print(f"Error: {INPUT_FILE} not found. Ensure sliding_window.py ran successfully.")
@@ -24,43 +41,15 @@ def run_ensemble_scouting_report():
     latest_2024 = df[df['season_year'] == 2024].copy()
     
     # 2. THE ENSEMBLE ENGINE (10-Round Consensus)
-    n_seeds = 10
-    all_round_predictions = []
-
+    # Walk-forward split (train < 2024, early-stop on 2024). Boosters come from the model
+    # registry and are only retrained when the data, features or hyperparameters change.
+    # Tuned hyperparameters (hyperparameter_search) replace the hand-picked ones when present.
     print(f"Starting 10-Round Ensemble Forecast for the 2026 Season...")
-
-    for i in range(n_seeds):
-        # Deterministic seeding for 100% consistency
-        current_seed = 100 + i
-        
-        # Walk-forward split
-        train_df = df[df['season_year'] < 2024]
-        val_df = df[df['season_year'] == 2024]
-
-        model = xgb.XGBRegressor(
-            n_estimators=1200,
-            learning_rate=0.02,  # Fine-tuned for ensemble stability
-            max_depth=6,
-            subsample=0.85,
-            colsample_bytree=0.85,
-            random_state=current_seed,
-            early_stopping_rounds=50,
-            n_jobs=-1
-        )
-
-        model.fit(
-            train_df[features], train_df[target],
-            eval_set=[(val_df[features], val_df[target])],
-            verbose=False
-        )
-
-        # Generate prediction and store
-        round_forecast = model.predict(latest_2024[features])
-        all_round_predictions.append(round_forecast)
-        print(f"  > consensus Round {i+1} locked.")
+    params = load_tuned_params(ENSEMBLE_PARAMS)
+    models, _ = get_or_train_ensemble(df, features, target, params, ENSEMBLE_SEEDS, validation_year=2024)
 
     # 3. CONSOLIDATING RESULTS
-    latest_2024['predicted_2026_points'] = np.mean(all_round_predictions, axis=0).round(2)
+    latest_2024['predicted_2026_points'] = predict(latest_2024, models=models).round(2)
     
     # --- RANKING LOGIC ---
     # Actual Rank 2024
@@ -84,20 +73,22 @@ def run_ensemble_scouting_report():
     os.makedirs(INSIGHT_DIR, exist_ok=True)
     report_path = os.path.join(INSIGHT_DIR, "ensemble_2026_scouting_report.csv")
     
+    # ttfi_id and the model inputs ride along so forecasts can be looked up per player
     scouting_view = latest_2024[[
+        'ttfi_id',
         'player_name', 
         'actual_rank_2024', 
         'predicted_rank_2026', 
         'scouting_trend',
         'total_seasonal_points', 
         'predicted_2026_points'
-    ]].sort_values('predicted_rank_2026')
+    ] + features].sort_values('predicted_rank_2026')
 
     scouting_view.to_csv(report_path, index=False)
     
     print(f"\nSUCCESS: 2026 Scouting Report saved to {report_path}")
     print("\n--- Top 10 Projected 2026 Leaderboard ---")
-    print(scouting_view.head(10).to_string(index=False))
+    print(scouting_view.head(10).drop(columns=['ttfi_id'] + features).to_string(index=False))
 
 if __name__ == "__main__":
     run_ensemble_scouting_report()
\ No newline at end of file
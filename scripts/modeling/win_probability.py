@@ -0,0 +1,167 @@
+# Head-to-head win probabilities from the final Elo ratings.
+# P(A beats B) = 1 / (1 + 10^((R_B - R_A) / 400)) is precomputed once as a float32 matrix
+# (row = player A, column = player B, players in rating order) and memory-mapped back,
+# so every query below is an index lookup, not a recomputation.
+#
+#   python -m scripts.modeling.win_probability --pair 200503 205498
+#   python -m scripts.modeling.win_probability --field 200503 205498 200214 200353
+#   python -m scripts.modeling.win_probability --opponents 200503 --k 5
+#   python -m scripts.modeling.win_probability --export-top 1000 --out data/processed/win_probability_top1000
+#   python -m scripts.modeling.win_probability --export-all      # every rated player (N^2 float32 on disk)
+
+import argparse
+import hashlib
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from scripts.modeling.elo_engine import expected_score_matrix
+
+# Configuration
+RATINGS_FILE = "data/insights/player_elo_ratings.csv"
+MATRIX_DIR = "data/processed/win_probability"
+CHUNK_ROWS = 1024            # Matrix rows computed and written per step
+MATRIX_TOP_N = 3000          # Players the Elo stage exports by default (3000^2 float32 = 36 MB); full_matrix=True for all
+
+
+def ratings_hash(players):
+    """Content hash of the exported ids, names and ratings (in matrix order)."""
+    hashed = pd.util.hash_pandas_object(players[['ttfi_id', 'player_name', 'elo_rating']], index=False)
+    return hashlib.sha1(hashed.to_numpy().tobytes()).hexdigest()[:16]
+
+
+def _matrix_is_current(out_dir, digest):
+    meta_path = os.path.join(out_dir, "meta.json")
+    if not (os.path.exists(meta_path) and os.path.exists(os.path.join(out_dir, "matrix.npy"))):
+        return False
+    with open(meta_path) as f:
+        return json.load(f).get('ratings_hash') == digest
+
+
+def write_win_matrix(players, out_dir=MATRIX_DIR, chunk_rows=CHUNK_ROWS, force=False):
+    """Writes matrix.npy (float32 N x N) and players.csv (its row/column index) for `players`.
+
+    players: DataFrame with ttfi_id, player_name, elo_rating. The matrix is computed chunk_rows
+    rows at a time and appended to the .npy file, so N^2 is never held in memory. meta.json
+    records a hash of the ratings; when it matches, the existing matrix is kept (unless force).
+    Returns (out_dir, written).
+    """
+    players = players[['ttfi_id', 'player_name', 'elo_rating']].reset_index(drop=True)
+    digest = ratings_hash(players)
+    if not force and _matrix_is_current(out_dir, digest):
+        return out_dir, False
+    ratings = players['elo_rating'].to_numpy(dtype=np.float64)
+    n = len(ratings)
+
+    os.makedirs(out_dir, exist_ok=True)
+    # Invalidate first, so an interrupted rewrite is never mistaken for the current matrix
+    if os.path.exists(os.path.join(out_dir, "meta.json")):
+        os.remove(os.path.join(out_dir, "meta.json"))
+    matrix_path = os.path.join(out_dir, "matrix.npy")
+    with open(matrix_path + ".tmp", "wb") as f:
+        np.lib.format.write_array_header_1_0(f, {'descr': '<f4', 'fortran_order': False, 'shape': (n, n)})
+        for start in range(0, n, chunk_rows):
+            stop = min(start + chunk_rows, n)
+            f.write(expected_score_matrix(ratings[start:stop], ratings).astype('<f4').tobytes())
+    os.replace(matrix_path + ".tmp", matrix_path)
+    players.to_csv(os.path.join(out_dir, "players.csv"), index=False)
+    with open(os.path.join(out_dir, "meta.json"), "w") as f:
+        json.dump({'ratings_hash': digest, 'n_players': n}, f)
+    return out_dir, True
+
+
+def export_top_n(ratings_df, n=None, out_dir=MATRIX_DIR, chunk_rows=CHUNK_ROWS, force=False):
+    """Chunked matrix for the n highest-rated players only (n=None: every player)."""
+    top = ratings_df.sort_values('elo_rating', ascending=False, kind='stable')
+    if n is not None:
+        top = top.head(n)
+    return write_win_matrix(top, out_dir, chunk_rows, force)
+
+
+def load_win_matrix(matrix_dir=MATRIX_DIR):
+    """Memory-mapped matrix plus its player index: {'matrix', 'players', 'ids', 'index'}."""
+    players = pd.read_csv(os.path.join(matrix_dir, "players.csv"))
+    ids = players['ttfi_id'].to_numpy()
+    return {
+        'matrix': np.load(os.path.join(matrix_dir, "matrix.npy"), mmap_mode='r'),
+        'players': players,
+        'ids': ids,
+        'index': {pid: i for i, pid in enumerate(ids.tolist())},
+    }
+
+
+def win_probability(wm, player_a, player_b):
+    """P(player_a beats player_b)."""
+    return float(wm['matrix'][wm['index'][player_a], wm['index'][player_b]])
+
+
+def vs_field(wm, player, field=None):
+    """P(player beats each opponent) for a draw (default: every other rated player).
+
+    Returns (opponent ids, probabilities); the mean of the probabilities is the expected
+    share of head-to-heads won against that field.
+    """
+    i = wm['index'][player]
+    if field is None:
+        cols = np.delete(np.arange(len(wm['ids'])), i)
+    else:
+        cols = np.fromiter((wm['index'][p] for p in field if p != player), dtype=np.int64)
+    return wm['ids'][cols], np.asarray(wm['matrix'][i, cols])
+
+
+def top_opponents(wm, player, k=5, toughest=True):
+    """The k opponents `player` is least (toughest=True) or most likely to beat, best first."""
+    i = wm['index'][player]
+    row = np.array(wm['matrix'][i], dtype=np.float32)
+    # Self is never an opponent: push it to the far end of whichever ordering is asked for
+    row[i] = np.inf if toughest else -np.inf
+    k = min(k, len(row) - 1)
+    if k <= 0:
+        return wm['ids'][:0], row[:0]
+    scores = row if toughest else -row
+    cols = np.argpartition(scores, k - 1)[:k]
+    cols = cols[np.argsort(scores[cols], kind='stable')]
+    return wm['ids'][cols], row[cols]
+
+
+def _names(wm, ids):
+    return wm['players'].set_index('ttfi_id').loc[ids, 'player_name'].to_numpy()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Head-to-head win probabilities from the Elo ratings.")
+    parser.add_argument("--matrix-dir", default=MATRIX_DIR)
+    parser.add_argument("--pair", nargs=2, type=int, metavar=("A", "B"), help="P(A beats B)")
+    parser.add_argument("--field", nargs="+", type=int, metavar="ID",
+                        help="First id against every other id listed")
+    parser.add_argument("--opponents", type=int, metavar="ID", help="Toughest opponents of a player")
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--export-top", type=int, metavar="N", help="Write the matrix for the top N players")
+    parser.add_argument("--export-all", action="store_true", help="Write the matrix for every rated player")
+    parser.add_argument("--out", default=None, help="Output folder for --export-top / --export-all")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    if args.export_all:
+        out_dir, written = export_top_n(pd.read_csv(RATINGS_FILE), None, args.out or MATRIX_DIR)
+        print(f"SUCCESS: Full win-probability matrix {'saved to' if written else 'unchanged in'} {out_dir}/")
+    elif args.export_top:
+        out_dir = args.out or f"{MATRIX_DIR}_top{args.export_top}"
+        out_dir, written = export_top_n(pd.read_csv(RATINGS_FILE), args.export_top, out_dir)
+        print(f"SUCCESS: Top-{args.export_top} win-probability matrix {'saved to' if written else 'unchanged in'} {out_dir}/")
+    else:
+        wm = load_win_matrix(args.matrix_dir)
+        if args.pair:
+            a, b = args.pair
+            print(f"P({_names(wm, [a])[0]} beats {_names(wm, [b])[0]}) = {win_probability(wm, a, b):.3f}")
+        if args.field:
+            ids, probs = vs_field(wm, args.field[0], args.field[1:])
+            print(pd.DataFrame({'opponent': _names(wm, ids), 'win_probability': probs.round(3)}).to_string(index=False))
+            print(f"Expected head-to-head win share: {probs.mean():.3f}")
+        if args.opponents:
+            ids, probs = top_opponents(wm, args.opponents, args.k)
+            print(pd.DataFrame({'opponent': _names(wm, ids), 'win_probability': probs.round(3)}).to_string(index=False))
@@ -0,0 +1,166 @@
+# Per-stage instrumentation and JSON run manifests.
+#
+#   python -m scripts.pipeline.run_manifest compare data/run_manifests/run_A.json data/run_manifests/run_B.json
+
+import argparse
+import cProfile
+import io
+import json
+import os
+import platform
+import pstats
+import time
+
+# Configuration
+MANIFEST_DIR = "data/run_manifests"
+PROFILE_TOP_N = 15
+REGRESSION_RATIO = 1.25
+
+
+def peak_rss_mb():
+    """Peak resident memory of this process in MB, or None where it cannot be measured."""
+    try:
+        import resource
+    except ImportError:
+        # Windows has no resource module; psutil (if installed) reports the peak working set
+        try:
+            import psutil
+        except ImportError:
+            return None
+        info = psutil.Process().memory_info()
+        return round(getattr(info, 'peak_wset', info.rss) / (1024 * 1024), 1)
+    # ru_maxrss is KiB on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024) if platform.system() == "Darwin" else peak / 1024, 1)
+
+
+def artifact_size(path):
+    """Bytes on disk for a file or a whole directory (e.g. the Parquet store)."""
+    if os.path.isdir(path):
+        return sum(os.path.getsize(os.path.join(root, f)) for root, _, files in os.walk(path) for f in files)
+    return os.path.getsize(path) if os.path.exists(path) else None
+
+
+def row_count(path):
+    """Data rows in a CSV or Parquet artifact; None for anything else (images, PDFs)."""
+    if not os.path.exists(path):
+        return None
+    if path.endswith('.csv'):
+        with open(path, 'rb') as f:
+            return max(sum(1 for _ in f) - 1, 0)
+    if path.endswith('.parquet') or os.path.isdir(path):
+        import pyarrow.parquet as pq
+        return pq.ParquetDataset(path).read(columns=[]).num_rows
+    return None
+
+
+def describe_artifacts(paths):
+    return [{'path': p, 'rows': row_count(p), 'bytes': artifact_size(p)} for p in paths]
+
+
+def measure_stage(name, func, inputs=(), outputs=(), profile_dir=None):
+    """Runs `func` and returns its stage record: wall/CPU time, peak RSS, row counts, sizes, profile path."""
+    record = {'stage': name, 'inputs': describe_artifacts(inputs)}
+    rss_before = peak_rss_mb()
+    profiler = cProfile.Profile() if profile_dir else None
+
+    wall_start, cpu_start = time.perf_counter(), time.process_time()
+    if profiler:
+        profiler.enable()
+    try:
+        func()
+    finally:
+        if profiler:
+            profiler.disable()
+    record['wall_seconds'] = round(time.perf_counter() - wall_start, 3)
+    record['cpu_seconds'] = round(time.process_time() - cpu_start, 3)
+    # Peak of the whole process. The stage pool gives every stage a fresh worker, so there it is
+    # the stage's own; run serially (--workers 1) it includes earlier stages, and only the growth
+    # (how far this stage pushed the high-water mark) is attributable to it.
+    record['peak_rss_mb'] = peak_rss_mb()
+    record['peak_rss_growth_mb'] = (round(record['peak_rss_mb'] - rss_before, 1)
+                                    if rss_before is not None else None)
+    record['outputs'] = describe_artifacts(outputs)
+
+    if profiler:
+        os.makedirs(profile_dir, exist_ok=True)
+        prof_path = os.path.join(profile_dir, f"{name}.prof")
+        profiler.dump_stats(prof_path)
+        summary = io.StringIO()
+        pstats.Stats(profiler, stream=summary).sort_stats('cumulative').print_stats(PROFILE_TOP_N)
+        record['profile'] = prof_path
+        record['profile_top'] = summary.getvalue().splitlines()[-(PROFILE_TOP_N + 2):]
+    return record
+
+
+def new_run_id():
+    return time.strftime('%Y%m%d_%H%M%S')
+
+
+def write_manifest(run_id, records, settings=None, manifest_dir=MANIFEST_DIR):
+    os.makedirs(manifest_dir, exist_ok=True)
+    path = os.path.join(manifest_dir, f"run_{run_id}.json")
+    manifest = {
+        'run_id': run_id,
+        'finished_at': time.strftime('%Y-%m-%d %H:%M:%S'),
+        'machine': {'cpus': os.cpu_count(), 'platform': platform.platform(), 'python': platform.python_version()},
+        'settings': settings or {},
+        'total_wall_seconds': round(sum(r.get('wall_seconds', 0) for r in records), 3),
+        'stages': records,
+    }
+    with open(path, "w") as f:
+        json.dump(manifest, f, indent=2)
+    return path
+
+
+def _output_rows(record):
+    rows = [o['rows'] for o in record.get('outputs', []) if o.get('rows') is not None]
+    return sum(rows) if rows else None
+
+
+def compare_manifests(path_a, path_b):
+    """Side-by-side per-stage table of two manifests; flags stages that got >25% slower or bigger."""
+    with open(path_a) as f:
+        a = {r['stage']: r for r in json.load(f)['stages']}
+    with open(path_b) as f:
+        b = {r['stage']: r for r in json.load(f)['stages']}
+
+    rows = []
+    for stage in list(dict.fromkeys(list(a) + list(b))):
+        ra, rb = a.get(stage, {}), b.get(stage, {})
+        wall_a, wall_b = ra.get('wall_seconds'), rb.get('wall_seconds')
+        rss_a, rss_b = ra.get('peak_rss_mb'), rb.get('peak_rss_mb')
+        ratio = wall_b / wall_a if wall_a and wall_b is not None else None
+        rss_ratio = rss_b / rss_a if rss_a and rss_b is not None else None
+        flag = ""
+        if (ratio or 0) > REGRESSION_RATIO or (rss_ratio or 0) > REGRESSION_RATIO:
+            flag = "REGRESSION"
+        elif ratio is not None and ratio < 1 / REGRESSION_RATIO:
+            flag = "faster"
+        rows.append({
+            'stage': stage,
+            'status_a': ra.get('status', 'missing'), 'status_b': rb.get('status', 'missing'),
+            'wall_a': wall_a, 'wall_b': wall_b, 'wall_ratio': round(ratio, 2) if ratio else None,
+            'cpu_a': ra.get('cpu_seconds'), 'cpu_b': rb.get('cpu_seconds'),
+            'rss_a': rss_a, 'rss_b': rss_b,
+            'rows_out_a': _output_rows(ra), 'rows_out_b': _output_rows(rb),
+            'flag': flag,
+        })
+    import pandas as pd     # only the comparison table needs pandas (keeps stage_runner imports light)
+    return pd.DataFrame(rows)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Inspect pipeline run manifests.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    cmp_parser = sub.add_parser("compare", help="Compare two run manifests stage by stage")
+    cmp_parser.add_argument("baseline")
+    cmp_parser.add_argument("candidate")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    if args.command == "compare":
+        table = compare_manifests(args.baseline, args.candidate)
+        print(table.to_string(index=False))
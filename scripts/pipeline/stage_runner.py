@@ -0,0 +1,176 @@
+import hashlib
+import importlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from scripts.pipeline.run_manifest import MANIFEST_DIR, measure_stage, new_run_id, write_manifest
+
+# Configuration
+STATE_FILE = "data/processed/.pipeline_state.json"
+HASH_CHUNK = 1 << 20
+
+
+def stage(name, target, inputs, outputs):
+    """Declares one pipeline stage. `target` is 'package.module:function' so workers import it lazily."""
+    return {'name': name, 'target': target, 'inputs': list(inputs), 'outputs': list(outputs)}
+
+
+def file_hash(path):
+    if not os.path.exists(path):
+        return None
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def build_dependencies(stages):
+    """Stage B depends on stage A when B reads a file that A writes."""
+    producers = {out: s['name'] for s in stages for out in s['outputs']}
+    return {
+        s['name']: sorted({producers[i] for i in s['inputs'] if i in producers} - {s['name']})
+        for s in stages
+    }
+
+
+def load_state(state_file=STATE_FILE):
+    if not os.path.exists(state_file):
+        return {}
+    with open(state_file) as f:
+        return json.load(f)
+
+
+def save_state(state, state_file=STATE_FILE):
+    os.makedirs(os.path.dirname(state_file), exist_ok=True)
+    with open(state_file + ".tmp", "w") as f:
+        json.dump(state, f, indent=2, sort_keys=True)
+    os.replace(state_file + ".tmp", state_file)
+
+
+def is_up_to_date(stage_def, state):
+    """True when the inputs hash the same as last run and every output still exists."""
+    previous = state.get(stage_def['name'])
+    if previous is None:
+        return False
+    current = {path: file_hash(path) for path in stage_def['inputs']}
+    return previous.get('inputs') == current and all(os.path.exists(p) for p in stage_def['outputs'])
+
+
+def execute_stage(stage_def, profile_dir=None):
+    """Worker entry point: import the stage function and run it under instrumentation."""
+    module_name, func_name = stage_def['target'].split(':')
+    func = getattr(importlib.import_module(module_name), func_name)
+    return measure_stage(stage_def['name'], func, stage_def['inputs'], stage_def['outputs'], profile_dir)
+
+
+def run_dag(stages, only=None, force=None, workers=None, state_file=STATE_FILE,
+            profile=False, manifest_dir=MANIFEST_DIR):
+    """Runs `stages` in dependency order, skipping up-to-date ones and overlapping independent ones.
+
+    only: stage names to consider (everything else is left untouched).
+    force: stage names to run even if their inputs are unchanged ('all' forces every stage).
+    workers: process pool size; 1 runs every stage in this process, one after another
+    (cheaper, but then peak RSS is cumulative - see the record's peak_rss_growth_mb).
+    profile: also capture a cProfile dump per executed stage next to the run manifest.
+    Every stage's record (see run_manifest.measure_stage) is written to a JSON run manifest.
+    Returns ({stage_name: 'ran' | 'skipped' | 'failed' | 'blocked'}, manifest_path).
+    """
+    names = [s['name'] for s in stages]
+    for name in list(only or []) + [f for f in (force or []) if f != 'all']:
+        if name not in names:
+            raise ValueError(f"Unknown stage '{name}'. Available: {', '.join(names)}")
+
+    by_name = {s['name']: s for s in stages}
+    selected = [n for n in names if not only or n in only]
+    forced = set(names) if force and 'all' in force else set(force or [])
+    deps = {n: [d for d in build_dependencies(stages)[n] if d in selected] for n in selected}
+
+    state = load_state(state_file)
+    run_id = new_run_id()
+    profile_dir = os.path.join(manifest_dir, f"profiles_{run_id}") if profile else None
+    records = {}
+    status = {}
+    pending = list(selected)
+    running = {}
+
+    def finish(name, ok, record=None):
+        status[name] = 'ran' if ok else 'failed'
+        records[name] = dict(record or {'stage': name}, status=status[name])
+        if ok:
+            s = by_name[name]
+            state[name] = {
+                'inputs': {path: file_hash(path) for path in s['inputs']},
+                'outputs': s['outputs'],
+                'seconds': record['wall_seconds'],
+                'finished_at': time.strftime('%Y-%m-%d %H:%M:%S'),
+            }
+            save_state(state, state_file)
+            peak = f"{record['peak_rss_mb']:.0f} MB" if record['peak_rss_mb'] is not None else "n/a"
+            print(f"  ✅ {name} finished in {record['wall_seconds']:.1f}s "
+                  f"(cpu {record['cpu_seconds']:.1f}s, peak {peak})")
+        else:
+            print(f"  ❌ {name} failed")
+
+    def outputs_ok(name):
+        return all(os.path.exists(p) for p in by_name[name]['outputs'])
+
+    # One fresh worker per stage, so each record's peak RSS is that stage's alone
+    # (max_tasks_per_child is Python 3.11+; older versions reuse workers and peaks are upper bounds)
+    pool_options = {'max_tasks_per_child': 1} if sys.version_info >= (3, 11) else {}
+    pool = ProcessPoolExecutor(max_workers=workers, **pool_options) if workers != 1 else None
+    try:
+        while pending or running:
+            # Launch (or skip) every stage whose dependencies have settled
+            launched = False
+            for name in list(pending):
+                if any(d in pending or d in running.values() for d in deps[name]):
+                    continue
+                pending.remove(name)
+                launched = True
+                if any(status[d] in ('failed', 'blocked') for d in deps[name]):
+                    status[name] = 'blocked'
+                    records[name] = {'stage': name, 'status': 'blocked'}
+                    print(f"  ⏭️  {name} blocked by a failed dependency")
+                elif name not in forced and is_up_to_date(by_name[name], state):
+                    status[name] = 'skipped'
+                    records[name] = {'stage': name, 'status': 'skipped'}
+                    print(f"  ⏩ {name} up to date (inputs unchanged)")
+                elif pool is None:
+                    print(f"  ▶ {name}")
+                    try:
+                        record = execute_stage(by_name[name], profile_dir)
+                        finish(name, outputs_ok(name), record)
+                    except Exception as e:
+                        print(f"  {name}: {e}")
+                        finish(name, False)
+                else:
+                    print(f"  ▶ {name}")
+                    running[pool.submit(execute_stage, by_name[name], profile_dir)] = name
+
+            if not running:
+                if pending and not launched:
+                    raise RuntimeError(f"Dependency cycle between stages: {', '.join(pending)}")
+                continue
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                try:
+                    record = future.result()
+                    finish(name, outputs_ok(name), record)
+                except Exception as e:
+                    print(f"  {name}: {e}")
+                    finish(name, False)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    manifest_path = write_manifest(
+        run_id, [records[n] for n in selected if n in records],
+        settings={'only': only, 'force': force, 'workers': workers, 'profile': profile},
+        manifest_dir=manifest_dir,
+    )
+    return status, manifest_path
@@ -0,0 +1,226 @@
+# Local scouting query service: a long-lived HTTP/JSON server over the insight artifacts.
+# Each report CSV is loaded once into a table keyed by ttfi_id, with its leaderboard order and
+# JSON-ready rows precomputed, so a request is a dict lookup or a list slice. Before answering,
+# the server stats the files (at most every RELOAD_INTERVAL seconds) and reloads only the
+# artifact whose size or mtime changed; a reload builds the new table aside and swaps it in.
+#
+#   python -m scripts.service.scouting_service --port 8765
+#   curl localhost:8765/players/200813
+#   curl "localhost:8765/leaderboard/elo?k=5"
+#   curl "localhost:8765/archetypes/Rising%20Star?k=10"
+#   curl localhost:8765/forecast/200813
+
+import argparse
+import json
+import math
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlparse
+
+import pandas as pd
+
+# Configuration
+INSIGHT_DIR = "data/insights"
+HOST = "127.0.0.1"
+PORT = 8765
+TOP_K = 10
+MAX_K = 1000
+RELOAD_INTERVAL = 1.0           # seconds between on-disk change checks
+
+# name: (file, leaderboard column, descending?)
+ARTIFACTS = {
+    'forecast': ("ensemble_2026_scouting_report.csv", 'predicted_2026_points', True),
+    'elo': ("player_elo_ratings.csv", 'elo_rating', True),
+    'glicko': ("player_glicko_ratings.csv", 'conservative_rating', True),
+    'clusters': ("player_clusters_report.csv", 'total_pts', True),
+    'longevity': ("career_longevity_report.csv", 'survival_prob_at_current_age', False),
+}
+
+
+def _clean(value):
+    """JSON-safe scalar: numpy types to Python, NaN to None."""
+    if hasattr(value, 'item'):
+        value = value.item()
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    return value
+
+
+def load_table(path, sort_by, descending):
+    """One artifact as {'rows': {ttfi_id: record}, 'order': [ttfi_id, ...] best first}
+    (plus 'by_archetype': {archetype: [ttfi_id, ...] best first} for the cluster report)."""
+    df = pd.read_csv(path)
+    df = df.dropna(subset=['ttfi_id']).drop_duplicates('ttfi_id', keep='last')
+    df['ttfi_id'] = df['ttfi_id'].astype('int64')
+    if sort_by in df.columns:
+        df = df.sort_values(sort_by, ascending=not descending, kind='stable', na_position='last')
+    columns = list(df.columns)
+    rows = {}
+    for values in df.itertuples(index=False, name=None):
+        record = {c: _clean(v) for c, v in zip(columns, values)}
+        rows[record['ttfi_id']] = record
+    table = {'rows': rows, 'order': list(rows)}
+    if 'archetype' in df.columns:
+        table['by_archetype'] = {a: ids.tolist() for a, ids in
+                                 df.groupby('archetype', sort=False)['ttfi_id'].apply(lambda s: s.to_numpy()).items()}
+    return table
+
+
+class ArtifactCache:
+    """Indexed in-memory tables for the insight artifacts, hot-reloaded per file."""
+
+    def __init__(self, insight_dir=INSIGHT_DIR, artifacts=ARTIFACTS, reload_interval=RELOAD_INTERVAL):
+        self.insight_dir = insight_dir
+        self.artifacts = artifacts
+        self.reload_interval = reload_interval
+        self.tables = {}
+        self.versions = {}
+        self.loaded_at = {}
+        self._checked = 0.0
+        self._lock = threading.Lock()
+        self.refresh(force=True)
+
+    def _path(self, name):
+        return os.path.join(self.insight_dir, self.artifacts[name][0])
+
+    def refresh(self, force=False):
+        """Reloads the artifacts whose file changed since they were loaded; returns their names."""
+        now = time.monotonic()
+        if not force and now - self._checked < self.reload_interval:
+            return []
+        with self._lock:
+            if not force and now - self._checked < self.reload_interval:
+                return []
+            self._checked = now
+            reloaded = []
+            for name, (_, sort_by, descending) in self.artifacts.items():
+                try:
+                    stat = os.stat(self._path(name))
+                except FileNotFoundError:
+                    self.tables.pop(name, None)
+                    self.versions.pop(name, None)
+                    continue
+                version = (stat.st_mtime_ns, stat.st_size)
+                if self.versions.get(name) == version:
+                    continue
+                try:
+                    table = load_table(self._path(name), sort_by, descending)
+                except (pd.errors.ParserError, pd.errors.EmptyDataError, KeyError):
+                    continue            # half-written file: keep serving the old table, retry next check
+                self.tables[name] = table
+                self.versions[name] = version
+                self.loaded_at[name] = time.strftime('%Y-%m-%d %H:%M:%S')
+                reloaded.append(name)
+            return reloaded
+
+    def status(self):
+        return {name: {'file': self._path(name), 'rows': len(self.tables[name]['rows']),
+                       'loaded_at': self.loaded_at[name]} if name in self.tables else None
+                for name in self.artifacts}
+
+    def player(self, ttfi_id):
+        """Everything known about one player, one section per artifact (None if absent)."""
+        found = {name: table['rows'].get(ttfi_id) for name, table in self.tables.items()}
+        if not any(found.values()):
+            return None
+        name = next((r['player_name'] for r in found.values() if r and 'player_name' in r), None)
+        return dict({'ttfi_id': ttfi_id, 'player_name': name}, **found)
+
+    def leaderboard(self, artifact, k=TOP_K, archetype=None):
+        table = self.tables[artifact]
+        order = table['order'] if archetype is None else table.get('by_archetype', {}).get(archetype, [])
+        return [table['rows'][i] for i in order[:k]]
+
+    def archetypes(self):
+        groups = self.tables.get('clusters', {}).get('by_archetype', {})
+        return {archetype: len(ids) for archetype, ids in groups.items()}
+
+
+class ScoutingHandler(BaseHTTPRequestHandler):
+    cache = None                # set by make_server
+
+    def _send(self, status, payload):
+        body = json.dumps(payload, ensure_ascii=False).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _not_found(self, message):
+        self._send(404, {'error': message})
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        parts = [unquote(p) for p in url.path.strip('/').split('/') if p]
+        query = parse_qs(url.query)
+        try:
+            k = min(int(query.get('k', [TOP_K])[0]), MAX_K)
+            ttfi_id = int(parts[1]) if len(parts) == 2 and parts[0] in ('players', 'forecast') else None
+        except ValueError:
+            return self._send(400, {'error': "k and ttfi_id must be integers"})
+        if k < 1:
+            return self._send(400, {'error': "k must be at least 1"})
+
+        cache = self.cache
+        cache.refresh()
+        if parts == [] or parts == ['health']:
+            return self._send(200, {'artifacts': cache.status()})
+
+        if parts[0] == 'players' and ttfi_id is not None:
+            player = cache.player(ttfi_id)
+            return self._send(200, player) if player else self._not_found(f"Unknown ttfi_id {ttfi_id}")
+
+        if parts[0] == 'forecast' and ttfi_id is not None:
+            row = cache.tables.get('forecast', {'rows': {}})['rows'].get(ttfi_id)
+            return self._send(200, row) if row else self._not_found(f"No 2026 forecast for ttfi_id {ttfi_id}")
+
+        if parts[0] == 'leaderboard' and len(parts) == 2:
+            if parts[1] not in cache.tables:
+                return self._not_found(f"Unknown or unavailable leaderboard '{parts[1]}' "
+                                       f"(choose from {', '.join(cache.tables)})")
+            return self._send(200, cache.leaderboard(parts[1], k))
+
+        if parts[0] == 'archetypes' and 'clusters' in cache.tables:
+            if len(parts) == 1:
+                return self._send(200, cache.archetypes())
+            return self._send(200, cache.leaderboard('clusters', k, archetype=parts[1]))
+
+        return self._not_found(f"No route for {url.path}")
+
+    def log_message(self, format, *args):
+        pass                    # keep the console quiet; latency matters more than access logs
+
+
+def make_server(host=HOST, port=PORT, insight_dir=INSIGHT_DIR):
+    cache = ArtifactCache(insight_dir)
+    handler = type('Handler', (ScoutingHandler,), {'cache': cache})
+    return ThreadingHTTPServer((host, port), handler)
+
+
+def run_scouting_service(host=HOST, port=PORT, insight_dir=INSIGHT_DIR):
+    server = make_server(host, port, insight_dir)
+    loaded = {name: info['rows'] for name, info in server.RequestHandlerClass.cache.status().items() if info}
+    print(f"SUCCESS: Scouting service on http://{host}:{server.server_address[1]}/ "
+          f"({', '.join(f'{n}: {r} players' for n, r in loaded.items()) or 'no artifacts yet'})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Local HTTP/JSON scouting queries over the insight artifacts.")
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--insight-dir", default=INSIGHT_DIR)
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    run_scouting_service(args.host, args.port, args.insight_dir)
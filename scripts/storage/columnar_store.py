@@ -0,0 +1,132 @@
+import os
+import shutil
+import tempfile
+from contextlib import contextmanager
+
+import pandas as pd
+
+try:
+    import fcntl
+except ImportError:         # Windows: no advisory locks, the unique tmp dirs alone keep writers apart
+    fcntl = None
+
+# Configuration
+MASTER_CSV = "data/processed/master_long_dataset.csv"
+STORE_DIR = "data/processed/master_long_dataset"  # Parquet dataset, one folder per season_year
+
+MASTER_COLUMNS = [
+    'season_year', 'ttfi_id', 'player_name', 'state_institution', 'total_seasonal_points',
+    'final_rank_position', 'tournament_name', 'a1_location', 'a2_date', 'points_earned'
+]
+CATEGORICAL_COLUMNS = ['player_name', 'state_institution', 'tournament_name']
+NUMERIC_COLUMNS = ['total_seasonal_points', 'points_earned']
+
+
+def normalize_ttfi_id(series):
+    """Raw exports mix 200503, '200503' and '200503.0' - normalise them all to one integer id (else <NA>)."""
+    ids = series.astype(str).str.strip().str.replace(r'\.0$', '', regex=True)
+    ids = ids.where(ids.str.fullmatch(r'\d+'))
+    return pd.to_numeric(ids, errors='coerce').astype('Int64')
+
+
+def normalize_master(df):
+    """Applies the canonical dtypes of the master long dataset (the one place ids/points are coerced)."""
+    df = df.copy()
+    df['season_year'] = pd.to_numeric(df['season_year'], errors='coerce')
+    df = df.dropna(subset=['season_year'])
+    df['season_year'] = df['season_year'].astype('int16')
+    df['ttfi_id'] = normalize_ttfi_id(df['ttfi_id'])
+    df['final_rank_position'] = pd.to_numeric(df['final_rank_position'], errors='coerce').astype('Int32')
+    for col in NUMERIC_COLUMNS:
+        df[col] = pd.to_numeric(df[col], errors='coerce')
+    df['points_earned'] = df['points_earned'].fillna(0)
+    for col in CATEGORICAL_COLUMNS:
+        df[col] = df[col].astype('category')
+    return df
+
+
+@contextmanager
+def build_lock(out_dir):
+    """Exclusive lock on `out_dir`.lock, so concurrent stages rebuild a shared cache only once."""
+    os.makedirs(os.path.dirname(os.path.abspath(out_dir)), exist_ok=True)
+    with open(out_dir + ".lock", "w") as f:
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def make_tmp_dir(out_dir):
+    """A fresh sibling of `out_dir` to build into (unique per writer, same filesystem)."""
+    parent, name = os.path.split(os.path.abspath(out_dir))
+    os.makedirs(parent, exist_ok=True)
+    return tempfile.mkdtemp(dir=parent, prefix=name + ".tmp.")
+
+
+def replace_dir(tmp_dir, out_dir):
+    """Publishes the finished `tmp_dir` as `out_dir`. If another writer publishes in between
+    our two renames, its copy is kept and ours is discarded."""
+    old_dir = tmp_dir + ".old"
+    try:
+        os.rename(out_dir, old_dir)
+    except FileNotFoundError:
+        old_dir = None
+    try:
+        os.replace(tmp_dir, out_dir)
+    except OSError:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+    if old_dir is not None:
+        shutil.rmtree(old_dir, ignore_errors=True)
+    return out_dir
+
+
+def write_master_store(df, store_dir=STORE_DIR):
+    """Writes the typed master dataset as Parquet partitioned by season_year (replacing any old store)."""
+    df = normalize_master(df)
+    tmp_dir = make_tmp_dir(store_dir)
+    try:
+        df.to_parquet(tmp_dir, partition_cols=['season_year'], index=False)
+    except Exception:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+    return replace_dir(tmp_dir, store_dir)
+
+
+def _store_is_stale(csv_path, store_dir):
+    if not os.path.isdir(store_dir):
+        return True
+    return os.path.exists(csv_path) and os.path.getmtime(csv_path) > os.path.getmtime(store_dir)
+
+
+def load_master(columns=None, seasons=None, csv_path=MASTER_CSV, store_dir=STORE_DIR):
+    """Typed master long dataset from the columnar store.
+
+    columns: optional projection (only these columns are read from disk).
+    seasons: optional iterable of season_year values to read (other partitions are skipped).
+    The store is (re)built from the CSV once if it is missing or older than the CSV; stages
+    that start together wait on the build lock and the first one builds it for all of them.
+    """
+    if _store_is_stale(csv_path, store_dir):
+        with build_lock(store_dir):
+            if _store_is_stale(csv_path, store_dir):
+                if not os.path.exists(csv_path):
+                    raise FileNotFoundError(f"{csv_path} not found. Run the mapping pipeline first.")
+                write_master_store(pd.read_csv(csv_path), store_dir)
+
+    filters = [('season_year', 'in', [int(s) for s in seasons])] if seasons is not None else None
+    df = pd.read_parquet(store_dir, columns=columns, filters=filters)
+
+    df = df[[c for c in MASTER_COLUMNS if c in df.columns]]
+
+    # Hive partitions come back as categories; restore the integer year
+    if 'season_year' in df.columns:
+        df['season_year'] = df['season_year'].astype('int16')
+    # Keep lexical category order so sorts behave like the plain-text columns
+    for col in CATEGORICAL_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].cat.remove_unused_categories()
+            df[col] = df[col].cat.reorder_categories(sorted(df[col].cat.categories))
+    return df
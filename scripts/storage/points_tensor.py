@@ -0,0 +1,153 @@
+# Shared player x season x tournament points tensor.
+# points_earned is materialised once as a dense float32 array (NaN = no entry) on a player x
+# calendar-season x tournament-slot grid, next to the seasonal totals (player x season), and saved
+# as .npy files that load memory-mapped. A slot is one event: (season, tournament name, venue, date),
+# so same-named events at different venues or dates keep separate cells. Feature extraction reads
+# its momentum, volatility and pressure scores from it and career progression its season pivot,
+# instead of re-aggregating the long frame; only the pages a slice touches are read from disk.
+#
+#   python -m scripts.storage.points_tensor            # (re)build from the master dataset
+
+import json
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+
+from scripts.storage.columnar_store import MASTER_CSV, build_lock, load_master, make_tmp_dir, replace_dir
+
+# Configuration
+TENSOR_DIR = "data/processed/points_tensor"
+EVENT_COLUMNS = ['season_year', 'tournament_name', 'a1_location', 'a2_date']
+TENSOR_COLUMNS = ['season_year', 'ttfi_id', 'player_name', 'state_institution', 'total_seasonal_points',
+                  'tournament_name', 'a1_location', 'a2_date', 'points_earned']
+
+
+def write_points_tensor(df, out_dir=TENSOR_DIR):
+    """Builds points.npy (players x seasons x tournament slots), season_totals.npy (players x seasons)
+    and the players.csv / player_seasons.csv / tournaments.csv / meta.json indexes from the typed master frame."""
+    df = df.dropna(subset=['ttfi_id'])
+    ids, rows = np.unique(df['ttfi_id'].to_numpy(dtype=np.int64), return_inverse=True)
+    first_year = int(df['season_year'].min())
+    seasons = np.arange(first_year, int(df['season_year'].max()) + 1)
+    cols = df['season_year'].to_numpy(dtype=np.int64) - first_year
+
+    # Tournament slots are numbered within each season (event names change from year to year);
+    # a blank venue or date is its own key, not a wildcard
+    keys = pd.DataFrame({'season_year': df['season_year'].to_numpy(dtype=np.int64)})
+    for col in EVENT_COLUMNS[1:]:
+        keys[col] = df[col].astype(object).fillna('').astype(str).to_numpy()
+    events = keys.drop_duplicates().sort_values(EVENT_COLUMNS, kind='stable').reset_index(drop=True)
+    events['slot'] = events.groupby('season_year').cumcount()
+    slot = keys.merge(events, on=EVENT_COLUMNS, how='left')['slot'].to_numpy()
+    shape = (len(ids), len(seasons), int(events['slot'].max()) + 1)
+
+    # One bincount per quantity over the flat cell index; cells without a result stay NaN
+    flat = np.ravel_multi_index((rows, cols, slot), shape)
+    size = int(np.prod(shape))
+    earned = df['points_earned'].to_numpy(dtype=float)
+    entries = np.bincount(flat, weights=~np.isnan(earned), minlength=size)
+    points = np.bincount(flat, weights=np.nan_to_num(earned), minlength=size)
+    points = np.where(entries > 0, points, np.nan).astype(np.float32).reshape(shape)
+
+    totals = np.full(shape[:2], np.nan, dtype=np.float32)
+    season_max = (pd.DataFrame({'r': rows, 'c': cols, 'v': df['total_seasonal_points'].to_numpy(dtype=float)})
+                  .groupby(['r', 'c'])['v'].max())
+    totals[season_max.index.get_level_values('r'), season_max.index.get_level_values('c')] = season_max.to_numpy()
+
+    # Latest name / institution per player, plus the name / institution of every ranked season
+    latest = (df.assign(row=rows).sort_values('season_year', kind='stable')
+              .drop_duplicates('row', keep='last').sort_values('row'))
+    players = pd.DataFrame({'ttfi_id': ids,
+                            'player_name': latest['player_name'].astype(str).to_numpy(),
+                            'state_institution': latest['state_institution'].astype(str).to_numpy()})
+    player_seasons = (pd.DataFrame({'ttfi_id': ids[rows], 'season_year': cols + first_year,
+                                    'player_name': df['player_name'].astype(str).to_numpy(),
+                                    'state_institution': df['state_institution'].astype(str).to_numpy()})
+                      .drop_duplicates(['ttfi_id', 'season_year']).sort_values(['season_year', 'ttfi_id']))
+
+    tmp_dir = make_tmp_dir(out_dir)
+    try:
+        np.save(os.path.join(tmp_dir, "points.npy"), points)
+        np.save(os.path.join(tmp_dir, "season_totals.npy"), totals)
+        players.to_csv(os.path.join(tmp_dir, "players.csv"), index=False)
+        player_seasons.to_csv(os.path.join(tmp_dir, "player_seasons.csv"), index=False)
+        events.to_csv(os.path.join(tmp_dir, "tournaments.csv"), index=False)
+        with open(os.path.join(tmp_dir, "meta.json"), "w") as f:
+            json.dump({'shape': list(shape), 'first_season': first_year, 'rows': len(df)}, f)
+    except Exception:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+    return replace_dir(tmp_dir, out_dir)
+
+
+def _tensor_is_stale(csv_path, out_dir):
+    if not os.path.exists(os.path.join(out_dir, "meta.json")):
+        return True
+    return os.path.exists(csv_path) and os.path.getmtime(csv_path) > os.path.getmtime(out_dir)
+
+
+def load_points_tensor(out_dir=TENSOR_DIR, csv_path=MASTER_CSV):
+    """Memory-mapped tensor plus its indexes (rebuilt from the master dataset if missing or stale).
+
+    Returns {'points', 'season_totals', 'players', 'player_seasons', 'ids', 'index', 'seasons', 'tournaments'}:
+    index maps ttfi_id -> row; seasons[c] is the calendar year of column c; tournaments lists
+    each season's events with their slot.
+    """
+    if _tensor_is_stale(csv_path, out_dir):
+        with build_lock(out_dir):
+            if _tensor_is_stale(csv_path, out_dir):
+                write_points_tensor(load_master(columns=TENSOR_COLUMNS, csv_path=csv_path), out_dir)
+
+    with open(os.path.join(out_dir, "meta.json")) as f:
+        meta = json.load(f)
+    players = pd.read_csv(os.path.join(out_dir, "players.csv"))
+    ids = players['ttfi_id'].to_numpy()
+    text = {'player_name': str, 'state_institution': str}
+    return {
+        'points': np.load(os.path.join(out_dir, "points.npy"), mmap_mode='r'),
+        'season_totals': np.load(os.path.join(out_dir, "season_totals.npy"), mmap_mode='r'),
+        'players': players,
+        'player_seasons': pd.read_csv(os.path.join(out_dir, "player_seasons.csv"), dtype=text, keep_default_na=False),
+        'ids': ids,
+        'index': dict(zip(ids.tolist(), range(len(ids)))),
+        'seasons': np.arange(meta['first_season'], meta['first_season'] + meta['shape'][1]),
+        'tournaments': pd.read_csv(os.path.join(out_dir, "tournaments.csv"),
+                                   dtype={c: str for c in EVENT_COLUMNS[1:]}, keep_default_na=False),
+    }
+
+
+def player_points(pt, ttfi_id):
+    """seasons x tournament slots view of one player's results (no copy)."""
+    return pt['points'][pt['index'][ttfi_id]]
+
+
+def season_points(pt, season_year):
+    """players x tournament slots view of one season (no copy)."""
+    return pt['points'][:, season_year - pt['seasons'][0]]
+
+
+def player_totals(pt, ttfi_id):
+    """One player's seasonal totals, a view of the memory-mapped row (no copy)."""
+    return pt['season_totals'][pt['index'][ttfi_id]]
+
+
+def season_totals_frame(pt, seasons=None):
+    """Player x season totals as a DataFrame (ttfi_id index, season columns), NaN = not ranked.
+
+    Wraps the memory-mapped array without copying when `seasons` is None; selecting seasons copies.
+    """
+    totals = pt['season_totals']
+    years = pt['seasons']
+    if seasons is not None:
+        keep = np.isin(years, list(seasons))
+        totals, years = totals[:, keep], years[keep]
+    return pd.DataFrame(totals, index=pd.Index(pt['ids'], name='ttfi_id'),
+                        columns=pd.Index(years, name='season_year'), copy=False)
+
+
+if __name__ == "__main__":
+    path = write_points_tensor(load_master(columns=TENSOR_COLUMNS))
+    pt = load_points_tensor(path)
+    print(f"SUCCESS: Points tensor {pt['points'].shape} (players x seasons x tournaments) saved to {path}/")
@@ -1,109 +1,165 @@
-#This script precisely identifies the player with the highest point delta between 2020 and 2024 and generates a detailed growth chart.
-
+# Career progression leaderboard: growth between every pair of seasons for every ranked player.
+# One player x season points pivot is read from the shared season-totals cache; growth, CAGR and
+# per-pair percentile ranks for all start/end year pairs come from broadcasting over that pivot.
+# The chart renders headlessly (Agg, cached), so this runs inside the scheduled pipeline.
+#
+#   python -m scripts.visualization.analyze_career_progression --start 2022 --end 2024 --k 10 --by cagr
 
+import argparse
+import os
+import sys
 
+import numpy as np
 import pandas as pd
-import matplotlib
-matplotlib.use('TkAgg') # MacOS specific backend fix
 import matplotlib.pyplot as plt
-import os
-import re
+
+# Repo root on the path, so `python scripts/visualization/analyze_career_progression.py` finds the scripts package too
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if ROOT_DIR not in sys.path:
+    sys.path.append(ROOT_DIR)
+
+from scripts.storage.points_tensor import load_points_tensor, season_totals_frame
+from scripts.visualization.chart_renderer import chart, render_charts
 
 # Configuration
-RAW_DIR = "data/raw"
+INPUT_FILE = "data/processed/master_long_dataset.csv"
 OUTPUT_DIR = "data/insights"
-YEARS = [2020, 2021, 2022, 2023, 2024]
-
-def extract_yearly_totals():
-    data_list = []
-    
-    for year in YEARS:
-        filename = f"TTFI_FINAL_RANKING_{year}.csv"
-        path = os.path.join(RAW_DIR, filename)
-        
-        if not os.path.exists(path):
-            print(f"Warning: {filename} not found in {RAW_DIR}")
-            continue
-            
-        # Load CSV (headers are on Row 2, index 2)
-        df_raw = pd.read_csv(path, header=None)
-        headers = [str(x).upper().strip() for x in df_raw.iloc[2]]
-        
-        # Map critical columns
-        col_map = {}
-        for i, h in enumerate(headers):
-            if 'TTFI ID' in h: col_map['ttfi_id'] = i
-            elif 'NAME' in h: col_map['player_name'] = i
-            elif 'POINTS' in h and 'BEST' not in h: col_map['points'] = i
-
-        # Extract data from row 3 onwards
-        for _, row in df_raw.iloc[3:].iterrows():
-            try:
-                pid = str(row[col_map['ttfi_id']]).strip().replace('.0', '')
-                name = str(row[col_map['player_name']]).strip()
-                pts = str(row[col_map['points']]).replace(',', '').strip()
-                pts_val = float(pts) if pts and pts != 'nan' else 0.0
-                
-                if pid and name != 'nan':
-                    data_list.append({'Year': year, 'ID': pid, 'Name': name, 'Points': pts_val})
-            except Exception:
-                continue
-
-    return pd.DataFrame(data_list)
-
-def analyze_most_progress():
-    df = extract_yearly_totals()
-    
-    # Identify players present in both the start (2020) and end (2024) years
-    p2020 = set(df[df['Year'] == 2020]['ID'])
-    p2024 = set(df[df['Year'] == 2024]['ID'])
-    consistent_players = p2020.intersection(p2024)
-    
-    growth_stats = []
-    for pid in consistent_players:
-        start_pts = df[(df['ID'] == pid) & (df['Year'] == 2020)]['Points'].max()
-        end_pts = df[(df['ID'] == pid) & (df['Year'] == 2024)]['Points'].max()
-        name = df[df['ID'] == pid]['Name'].iloc[0]
-        growth_stats.append({'ID': pid, 'Name': name, 'Start': start_pts, 'End': end_pts, 'Growth': end_pts - start_pts})
-    
-    # Find the top player
-    top_player = pd.DataFrame(growth_stats).sort_values(by='Growth', ascending=False).iloc[0]
-    history = df[df['ID'] == top_player['ID']].sort_values(by='Year')
-    
-    # --- VIBRANT VISUALIZATION ---
-    plt.figure(figsize=(12, 7), facecolor='#f4f4f4')
-    years = history['Year'].tolist()
-    points = history['Points'].tolist()
-    
+TOP_K = 10
+RANK_BY = ['growth', 'cagr', 'growth_pct']
+
+
+def points_pivot(pt):
+    """Player x season seasonal points (NaN = not ranked that season) and each player's latest name.
+
+    Read from the memory-mapped season totals; dropping the calendar years nobody was ranked in
+    copies the array once (progression_table then works on a float64 copy of that).
+    """
+    pivot = season_totals_frame(pt)
+    pivot = pivot.loc[:, pivot.notna().any(axis=0)]
+    names = pd.Series(pt['players']['player_name'].to_numpy(), index=pivot.index)
+    return pivot, names
+
+
+def progression_table(pivot, names=None):
+    """Long table of growth for every (player, start season < end season) where both seasons are ranked.
+
+    Columns: start_year, end_year, ttfi_id, start_points, end_points, growth, cagr (compound annual
+    growth, NaN when a season has 0 points) and growth_pct (percentile of growth within the pair).
+    """
+    points = pivot.to_numpy(dtype=float)
+    years = pivot.columns.to_numpy(dtype=int)
+    start_idx, end_idx = np.triu_indices(len(years), k=1)
+
+    # players x pairs, one gather per side
+    start, end = points[:, start_idx], points[:, end_idx]
+    player, pair = np.nonzero(~np.isnan(start) & ~np.isnan(end))
+    start, end = start[player, pair], end[player, pair]
+    span = (years[end_idx] - years[start_idx])[pair]
+
+    table = pd.DataFrame({
+        'start_year': years[start_idx][pair],
+        'end_year': years[end_idx][pair],
+        'ttfi_id': pivot.index.to_numpy()[player],
+        'start_points': start,
+        'end_points': end,
+        'growth': end - start,
+    })
+    if names is not None:
+        table.insert(3, 'player_name', names.to_numpy()[player])
+    with np.errstate(divide='ignore', invalid='ignore'):
+        cagr = (end / start) ** (1 / span) - 1
+    table['cagr'] = np.where((start > 0) & (end > 0), cagr, np.nan).round(4)
+    table['growth_pct'] = table.groupby(['start_year', 'end_year'])['growth'].rank(pct=True).round(4)
+    return table.sort_values(['start_year', 'end_year', 'growth'], ascending=[True, True, False],
+                             kind='stable').reset_index(drop=True)
+
+
+def leaderboard(table, start_year=None, end_year=None, k=TOP_K, by='growth'):
+    """Top-k players by `by` for one pair of seasons, or the top k per pair when a year is left open."""
+    rows = table
+    if start_year is not None:
+        rows = rows[rows['start_year'] == start_year]
+    if end_year is not None:
+        rows = rows[rows['end_year'] == end_year]
+    rows = rows.dropna(subset=[by]).sort_values(by, ascending=False, kind='stable')
+    return rows.groupby(['start_year', 'end_year'], sort=True).head(k).sort_values(
+        ['start_year', 'end_year', by], ascending=[True, True, False], kind='stable').reset_index(drop=True)
+
+
+def plot_progress(history, player_name, start_year, end_year):
+    """Season-by-season points of one player with the year-on-year jumps annotated."""
+    fig, ax = plt.subplots(figsize=(12, 7), facecolor='#f4f4f4')
+    years = history['season_year'].tolist()
+    points = history['points'].tolist()
+
     # Plotting the main line
-    plt.plot(years, points, marker='o', linestyle='-', color='#1a73e8', linewidth=4, markersize=12, label='Career Points')
-    
+    ax.plot(years, points, marker='o', linestyle='-', color='#1a73e8', linewidth=4, markersize=12, label='Career Points')
+
     # Annotate total points and yearly jumps
     for i in range(len(years)):
-        plt.text(years[i], points[i] + 8, f"{int(points[i])}", ha='center', fontsize=11, fontweight='bold')
+        ax.text(years[i], points[i] + 8, f"{int(points[i])}", ha='center', fontsize=11, fontweight='bold')
         if i > 0:
             jump = points[i] - points[i-1]
-            plt.annotate(f"+{int(jump)}", xy=((years[i]+years[i-1])/2, (points[i]+points[i-1])/2),
-                         xytext=(0, 15), textcoords='offset points', ha='center',
-                         color='#d93025' if jump < 0 else '#1e8e3e', fontweight='bold', arrowprops=dict(arrowstyle='->', color='gray'))
+            ax.annotate(f"{int(jump):+d}", xy=((years[i]+years[i-1])/2, (points[i]+points[i-1])/2),
+                        xytext=(0, 15), textcoords='offset points', ha='center',
+                        color='#d93025' if jump < 0 else '#1e8e3e', fontweight='bold', arrowprops=dict(arrowstyle='->', color='gray'))
 
     # Styling
-    plt.title(f"Highest 5-Year Career Progress: {top_player['Name']}", fontsize=18, fontweight='bold', color='#202124')
-    plt.xlabel("Season Year", fontsize=13)
-    plt.ylabel("Total Ranking Points", fontsize=13)
-    plt.xticks(YEARS)
-    plt.grid(True, linestyle='--', alpha=0.5)
-    plt.tight_layout()
-    
-    # Save Output
+    ax.set_title(f"Highest {start_year}-{end_year} Career Progress: {player_name}", fontsize=18, fontweight='bold', color='#202124')
+    ax.set_xlabel("Season Year", fontsize=13)
+    ax.set_ylabel("Total Ranking Points", fontsize=13)
+    ax.set_xticks(years)
+    ax.grid(True, linestyle='--', alpha=0.5)
+    fig.tight_layout()
+    return fig
+
+
+def analyze_most_progress(start_year=None, end_year=None, k=TOP_K, by='growth'):
+    if not os.path.exists(INPUT_FILE):
+        print(f"Error: {INPUT_FILE} not found. Run the mapping pipeline first.")
+        return
+
+    # 1. One player x season pivot from the memory-mapped season totals
+    pivot, names = points_pivot(load_points_tensor())
+
+    # 2. Growth, CAGR and percentiles for every season pair
+    table = progression_table(pivot, names)
+    start_year = int(pivot.columns.min()) if start_year is None else start_year
+    end_year = int(pivot.columns.max()) if end_year is None else end_year
+
+    # 3. Top k per pair
     os.makedirs(OUTPUT_DIR, exist_ok=True)
+    board = leaderboard(table, k=k, by=by)
+    board.to_csv(os.path.join(OUTPUT_DIR, "career_progression_leaderboard.csv"), index=False)
+    top = leaderboard(table, start_year, end_year, k, by)
+    if top.empty:
+        print(f"No player is ranked in both {start_year} and {end_year}.")
+        return board
+
+    # 4. Chart of the top player's career (headless, cached on the plotted points)
+    leader = top.iloc[0]
+    history = pivot.loc[leader['ttfi_id']].dropna().rename('points').rename_axis('season_year').reset_index()
     save_path = os.path.join(OUTPUT_DIR, "most_progress_player.png")
-    plt.savefig(save_path)
-    print(f"\nANALYSIS COMPLETE")
-    print(f"Top Player: {top_player['Name']} (ID: {top_player['ID']})")
-    print(f"Total Progress: {top_player['Growth']} points increase")
-    print(f"Chart saved to: {save_path}")
-    plt.show()
+    render_charts([chart("most_progress_player", "scripts.visualization.analyze_career_progression:plot_progress",
+                         history, save_path, player_name=leader['player_name'],
+                         start_year=start_year, end_year=end_year)])
+
+    print(f"\n--- Top {k} Progress {start_year} -> {end_year} (by {by}) ---")
+    print(top[['player_name', 'start_points', 'end_points', 'growth', 'cagr', 'growth_pct']].to_string(index=False))
+    print(f"\nSUCCESS: {len(table)} player-pair growth rows over {len(pivot.columns)} seasons; "
+          f"leaderboard saved to {OUTPUT_DIR}/career_progression_leaderboard.csv, chart to {save_path}")
+    return board
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Career progression leaderboard for every pair of seasons.")
+    parser.add_argument("--start", type=int, default=None, help="Start season (default: first season)")
+    parser.add_argument("--end", type=int, default=None, help="End season (default: latest season)")
+    parser.add_argument("--k", type=int, default=TOP_K)
+    parser.add_argument("--by", choices=RANK_BY, default='growth')
+    return parser.parse_args(argv)
+
 
 if __name__ == "__main__":
-    analyze_most_progress()
\ No newline at end of file
+    args = parse_args()
+    analyze_most_progress(args.start, args.end, args.k, args.by)
@@ -0,0 +1,108 @@
+# Cached, parallel chart rendering.
+# A chart is a plot function ('package.module:function', returns a matplotlib Figure) plus the
+# small frame it draws. The chart is keyed on a hash of that frame, the function and its
+# arguments: an unchanged chart is not redrawn, and changed ones render in a process pool on
+# the Agg backend. Each rendered Figure is also pickled to CHART_DIR, so the PDF report saves
+# the figure objects themselves as vector pages instead of re-importing the PNGs.
+
+import hashlib
+import importlib
+import json
+import os
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+
+# matplotlib and pandas are imported only when a chart is keyed or drawn, so importing this
+# module (e.g. for chart_payload) stays cheap.
+
+# Configuration
+CHART_DIR = "data/processed/chart_cache"
+RENDER_VERSION = 1      # bump to invalidate every cached chart (e.g. after a styling change)
+
+
+def chart(name, target, data, out_path, **kwargs):
+    """Declares one chart: plot function `target` draws `data` (a DataFrame) and is saved to `out_path`."""
+    return {'name': name, 'target': target, 'data': data, 'out_path': out_path, 'kwargs': kwargs}
+
+
+def chart_payload(name, cache_dir=CHART_DIR):
+    return os.path.join(cache_dir, f"{name}.pkl")
+
+
+def chart_key(spec):
+    """Hash of the chart's data (values, index and columns), plot function, arguments and versions."""
+    import matplotlib
+    import pandas as pd
+    digest = hashlib.sha1()
+    data = spec['data']
+    digest.update(pd.util.hash_pandas_object(data, index=True).to_numpy().tobytes())
+    digest.update(json.dumps([list(map(str, data.columns)), spec['target'], spec['kwargs'],
+                              RENDER_VERSION, matplotlib.__version__],
+                             sort_keys=True, default=str).encode())
+    return digest.hexdigest()[:16]
+
+
+def make_figure(spec):
+    """Calls the chart's plot function and returns its Figure."""
+    module_name, func_name = spec['target'].split(':')
+    plot = getattr(importlib.import_module(module_name), func_name)
+    return plot(spec['data'], **spec['kwargs'])
+
+
+def render_chart(spec, key, cache_dir=CHART_DIR):
+    """Worker: draws one chart, saves its PNG and pickles the Figure for the report."""
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    fig = make_figure(spec)
+    os.makedirs(os.path.dirname(spec['out_path']) or ".", exist_ok=True)
+    fig.savefig(spec['out_path'])
+
+    # The payload is written after the PNG, so a crash mid-render leaves the chart uncached
+    os.makedirs(cache_dir, exist_ok=True)
+    path = chart_payload(spec['name'], cache_dir)
+    with open(path + ".tmp", 'wb') as f:
+        # Key first, as its own pickle: the cache check reads it without unpickling the figure
+        pickle.dump(key, f)
+        pickle.dump(fig, f)
+    os.replace(path + ".tmp", path)
+    plt.close(fig)
+    return spec['name']
+
+
+def _is_cached(spec, key, cache_dir):
+    path = chart_payload(spec['name'], cache_dir)
+    if not (os.path.exists(path) and os.path.exists(spec['out_path'])):
+        return False
+    with open(path, 'rb') as f:
+        return pickle.load(f) == key
+
+
+def render_charts(specs, workers=None, cache_dir=CHART_DIR):
+    """Renders the charts whose key changed (in parallel) and returns {name: 'rendered' | 'cached'}."""
+    keys = {spec['name']: chart_key(spec) for spec in specs}
+    todo = [spec for spec in specs if not _is_cached(spec, keys[spec['name']], cache_dir)]
+
+    workers = min(workers or os.cpu_count() or 1, len(todo))
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            list(pool.map(render_chart, todo, [keys[s['name']] for s in todo], [cache_dir] * len(todo)))
+    else:
+        for spec in todo:
+            render_chart(spec, keys[spec['name']], cache_dir)
+
+    rendered = {spec['name'] for spec in todo}
+    status = {spec['name']: 'rendered' if spec['name'] in rendered else 'cached' for spec in specs}
+    cached = sum(s == 'cached' for s in status.values())
+    print(f"Charts: {len(todo)} rendered, {cached} unchanged")
+    return status
+
+
+def load_chart(name, cache_dir=CHART_DIR):
+    """The rendered chart's Figure for `name`, or None if it was never rendered."""
+    path = chart_payload(name, cache_dir)
+    if not os.path.exists(path):
+        return None
+    with open(path, 'rb') as f:
+        pickle.load(f)
+        return pickle.load(f)
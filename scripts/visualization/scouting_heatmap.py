@@ -10,16 +10,37 @@ The Consistency Filter (Career Volatility): * Dark Red: This player is erratic.
 Light Green/Yellow: This player has low volatility. You can trust that their 2026 rank is backed by years of stable, professional performance.'''
 
 import pandas as pd
-import numpy as np
-import xgboost as xgb
 import matplotlib.pyplot as plt
 import seaborn as sns
 import os
+import sys
+
+# Repo root on the path, so `python scripts/visualization/scouting_heatmap.py` finds the scripts package too
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if ROOT_DIR not in sys.path:
+    sys.path.append(ROOT_DIR)
+
+from scripts.modeling.model_registry import get_or_train_ensemble, load_tuned_params, predict
+from scripts.modeling.train_xgboost_ensemble import ENSEMBLE_PARAMS, ENSEMBLE_SEEDS
+from scripts.visualization.chart_renderer import chart, render_charts
 
 # Configuration
 INPUT_FILE = "data/processed/supervised_timeseries_data.csv"
 OUTPUT_DIR = "data/insights"
 
+def plot_scouting_heatmap(heatmap_data):
+    fig, ax = plt.subplots(figsize=(12, 10))
+    # 'RdYlGn' cmap: Green = Positive Rank Jump, Red = High Volatility (Risk)
+    sns.heatmap(heatmap_data, annot=True, cmap='RdYlGn', center=0, 
+                linewidths=.5, cbar_kws={'label': 'Magnitude'}, ax=ax)
+    
+    ax.set_title('Top 20 Players: 2026 Projected Rank Jump vs. Career Volatility', 
+                 fontsize=16, fontweight='bold', pad=20)
+    ax.set_ylabel('Player Name', fontsize=12)
+    ax.set_xlabel('Scouting Metrics', fontsize=12)
+    fig.tight_layout()
+    return fig
+
 def generate_scouting_heatmap():
     if not os.path.exists(INPUT_FILE):
         print("Error: supervised_timeseries_data.csv not found.")
@@ -33,28 +54,14 @@ def generate_scouting_heatmap():
     latest_2024 = df[df['season_year'] == 2024].copy()
     latest_2024['actual_rank_2024'] = latest_2024['total_seasonal_points'].rank(ascending=False, method='min').astype(int)
 
-    # 2. 10-ROUND ENSEMBLE CONSENSUS
-    n_seeds = 10
-    all_preds = []
+    # 2. 10-ROUND ENSEMBLE CONSENSUS (cached in the model registry)
+    # Same defaults, tuned overrides and seeds as the forecast, so this is the forecast's own ensemble
     print("Running 10-Round Ensemble for Heatmap baseline...")
-    
-    for i in range(n_seeds):
-        model = xgb.XGBRegressor(
-            n_estimators=1000, learning_rate=0.03, max_depth=6,
-            random_state=100+i, early_stopping_rounds=50, n_jobs=-1
-        )
-        
-        # Split for validation
-        train_df = df[df['season_year'] < 2024]
-        val_df = df[df['season_year'] == 2024]
-        
-        model.fit(train_df[features], train_df[target], 
-                  eval_set=[(val_df[features], val_df[target])], verbose=False)
-        
-        all_preds.append(model.predict(latest_2024[features]))
+    params = load_tuned_params(ENSEMBLE_PARAMS)
+    models, _ = get_or_train_ensemble(df, features, target, params, ENSEMBLE_SEEDS, validation_year=2024)
 
     # 3. CONSOLIDATE METRICS
-    latest_2024['predicted_2026_points'] = np.mean(all_preds, axis=0).round(2)
+    latest_2024['predicted_2026_points'] = predict(latest_2024, models=models).round(2)
     latest_2024['predicted_rank_2026'] = latest_2024['predicted_2026_points'].rank(ascending=False, method='min').astype(int)
     latest_2024['rank_jump'] = latest_2024['actual_rank_2024'] - latest_2024['predicted_rank_2026']
 
@@ -64,21 +71,10 @@ def generate_scouting_heatmap():
     # Selecting the two key comparison metrics
     heatmap_data = top_20.set_index('player_name')[['rank_jump', 'career_volatility']]
     
-    # 5. VISUALIZATION
-    plt.figure(figsize=(12, 10))
-    # 'RdYlGn' cmap: Green = Positive Rank Jump, Red = High Volatility (Risk)
-    sns.heatmap(heatmap_data, annot=True, cmap='RdYlGn', center=0, 
-                linewidths=.5, cbar_kws={'label': 'Magnitude'})
-    
-    plt.title('Top 20 Players: 2026 Projected Rank Jump vs. Career Volatility', 
-              fontsize=16, fontweight='bold', pad=20)
-    plt.ylabel('Player Name', fontsize=12)
-    plt.xlabel('Scouting Metrics', fontsize=12)
-    
-    os.makedirs(OUTPUT_DIR, exist_ok=True)
+    # 5. VISUALIZATION (cached on the heatmap values)
     save_path = os.path.join(OUTPUT_DIR, "scouting_heatmap_top20.png")
-    plt.tight_layout()
-    plt.savefig(save_path)
+    render_charts([chart("scouting_heatmap_top20", "scripts.visualization.scouting_heatmap:plot_scouting_heatmap",
+                         heatmap_data, save_path)])
     
     print(f"SUCCESS: Scouting Heatmap saved to {save_path}")
 